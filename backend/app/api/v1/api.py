@@ -13,6 +13,7 @@ from app.api.v1.endpoints import (
     health,
     pdf,
     hints,
+    time_entries,
     _projects
 )
 
@@ -29,3 +30,4 @@ api_router.include_router(packages.router, prefix="/api/v1/packages", tags=["pac
 api_router.include_router(task_sync.router, prefix="/api/v1/task-sync", tags=["task-sync"])
 api_router.include_router(scheduling.router, prefix="/api/v1/scheduling", tags=["scheduling"])
 api_router.include_router(todo.router, prefix="/api/v1/todo", tags=["todo"], include_in_schema=True)
+api_router.include_router(time_entries.router, prefix="/api/v1/time-entries", tags=["time-entries"])
@@ -1,21 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Path
-from fastapi.responses import JSONResponse, Response
+from fastapi import APIRouter, Depends, HTTPException, Path, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
+from email.utils import format_datetime
 from pydantic import BaseModel, Field
 import re
-import uuid
-import icalendar
-import pytz
-
-from app.models.task import Task
 
 from app.core.database import get_db
 from app.models.user import User
 from app.core.auth import get_current_user
 from app.core.config import settings
 from app.services.caldav_service import CalDAVService
+from app.services.change_log import InvalidSyncToken
 
 # Pydantic models for request/response
 class TaskData(BaseModel):
@@ -39,6 +36,13 @@ def validate_calendar_path(path: str) -> bool:
 
 router = APIRouter()
 
+@router.get("/cache/stats")
+async def get_calendar_cache_stats(current_user: User = Depends(get_current_user)):
+    """Get hit rates of the calendar index and parsed-event caches (admin only)"""
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Only administrators can view cache statistics")
+    return CalDAVService.cache_stats()
+
 @router.post("/calendars", response_model=CalendarResponse)
 def create_calendar(
     calendar_name: str = Path(..., description="Name of the calendar to create"),
@@ -47,7 +51,7 @@ def create_calendar(
 ):
     """Create a new calendar for the current user"""
     try:
-        caldav_service = CalDAVService()
+        caldav_service = CalDAVService.shared()
         calendar_path = caldav_service.create_calendar(current_user.id, calendar_name)
         caldav_url = f"{settings.CALDAV_SERVER_URL}/{calendar_path}"
         return CalendarResponse(calendar_path=calendar_path, caldav_url=caldav_url)
@@ -72,7 +76,7 @@ def add_task(
         )
     
     try:
-        caldav_service = CalDAVService()
+        caldav_service = CalDAVService.shared()
         event_uid = caldav_service.add_task(calendar_path, task_data.dict())
         caldav_url = f"{settings.CALDAV_SERVER_URL}/{calendar_path}"
         return TaskResponse(event_uid=event_uid, caldav_url=caldav_url)
@@ -98,7 +102,7 @@ def update_task(
         )
     
     try:
-        caldav_service = CalDAVService()
+        caldav_service = CalDAVService.shared()
         if caldav_service.update_task(calendar_path, event_uid, task_data.dict()):
             caldav_url = f"{settings.CALDAV_SERVER_URL}/{calendar_path}"
             return TaskResponse(event_uid=event_uid, caldav_url=caldav_url)
@@ -135,7 +139,7 @@ def delete_task(
         )
     
     try:
-        caldav_service = CalDAVService()
+        caldav_service = CalDAVService.shared()
         if caldav_service.delete_task(calendar_path, event_uid):
             caldav_url = f"{settings.CALDAV_SERVER_URL}/{calendar_path}"
             return DeleteResponse(status="deleted", caldav_url=caldav_url)
@@ -165,7 +169,7 @@ def get_tasks(
         )
     
     try:
-        caldav_service = CalDAVService()
+        caldav_service = CalDAVService.shared()
         tasks = caldav_service.get_tasks(calendar_path, start_date, end_date)
         caldav_url = f"{settings.CALDAV_SERVER_URL}/{calendar_path}"
         return TaskList(tasks=tasks, caldav_url=caldav_url)
@@ -175,45 +179,75 @@ def get_tasks(
             detail=f"Failed to get tasks: {str(e)}"
         )
 
+@router.get("/changes/{calendar_path:path}")
+async def get_changes(
+    calendar_path: str = Path(..., description="Calendar path in format: user_id/calendar_name"),
+    sync_token: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the tasks changed and the events deleted since a sync token
+
+    Without a token the whole calendar is returned. The response carries the
+    sync token for the next call and the calendar's ctag.
+    """
+    if not validate_calendar_path(calendar_path):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid calendar path. Must be in format: user_id/calendar_name"
+        )
+    if calendar_path.split("/")[0] != str(current_user.id):
+        raise HTTPException(status_code=403, detail="Not authorized to access this calendar")
+
+    try:
+        caldav_service = CalDAVService.shared()
+        return await caldav_service.changes_since(calendar_path, sync_token)
+    except InvalidSyncToken:
+        # RFC 6578 DAV:valid-sync-token precondition: the client has to sync from scratch
+        raise HTTPException(status_code=403, detail="valid-sync-token")
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+def ics_feed_response(request: Request, etag: str, last_modified: datetime, chunks, filename: str) -> Response:
+    """
+    Stream an ICS feed, or answer 304 if the client's ETag is current
+
+    Only If-None-Match is honoured. HTTP dates have one-second resolution, so
+    If-Modified-Since cannot tell apart two writes within the same second and
+    would answer 304 for a changed feed; Last-Modified is sent for display.
+    """
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": "no-cache"
+    }
+    if_none_match = request.headers.get("if-none-match")
+    not_modified = False
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        tags = [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+        not_modified = "*" in tags or etag in tags
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(chunks, media_type="text/calendar", headers=headers)
+
 @router.get("/{user_id}.ics")
 async def get_calendar_feed(
     user_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: User = Depends(get_current_user)
 ):
     """Get ICS feed for user's tasks"""
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to access this calendar")
         
     try:
-        cal = icalendar.Calendar()
-        cal.add('prodid', '-//DocuPlanAI//Calendar//')
-        cal.add('version', '2.0')
-        
-        tasks = db.query(Task).filter(Task.user_id == user_id).all()
-        
-        for task in tasks:
-            event = icalendar.Event()
-            event.add('summary', task.title)
-            event.add('description', task.description)
-            
-            start_date = task.created_at or datetime.now(pytz.UTC)
-            event.add('dtstart', start_date)
-            
-            end_date = start_date + timedelta(hours=task.duration_hours or 1)
-            event.add('dtend', end_date)
-            
-            event.add('status', task.status.upper())
-            event.add('uid', task.caldav_event_uid or str(uuid.uuid4()))
-            
-            cal.add_component(event)
-        
-        return Response(
-            content=cal.to_ical(),
-            media_type="text/calendar",
-            headers={
-                "Content-Disposition": f'attachment; filename="calendar_{user_id}.ics"'
-            }
-        )
+        caldav_service = CalDAVService.shared()
+        etag, last_modified, chunks = await caldav_service.ics_feed(user_id)
+        return ics_feed_response(request, etag, last_modified, chunks, f"calendar_{user_id}.ics")
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
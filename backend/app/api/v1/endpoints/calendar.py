@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Request
+from app.api.v1.endpoints.caldav import ics_feed_response
 from app.services.caldav_service import CalDAVService
 from app.core.auth import get_current_user
 from app.core.database import get_db
@@ -9,6 +10,7 @@ router = APIRouter()
 @router.get("/{user_id}.ics")
 async def get_user_calendar(
     user_id: int,
+    request: Request,
     current_user = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -16,17 +18,9 @@ async def get_user_calendar(
         raise HTTPException(status_code=403, detail="Not authorized")
     
     try:
-        caldav_service = CalDAVService()
-        await caldav_service.initialize()
-        calendar_data = await caldav_service.generate_ics_feed(user_id)
-        
-        return Response(
-            content=calendar_data,
-            media_type="text/calendar",
-            headers={
-                "Content-Disposition": f"attachment; filename=calendar-{user_id}.ics"
-            }
-        )
+        caldav_service = CalDAVService.shared()
+        etag, last_modified, chunks = await caldav_service.ics_feed(user_id)
+        return ics_feed_response(request, etag, last_modified, chunks, f"calendar-{user_id}.ics")
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
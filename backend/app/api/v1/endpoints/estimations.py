@@ -5,7 +5,9 @@ from typing import Dict, List
 from app.core.database import get_db
 from app.models.user import User
 from app.core.auth import get_current_user
+from app.schemas.estimation import TaskAccuracyBatchRequest
 from app.services.estimation_service import EstimationService
+from app.services.deviation_alert_service import DeviationAlertService
 
 router = APIRouter()
 
@@ -24,6 +26,19 @@ def analyze_task_estimate(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/tasks/accuracy")
+def analyze_task_estimates_batch(
+    request: TaskAccuracyBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Dict:
+    """Analyze the estimate accuracy of many tasks in one request"""
+    try:
+        estimation_service = EstimationService(db)
+        return estimation_service.analyze_estimate_accuracy_batch(request.task_ids, current_user.id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/projects/{project_id}/stats")
 def get_project_estimation_stats(
     project_id: int,
@@ -50,3 +65,29 @@ def get_user_estimation_patterns(
         return estimation_service.detect_estimation_patterns(current_user.id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/users/me/deviation-alerts")
+def get_deviation_alerts(
+    limit: int = 100,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> List[Dict]:
+    """Get estimate deviation alerts that have not been dispatched yet"""
+    try:
+        alert_service = DeviationAlertService(db)
+        return alert_service.get_pending_alerts(current_user.id, limit=min(limit, 500))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/users/me/deviation-alerts/dispatched")
+def mark_deviation_alerts_dispatched(
+    alert_ids: List[int],
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Dict:
+    """Mark estimate deviation alerts as delivered"""
+    try:
+        alert_service = DeviationAlertService(db)
+        return {"status": "success", "dispatched": alert_service.mark_dispatched(alert_ids, current_user.id)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -71,7 +71,7 @@ async def analyze_pdf(
         print(f"Analysis complete. Found {len(analysis_result.get('tasks', []))} tasks")
         
         # Create tasks and sync with CalDAV
-        caldav_service = CalDAVService()
+        caldav_service = CalDAVService.shared()
         await caldav_service.initialize()
         tasks = []
         
@@ -88,12 +88,13 @@ async def analyze_pdf(
                 estimated_hours=float(task_data["duration_hours"])
             )
             db.add(task)
-            db.commit()  # Commit to ensure task has an ID
-            
-            # Sync with CalDAV
-            calendar_path = f"{current_user.id}/calendar"
-            await caldav_service.create_calendar(current_user.id, "PM Tool Calendar")
-            caldav_event_uid = await caldav_service.sync_task_with_calendar(
+            tasks.append(task)
+        db.flush()  # Assign task IDs
+        
+        # Sync all tasks with CalDAV in one batch
+        calendar_path = f"{current_user.id}/calendar"
+        event_uids = await caldav_service.sync_tasks_with_calendar(
+            [
                 {
                     "id": task.id,
                     "title": task.title,
@@ -104,12 +105,13 @@ async def analyze_pdf(
                     "confidence_score": task.confidence_score,
                     "confidence_rationale": task.confidence_rationale,
                     "start_date": datetime.now()
-                },
-                calendar_path
-            )
-            task.caldav_event_uid = caldav_event_uid
-            db.add(task)  # Re-add task with caldav_event_uid
-            tasks.append(task)
+                }
+                for task in tasks
+            ],
+            calendar_path
+        )
+        for task in tasks:
+            task.caldav_event_uid = event_uids.get(task.id)
         
         db.commit()
         
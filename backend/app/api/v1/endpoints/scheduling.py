@@ -1,31 +1,173 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import Dict, List
-from datetime import datetime
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
 
 from app.core.database import get_db
 from app.services.scheduling_service import SchedulingService
+from app.services.schedule_cache import schedule_cache
+from app.services.caldav_service import CalDAVService
+from app.services.forecast_service import ForecastService
+from app.services.assignment_service import AssignmentService
+from app.services.working_calendar import CalendarRangeError
 from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+from app.core.auth import get_current_user
+from app.schemas.scheduling import RescheduleRequest, WorkingCalendarUpdate, AssignmentRequest
 
 router = APIRouter()
 
+def _get_owned_project(db: Session, project_id: int, current_user: User) -> Project:
+    """The project if it belongs to the current user; other users' projects are reported as missing"""
+    project = db.query(Project).filter(Project.id == project_id, Project.user_id == current_user.id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project
+
 @router.post("/projects/{project_id}/schedule", response_model=Dict)
 async def schedule_project(
     project_id: int,
+    max_lanes: Optional[int] = Query(None, ge=1),
     db: Session = Depends(get_db)
 ) -> Dict:
     """
-    Create an optimal schedule for project tasks
+    Create an optimal schedule for project tasks, including the critical path
     """
     try:
         scheduling_service = SchedulingService(db)
-        schedule = scheduling_service.schedule_tasks(project_id)
+        schedule = scheduling_service.schedule_tasks(project_id, max_lanes=max_lanes)
         return schedule
+    except CalendarRangeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error scheduling project: {str(e)}")
 
+@router.get("/cache/stats", response_model=Dict)
+async def get_schedule_cache_stats(
+    current_user: User = Depends(get_current_user)
+) -> Dict:
+    """
+    Get hit rate and size of the schedule result cache (admin only)
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Only administrators can view cache statistics")
+    return schedule_cache.stats()
+
+@router.post("/projects/{project_id}/book", response_model=Dict)
+async def book_project(
+    project_id: int,
+    start_date: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Dict:
+    """
+    Book project tasks into the owner's free time across all of their projects
+    """
+    _get_owned_project(db, project_id, current_user)
+    try:
+        scheduling_service = SchedulingService(db)
+        return scheduling_service.book_project(project_id, start_date=start_date)
+    except CalendarRangeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error booking project: {str(e)}")
+
+@router.get("/projects/{project_id}/forecast", response_model=Dict)
+async def forecast_project(
+    project_id: int,
+    simulations: int = Query(ForecastService.DEFAULT_SIMULATIONS, ge=100, le=ForecastService.MAX_SIMULATIONS),
+    sequential: bool = False,
+    start_date: Optional[datetime] = None,
+    seed: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Dict:
+    """
+    Forecast P50/P80/P95 completion dates from task confidence and estimation history
+    """
+    _get_owned_project(db, project_id, current_user)
+    try:
+        forecast_service = ForecastService(db)
+        return forecast_service.forecast_project(
+            project_id, simulations=simulations, sequential=sequential, start_date=start_date, seed=seed
+        )
+    except CalendarRangeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error forecasting project: {str(e)}")
+
+@router.post("/projects/{project_id}/reschedule", response_model=Dict)
+async def reschedule_tasks(
+    project_id: int,
+    request: RescheduleRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Dict:
+    """
+    Re-plan changed tasks and their dependents, keeping the rest of the booked schedule
+    """
+    _get_owned_project(db, project_id, current_user)
+    task_ids = set(request.task_ids)
+    known_ids = {task_id for (task_id,) in db.query(Task.id).filter(Task.project_id == project_id, Task.id.in_(task_ids))}
+    if task_ids - known_ids:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tasks not in project: {', '.join(str(task_id) for task_id in sorted(task_ids - known_ids))}"
+        )
+    
+    try:
+        scheduling_service = SchedulingService(db)
+        return scheduling_service.reschedule_tasks(project_id, request.task_ids)
+    except CalendarRangeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rescheduling tasks: {str(e)}")
+
+@router.post("/projects/{project_id}/assign", response_model=Dict)
+async def assign_tasks(
+    project_id: int,
+    request: AssignmentRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Dict:
+    """
+    Distribute pending project tasks across team members by capacity
+    """
+    project = db.query(Project).filter(Project.id == project_id, Project.user_id == current_user.id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    member_ids = {member.user_id for member in request.members}
+    known_ids = {user_id for (user_id,) in db.query(User.id).filter(User.id.in_(member_ids))}
+    if member_ids - known_ids:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown team members: {', '.join(str(user_id) for user_id in sorted(member_ids - known_ids))}"
+        )
+    
+    try:
+        assignment_service = AssignmentService(db)
+        return assignment_service.balance_project(
+            project_id,
+            [member.model_dump() for member in request.members],
+            local_search=request.local_search,
+            apply=request.apply
+        )
+    except CalendarRangeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error assigning tasks: {str(e)}")
+
 @router.get("/projects/{project_id}/available-slots", response_model=List[Dict])
 async def get_available_slots(
     project_id: int,
@@ -34,12 +176,30 @@ async def get_available_slots(
     db: Session = Depends(get_db)
 ) -> List[Dict]:
     """
-    Get available time slots for scheduling between two dates
+    Get available time slots for scheduling between two dates, excluding
+    events in the project owner's calendar
     """
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
     try:
+        busy_intervals = []
+        try:
+            caldav_service = CalDAVService.shared()
+            # Slots cover whole local days, so read a day beyond each end
+            busy_intervals = await caldav_service.get_busy_intervals(
+                f"{project.user_id}/calendar", start_date - timedelta(days=1), end_date + timedelta(days=1)
+            )
+        except Exception as caldav_error:
+            print(f"Warning: Could not read calendar, using working hours only: {str(caldav_error)}")
+        
         scheduling_service = SchedulingService(db)
-        slots = scheduling_service.get_available_slots(start_date, end_date)
+        calendar = scheduling_service.get_working_calendar(project.user_id)
+        slots = scheduling_service.get_available_slots(start_date, end_date, busy_intervals, calendar)
         return slots
+    except CalendarRangeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting available slots: {str(e)}")
 
@@ -52,9 +212,52 @@ async def validate_schedule(
     """
     Validate a proposed schedule for conflicts and constraints
     """
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
     try:
         scheduling_service = SchedulingService(db)
-        validation_result = scheduling_service.validate_schedule(schedule)
+        calendar = scheduling_service.get_working_calendar(project.user_id)
+        validation_result = scheduling_service.validate_schedule(schedule, calendar)
         return validation_result
+    except CalendarRangeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error validating schedule: {str(e)}")
+
+@router.get("/users/me/working-calendar", response_model=Dict)
+async def get_working_calendar(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Dict:
+    """
+    Get the working hours, workdays, holidays and timezone used to schedule the current user
+    """
+    scheduling_service = SchedulingService(db)
+    calendar = scheduling_service.get_working_calendar(current_user.id)
+    return {
+        "user_id": current_user.id,
+        "timezone": calendar.timezone,
+        "start_time": calendar.clock_time(0),
+        "end_time": calendar.clock_time(calendar.day_minutes),
+        "workdays": sorted(calendar.workdays),
+        "holidays": sorted(day.isoformat() for day in calendar.holidays)
+    }
+
+@router.put("/users/me/working-calendar", response_model=Dict)
+async def update_working_calendar(
+    calendar: WorkingCalendarUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Dict:
+    """
+    Replace the current user's working calendar
+    """
+    try:
+        scheduling_service = SchedulingService(db)
+        return scheduling_service.update_working_calendar(current_user.id, calendar.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating working calendar: {str(e)}")
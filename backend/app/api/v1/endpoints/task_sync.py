@@ -11,6 +11,22 @@ from app.services.caldav_service import CalDAVService
 
 router = APIRouter()
 
+def _sync_data(task: Task) -> dict:
+    """Calendar sync data of a task"""
+    return {
+        "id": task.id,
+        "title": task.title or task.description or "Untitled Task",
+        "description": task.description or "",
+        "estimated_hours": task.estimated_hours,
+        "duration_hours": task.duration_hours,
+        "hourly_rate": task.hourly_rate,
+        "status": task.status,
+        "priority": task.priority,
+        "confidence_score": task.confidence_score,
+        "confidence_rationale": task.confidence_rationale,
+        "caldav_event_uid": task.caldav_event_uid
+    }
+
 @router.post("/tasks/{task_id}/sync", response_model=dict)
 async def sync_task(
     task_id: int,
@@ -28,8 +44,11 @@ async def sync_task(
         calendar_path = f"{current_user.id}/PM Tool"
         
         # Sync task
-        caldav_service = CalDAVService()
-        event_uid = caldav_service.sync_task_with_calendar(task, calendar_path)
+        caldav_service = CalDAVService.shared()
+        event_uid = await caldav_service.sync_task_with_calendar(_sync_data(task), calendar_path)
+        if not task.caldav_event_uid:
+            task.caldav_event_uid = event_uid
+            db.commit()
         
         return {
             "status": "synced",
@@ -57,23 +76,34 @@ async def sync_all_tasks(
         # Create calendar path
         calendar_path = f"{current_user.id}/PM Tool"
         
-        # Sync each task
-        caldav_service = CalDAVService()
+        # Sync all tasks in one batch
+        caldav_service = CalDAVService.shared()
         synced_tasks = []
         failed_tasks = []
         
+        try:
+            event_uids = await caldav_service.sync_tasks_with_calendar(
+                [_sync_data(task) for task in tasks], calendar_path
+            )
+            error = "Task could not be converted to a calendar event"
+        except Exception as e:
+            event_uids = {}
+            error = str(e)
+        
         for task in tasks:
-            try:
-                event_uid = caldav_service.sync_task_with_calendar(task, calendar_path)
+            if task.id in event_uids:
+                if not task.caldav_event_uid:
+                    task.caldav_event_uid = event_uids[task.id]
                 synced_tasks.append({
                     "task_id": task.id,
-                    "event_uid": event_uid
+                    "event_uid": event_uids[task.id]
                 })
-            except Exception as e:
+            else:
                 failed_tasks.append({
                     "task_id": task.id,
-                    "error": str(e)
+                    "error": error
                 })
+        db.commit()
         
         return {
             "status": "completed",
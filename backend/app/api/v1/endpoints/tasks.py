@@ -5,6 +5,7 @@ from typing import List
 from app.api import deps
 from app.schemas.task import Task, TaskCreate, TaskUpdate
 from app.crud.task import task
+from app.services.scheduling_service import SchedulingService
 
 # Logging import
 import logging
@@ -84,7 +85,11 @@ def update_task(
         if not task_obj:
             logger.warning("Task with ID %s not found for update", task_id)
             raise HTTPException(status_code=404, detail="Task not found")
-        return task.update(db=db, db_obj=task_obj, obj_in=task_in)
+        previous = SchedulingService.schedule_state(task_obj)
+        task_obj = task.update(db=db, db_obj=task_obj, obj_in=task_in)
+        if SchedulingService.schedule_state(task_obj) != previous:
+            SchedulingService(db).reschedule_booked([task_obj])
+        return task_obj
     except Exception as e:
         logger.error("Error updating task with ID %s: %s", task_id, str(e))
         raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -104,7 +109,9 @@ def delete_task(
         if not task_obj:
             logger.warning("Task with ID %s not found for deletion", task_id)
             raise HTTPException(status_code=404, detail="Task not found")
-        return task.remove(db=db, id=task_id)
+        # Drops the task's slots and dependency edges and pulls its dependents forward
+        SchedulingService(db).delete_task(task_obj)
+        return task_obj
     except Exception as e:
         logger.error("Error deleting task with ID %s: %s", task_id, str(e))
         raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import Dict
+
+from app.core.database import get_db
+from app.models.user import User
+from app.core.auth import get_current_user
+from app.schemas.time_entry import TimeEntryBatch
+from app.services.time_entry_service import TimeEntryService
+
+router = APIRouter()
+
+@router.post("/bulk")
+def ingest_time_entries(
+    batch: TimeEntryBatch,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Dict:
+    """Append a batch of time entries and update the per-task hour totals"""
+    try:
+        time_entry_service = TimeEntryService(db)
+        return time_entry_service.ingest_entries(
+            [entry.model_dump() for entry in batch.entries],
+            current_user.id
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to ingest time entries: {str(e)}")
+
+@router.get("/tasks/{task_id}/totals")
+def get_task_totals(
+    task_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Dict:
+    """Get the tracked-hour totals of a task without scanning its entries"""
+    time_entry_service = TimeEntryService(db)
+    totals = time_entry_service.get_task_totals([task_id], current_user.id)
+    if not totals:
+        raise HTTPException(status_code=404, detail="No time tracked for task")
+    return totals[0]
@@ -9,13 +9,17 @@ from app.models.task import Task
 from app.models.project import Project
 from app.core.auth import get_current_user
 from app.services.caldav_service import CalDAVService
+from app.services.change_log import InvalidSyncToken
+from app.services.deviation_alert_service import DeviationAlertService
+from app.services.scheduling_service import SchedulingService
+from app.services.time_entry_service import TimeEntryService
 from fastapi import Depends
 
 router = APIRouter()
 
 async def get_caldav_service():
     """Dependency to get CalDAV service instance"""
-    service = CalDAVService()
+    service = CalDAVService.shared()
     await service.initialize()
     return service
 
@@ -199,8 +203,11 @@ async def move_task_to_dashboard(
             raise HTTPException(status_code=404, detail="Task not found")
             
         # Update task status to indicate it's moved to dashboard
+        previous = SchedulingService.schedule_state(task)
         task.status = "pending"
         db.commit()
+        if SchedulingService.schedule_state(task) != previous:
+            SchedulingService(db).reschedule_booked([task])
         
         # Sync with calendar
         try:
@@ -218,6 +225,7 @@ async def move_task_to_dashboard(
                 "priority": task.priority,
                 "confidence_score": task.confidence_score,
                 "confidence_rationale": task.confidence_rationale,
+                "caldav_event_uid": task.caldav_event_uid,
                 "start_date": datetime.now(),
                 "end_date": datetime.now() + timedelta(hours=float(task.duration_hours or task.estimated_hours))
             }, calendar_path)
@@ -264,6 +272,8 @@ async def update_todo_item(
         
         print(f"Updating task {task_id} for user {current_user.email}")
         
+        previous_schedule_state = SchedulingService.schedule_state(task)
+        
         # Store original values for rollback
         original_values = {
             "title": task.title,
@@ -280,9 +290,18 @@ async def update_todo_item(
             update_data = task_update.dict(exclude_unset=True)
             print(f"Updating fields: {update_data}")
             
+            # Tracked hours are owned by the time entry aggregate; a new total is
+            # booked as a correction entry and cannot be cleared
+            actual_hours = update_data.pop("actual_hours", None)
+            
             for field, value in update_data.items():
                 setattr(task, field, value)
             
+            # Evaluate estimate deviation alerts in the same transaction
+            if actual_hours is not None:
+                totals = TimeEntryService(db).correct_total(task.id, current_user.id, actual_hours)
+                DeviationAlertService(db).on_hours_changed(totals)
+            
             # Commit database changes
             db.commit()
             db.refresh(task)
@@ -319,6 +338,9 @@ async def update_todo_item(
                     task.caldav_event_uid = event_uid
                     db.commit()
                 
+                if SchedulingService.schedule_state(task) != previous_schedule_state:
+                    SchedulingService(db).reschedule_booked([task])
+                
                 task_dict = task.to_dict()
                 task_dict["title"] = task_dict.get("title") or task_dict.get("description", "Untitled Task")
                 return {
@@ -375,14 +397,14 @@ async def transfer_tasks(
             raise HTTPException(status_code=404, detail="No tasks found")
         
         calendar_path = f"{current_user.id}/calendar"
-        await caldav_service.create_calendar(current_user.id, "PM Tool Calendar")
-        
+        sync_data = []
+        changed = []
         for task in tasks:
+            if task.status != 'pending':
+                changed.append(task)
             task.status = 'pending'
             task.in_dashboard = True
-            
-            # Sync with calendar
-            event_uid = await caldav_service.sync_task_with_calendar({
+            sync_data.append({
                 "id": task.id,
                 "title": task.title or task.description or "Untitled Task",
                 "description": task.description,
@@ -393,14 +415,19 @@ async def transfer_tasks(
                 "priority": task.priority,
                 "confidence_score": task.confidence_score,
                 "confidence_rationale": task.confidence_rationale,
+                "caldav_event_uid": task.caldav_event_uid,
                 "start_date": datetime.now(),
                 "end_date": datetime.now() + timedelta(hours=float(task.duration_hours or task.estimated_hours))
-            }, calendar_path)
-            
-            if not task.caldav_event_uid:
-                task.caldav_event_uid = event_uid
+            })
+        
+        # Sync all tasks with the calendar in one batch
+        event_uids = await caldav_service.sync_tasks_with_calendar(sync_data, calendar_path)
+        for task in tasks:
+            if not task.caldav_event_uid and task.id in event_uids:
+                task.caldav_event_uid = event_uids[task.id]
         
         db.commit()
+        SchedulingService(db).reschedule_booked(changed)
         return {
             "status": "success",
             "message": "Tasks transferred successfully",
@@ -420,6 +447,7 @@ async def transfer_tasks(
 @router.get("/sync-status", response_model=dict)
 
 async def get_sync_status(
+    sync_token: Optional[str] = Query(None, description="Token of an earlier call; only tasks whose events changed since are checked"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     caldav_service: CalDAVService = Depends(get_caldav_service)
@@ -437,12 +465,21 @@ async def get_sync_status(
         failed_tasks = []
         
         try:
-            events = await caldav_service.get_tasks(calendar_path)
+            # The returned sync token lets clients follow up with only the changes
+            changes = await caldav_service.changes_since(calendar_path, sync_token)
+            events = changes["changed"]
             event_map = {
                 e.get("x-pm-tool-id"): e 
                 for e in events 
                 if e.get("x-pm-tool-id")
             }
+            deleted = set(changes["deleted"])
+            if sync_token:
+                # Tasks whose events did not change keep the status reported for the token
+                tasks = [
+                    task for task in tasks
+                    if str(task.id) in event_map or task.caldav_event_uid in deleted
+                ]
             
             for task in tasks:
                 if str(task.id) in event_map:
@@ -473,8 +510,15 @@ async def get_sync_status(
                 "synced_tasks": synced_count,
                 "failed_tasks": failed_count,
                 "failed_task_details": failed_tasks,
+                "sync_token": changes["sync_token"],
+                "ctag": changes["ctag"],
+                "full": changes["full"],
+                "deleted": changes["deleted"],
                 "last_sync": datetime.utcnow().isoformat()
             }
+        except InvalidSyncToken:
+            # RFC 6578 DAV:valid-sync-token precondition: the client has to start over without a token
+            raise HTTPException(status_code=403, detail="valid-sync-token")
         except Exception as e:
             print(f"Error fetching calendar events: {str(e)}")
             return {
@@ -486,6 +530,8 @@ async def get_sync_status(
                 "failed_task_details": [{"id": t.id, "title": t.title, "reason": "Calendar access error"} for t in tasks],
                 "last_sync": datetime.utcnow().isoformat()
             }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -41,16 +41,24 @@ class Settings(BaseSettings):
     CALDAV_AUTH_ENABLED: bool = os.getenv("CALDAV_AUTH_ENABLED", "true").lower() == "true"
     
     CALDAV_STORAGE_PATH: str = os.getenv("CALDAV_STORAGE_PATH", "/tmp/caldav_storage")
+    # Threads for blocking calendar file I/O
+    CALDAV_IO_WORKERS: int = int(os.getenv("CALDAV_IO_WORKERS", "4"))
+    # Calendar storage backend: "filesystem" (one .ics file per event) or "sqlite" (one database per calendar)
+    CALDAV_STORAGE_BACKEND: str = os.getenv("CALDAV_STORAGE_BACKEND", "filesystem")
+    # Directory layout of new calendars: "flat" or "sharded" (hash-prefix subdirectories)
+    CALDAV_STORAGE_LAYOUT: str = os.getenv("CALDAV_STORAGE_LAYOUT", "flat")
 
     @property
     def caldav_storage_path(self) -> str:
-        """Get the absolute path to CalDAV storage directory"""
+        """
+        Get the absolute path to CalDAV storage directory
+
+        Pure path computation; the directories are created once when the
+        CalDAV storage is initialized.
+        """
         base_path = self.CALDAV_STORAGE_PATH
         if not os.path.isabs(base_path):
             base_path = os.path.join(os.getcwd(), base_path)
-        collection_root = os.path.join(base_path, "collection-root")
-        os.makedirs(collection_root, mode=0o755, exist_ok=True)
-        print(f"CalDAV storage path: {collection_root}")
         return base_path
 
     @property
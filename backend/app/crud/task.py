@@ -1,10 +1,13 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 
 from app.crud.base import CRUDBase
 from app.models.task import Task
 from app.schemas.task import TaskCreate, TaskUpdate
+from app.services.deviation_alert_service import DeviationAlertService
+from app.services.time_entry_service import TimeEntryService
 
 class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
     def get_by_project(self, db: Session, *, project_id: int) -> List[Task]:
@@ -28,14 +31,43 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
         db.refresh(task_obj)
         return task_obj
 
+    def update(
+        self, db: Session, *, db_obj: Task, obj_in: Union[TaskUpdate, Dict[str, Any]]
+    ) -> Task:
+        obj_data = jsonable_encoder(db_obj)
+        update_data = dict(obj_in) if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+        # Tracked hours are owned by the time entry aggregate; see update_hours
+        actual_hours = update_data.pop("actual_hours", None)
+        previous_estimate = db_obj.estimated_hours
+        for field in obj_data:
+            if field in update_data:
+                setattr(db_obj, field, update_data[field])
+        db.add(db_obj)
+
+        # A new estimate moves the task's deviation just like new hours do
+        if actual_hours is not None:
+            totals = TimeEntryService(db).correct_total(db_obj.id, db_obj.project.user_id, actual_hours)
+        elif db_obj.estimated_hours != previous_estimate and db_obj.actual_hours is not None:
+            totals = {db_obj.id: db_obj.actual_hours}
+        else:
+            totals = {}
+        DeviationAlertService(db).on_hours_changed(totals)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
     def update_hours(
-        self, db: Session, *, task_id: int, actual_hours: float
+        self, db: Session, *, task_id: int, actual_hours: float, user_id: Optional[int] = None
     ) -> Optional[Task]:
         task_obj = self.get(db=db, id=task_id)
         if not task_obj:
             return None
-        task_obj.actual_hours = actual_hours
-        db.add(task_obj)
+        # Tracked hours are owned by the time entry aggregate, which mirrors
+        # its total onto actual_hours; a new value is booked as a correction
+        totals = TimeEntryService(db).correct_total(
+            task_id, user_id if user_id is not None else task_obj.project.user_id, actual_hours
+        )
+        DeviationAlertService(db).on_hours_changed(totals)
         db.commit()
         db.refresh(task_obj)
         return task_obj
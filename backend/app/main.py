@@ -5,6 +5,8 @@ from app.core.config import settings
 from app.api.v1.api import api_router
 from app.core.auth import get_current_user, oauth2_scheme
 from app.models.user import User
+from app.services.caldav_service import startup_caldav_service, shutdown_caldav_service
+from contextlib import asynccontextmanager
 import logging
 
 # Configure OAuth2
@@ -24,13 +26,21 @@ TEST_USER = User(
     subscription_end_date=None
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One CalDAV service per process, set up before the first request
+    await startup_caldav_service()
+    yield
+    await shutdown_caldav_service()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url="/docs",
     redoc_url="/redoc",
     debug=True,
-    redirect_slashes=True
+    redirect_slashes=True,
+    lifespan=lifespan
 )
 
 
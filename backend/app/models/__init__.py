@@ -4,6 +4,12 @@ from .task import Task
 from .package import Package
 from .subscription import Subscription
 from .invoice import Invoice
+from .task_dependency import TaskDependency
+from .scheduled_slot import ScheduledSlot, ProjectSchedule
+from .time_entry import TimeEntry, TaskTimeAggregate
+from .estimation_stats import UserEstimationStats, TaskDeviationState
+from .notification import NotificationOutbox
+from .working_calendar import UserWorkingCalendar
 
 __all__ = [
     "User",
@@ -11,5 +17,14 @@ __all__ = [
     "Task",
     "Package",
     "Subscription",
-    "Invoice"
+    "Invoice",
+    "TaskDependency",
+    "ScheduledSlot",
+    "ProjectSchedule",
+    "TimeEntry",
+    "TaskTimeAggregate",
+    "UserEstimationStats",
+    "TaskDeviationState",
+    "NotificationOutbox",
+    "UserWorkingCalendar"
 ]
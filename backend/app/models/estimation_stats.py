@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.core.config import settings
+
+class UserEstimationStats(Base):
+    """Welford accumulator of a user's estimate deviation percentages"""
+    __tablename__ = "test_user_estimation_stats" if settings.DEBUG else "user_estimation_stats"
+
+    user_id = Column(Integer, ForeignKey("test_users.id" if settings.DEBUG else "users.id"), primary_key=True)
+    sample_count = Column(Integer, nullable=False, default=0)
+    mean = Column(Float, nullable=False, default=0.0)
+    m2 = Column(Float, nullable=False, default=0.0)  # Sum of squared differences from the mean
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class TaskDeviationState(Base):
+    """Deviation sample a task currently contributes and the alerts already raised for it"""
+    __tablename__ = "test_task_deviation_states" if settings.DEBUG else "task_deviation_states"
+
+    task_id = Column(Integer, ForeignKey("test_tasks.id" if settings.DEBUG else "tasks.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("test_users.id" if settings.DEBUG else "users.id"), index=True)
+    sample = Column(Float, nullable=True)  # Deviation percentage included in the user's stats
+    alerted_level = Column(Integer, nullable=False, default=0)  # Index into the alert thresholds
+    outlier_flagged = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.core.config import settings
+
+class NotificationOutbox(Base):
+    """Events written in the same transaction as the change that caused them"""
+    __tablename__ = "test_notification_outbox" if settings.DEBUG else "notification_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("test_users.id" if settings.DEBUG else "users.id"), index=True)
+    task_id = Column(Integer, ForeignKey("test_tasks.id" if settings.DEBUG else "tasks.id", ondelete="CASCADE"), nullable=True)
+    event_type = Column(String, nullable=False)  # estimate_deviation, deviation_outlier
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    dispatched_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "task_id": self.task_id,
+            "event_type": self.event_type,
+            "payload": self.payload,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "dispatched_at": self.dispatched_at.isoformat() if self.dispatched_at else None
+        }
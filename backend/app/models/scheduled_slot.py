@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.core.config import settings
+
+class ScheduledSlot(Base):
+    """A block of working time booked for a task"""
+    __tablename__ = "test_scheduled_slots" if settings.DEBUG else "scheduled_slots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("test_users.id" if settings.DEBUG else "users.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("test_projects.id" if settings.DEBUG else "projects.id"), nullable=False, index=True)
+    task_id = Column(Integer, ForeignKey("test_tasks.id" if settings.DEBUG else "tasks.id", ondelete="CASCADE"), nullable=False, index=True)
+    start_at = Column(DateTime, nullable=False)
+    end_at = Column(DateTime, nullable=False)
+    version = Column(Integer, nullable=False, default=1)  # Schedule version that placed the slot
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_scheduled_slots_user_end", "user_id", "end_at"),
+    )
+
+    def to_dict(self):
+        return {
+            "date": self.start_at.strftime("%Y-%m-%d"),
+            "task_id": self.task_id,
+            "project_id": self.project_id,
+            "hours": (self.end_at - self.start_at).total_seconds() / 3600,
+            "start_time": self.start_at.strftime("%H:%M"),
+            "end_time": self.end_at.strftime("%H:%M")
+        }
+
+class ProjectSchedule(Base):
+    """Version and anchor of a project's persisted bookings"""
+    __tablename__ = "test_project_schedules" if settings.DEBUG else "project_schedules"
+
+    project_id = Column(Integer, ForeignKey("test_projects.id" if settings.DEBUG else "projects.id"), primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
+    start_at = Column(DateTime, nullable=False)  # Earliest time the project may be booked
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -29,6 +29,14 @@ class Task(Base):
     # Relationships
     project = relationship("Project", back_populates="tasks")
     user = relationship("User", back_populates="tasks")
+    # Rows that only exist for the task are deleted with it
+    scheduled_slots = relationship("ScheduledSlot", cascade="all, delete-orphan")
+    dependencies = relationship("TaskDependency", foreign_keys="TaskDependency.task_id", cascade="all, delete-orphan")
+    dependents = relationship("TaskDependency", foreign_keys="TaskDependency.depends_on_id", cascade="all, delete-orphan")
+    time_entries = relationship("TimeEntry", back_populates="task", cascade="all, delete-orphan")
+    time_aggregate = relationship("TaskTimeAggregate", uselist=False, cascade="all, delete-orphan")
+    deviation_state = relationship("TaskDeviationState", uselist=False, cascade="all, delete-orphan")
+    notifications = relationship("NotificationOutbox", cascade="all, delete-orphan")
 
     def to_dict(self):
         task_dict = {
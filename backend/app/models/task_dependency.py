@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from app.core.database import Base
+from app.core.config import settings
+
+class TaskDependency(Base):
+    """Edge stating that task_id cannot start before depends_on_id is finished"""
+    __tablename__ = "test_task_dependencies" if settings.DEBUG else "task_dependencies"
+
+    task_id = Column(Integer, ForeignKey("test_tasks.id" if settings.DEBUG else "tasks.id", ondelete="CASCADE"), primary_key=True)
+    depends_on_id = Column(Integer, ForeignKey("test_tasks.id" if settings.DEBUG else "tasks.id", ondelete="CASCADE"), primary_key=True, index=True)
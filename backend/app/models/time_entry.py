@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.core.config import settings
+
+class TimeEntry(Base):
+    """Append-only record of hours tracked against a task"""
+    __tablename__ = "test_time_entries" if settings.DEBUG else "time_entries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(Integer, ForeignKey("test_tasks.id" if settings.DEBUG else "tasks.id", ondelete="CASCADE"), index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("test_users.id" if settings.DEBUG else "users.id"), index=True, nullable=False)
+    hours = Column(Float, nullable=False)  # Negative values are corrections
+    spent_at = Column(DateTime(timezone=True), nullable=False)
+    note = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    task = relationship("Task", back_populates="time_entries")
+
+class TaskTimeAggregate(Base):
+    """Running totals of tracked hours per task, maintained on ingest"""
+    __tablename__ = "test_task_time_aggregates" if settings.DEBUG else "task_time_aggregates"
+
+    task_id = Column(Integer, ForeignKey("test_tasks.id" if settings.DEBUG else "tasks.id", ondelete="CASCADE"), primary_key=True)
+    total_hours = Column(Float, nullable=False, default=0.0)
+    entry_count = Column(Integer, nullable=False, default=0)
+    last_spent_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def to_dict(self):
+        return {
+            "task_id": self.task_id,
+            "total_hours": self.total_hours,
+            "entry_count": self.entry_count,
+            "last_spent_at": self.last_spent_at.isoformat() if self.last_spent_at else None
+        }
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.core.config import settings
+
+class UserWorkingCalendar(Base):
+    """A user's working hours, workdays, holidays and timezone"""
+    __tablename__ = "test_user_working_calendars" if settings.DEBUG else "user_working_calendars"
+
+    user_id = Column(Integer, ForeignKey("test_users.id" if settings.DEBUG else "users.id"), primary_key=True)
+    timezone = Column(String, nullable=True)  # IANA name, server local time if empty
+    start_minute = Column(Integer, nullable=False, default=9 * 60)
+    day_minutes = Column(Integer, nullable=False, default=8 * 60)
+    workdays = Column(JSON, nullable=False, default=lambda: [0, 1, 2, 3, 4])  # 0 = Monday
+    holidays = Column(JSON, nullable=False, default=list)  # ISO dates
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def to_dict(self):
+        start_hours, start_minutes = divmod(self.start_minute, 60)
+        end_hours, end_minutes = divmod(self.start_minute + self.day_minutes, 60)
+        return {
+            "user_id": self.user_id,
+            "timezone": self.timezone,
+            "start_time": f"{start_hours:02d}:{start_minutes:02d}",
+            "end_time": f"{end_hours:02d}:{end_minutes:02d}",
+            "workdays": sorted(self.workdays),
+            "holidays": sorted(self.holidays or [])
+        }
@@ -0,0 +1,5 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+class TaskAccuracyBatchRequest(BaseModel):
+    task_ids: List[int] = Field(..., min_length=1, max_length=1000)
@@ -0,0 +1,29 @@
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
+
+class RescheduleRequest(BaseModel):
+    task_ids: List[int] = Field(..., min_length=1, max_length=1000)  # Tasks whose hours, status or dependencies changed
+
+class TeamMemberCapacity(BaseModel):
+    user_id: int
+    capacity_hours: float = Field(..., ge=0)  # Hours available in the planning period
+
+class AssignmentRequest(BaseModel):
+    members: List[TeamMemberCapacity] = Field(..., min_length=1, max_length=1000)
+    local_search: bool = True
+    apply: bool = False  # Only propose assignments unless set
+
+class WorkingCalendarUpdate(BaseModel):
+    timezone: Optional[str] = None  # IANA name such as "Europe/Berlin"
+    start_time: str = Field("09:00", pattern=r"^\d{2}:\d{2}$")
+    end_time: str = Field("17:00", pattern=r"^\d{2}:\d{2}$")
+    workdays: List[int] = Field([0, 1, 2, 3, 4], min_length=1, max_length=7)  # 0 = Monday
+    holidays: List[date] = Field([], max_length=2000)
+
+    @field_validator("workdays")
+    @classmethod
+    def validate_workdays(cls, workdays: List[int]) -> List[int]:
+        if any(day < 0 or day > 6 for day in workdays):
+            raise ValueError("Workdays must be between 0 (Monday) and 6 (Sunday)")
+        return sorted(set(workdays))
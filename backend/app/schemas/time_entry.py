@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
+
+class TimeEntryCreate(BaseModel):
+    task_id: int
+    hours: float  # Negative values book a correction
+    spent_at: Optional[datetime] = None  # Defaults to ingest time
+    note: Optional[str] = None
+
+    @field_validator("spent_at")
+    @classmethod
+    def validate_spent_at(cls, spent_at: Optional[datetime]) -> Optional[datetime]:
+        # Naive times are taken as UTC so a batch never mixes naive and aware values
+        if spent_at is None:
+            return None
+        if spent_at.tzinfo is None:
+            return spent_at.replace(tzinfo=timezone.utc)
+        return spent_at.astimezone(timezone.utc)
+
+class TimeEntryBatch(BaseModel):
+    entries: List[TimeEntryCreate] = Field(..., min_length=1, max_length=10000)
+
+class TaskTimeAggregateResponse(BaseModel):
+    task_id: int
+    total_hours: float
+    entry_count: int
+    last_spent_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,153 @@
+from typing import Dict, List, Optional
+from bisect import bisect_left
+import heapq
+
+EPSILON = 1e-9
+
+class AssignmentEngine:
+    """
+    Distributes tasks across team members without exceeding their capacity
+
+    Greedy placement takes tasks longest first and gives each to the member
+    with the lowest utilization (load / capacity) who still has room, using a
+    heap keyed by utilization. An optional local search then moves or swaps
+    tasks between the most and least utilized members while that lowers the
+    peak utilization.
+    """
+
+    def __init__(self, members: List[Dict]):
+        """
+        Args:
+            members: Dicts with ``id``, ``capacity_hours`` and optionally
+                ``load_hours`` already committed elsewhere
+        """
+        self.member_ids = [member["id"] for member in members]
+        self.capacity = [max(float(member["capacity_hours"]), 0.0) for member in members]
+        self.base_load = [max(float(member.get("load_hours") or 0.0), 0.0) for member in members]
+
+    def assign(self, tasks: List[Dict], local_search: bool = False, max_iterations: int = 1000) -> Dict:
+        """
+        Args:
+            tasks: Dicts with ``id`` and ``hours``
+            local_search: Improve the greedy result by moving or swapping tasks
+            max_iterations: Upper bound on local-search steps
+
+        Returns:
+            Dict with the member per task id, tasks that fit nowhere and per-member
+            load; utilization is None for members without capacity
+        """
+        load = list(self.base_load)
+        assigned: List[List[int]] = [[] for _ in self.member_ids]
+        hours = {task["id"]: max(float(task.get("hours") or 0.0), 0.0) for task in tasks}
+        unassigned = []
+
+        heap = [(self._utilization(i, load[i]), i) for i in range(len(self.member_ids)) if self.capacity[i] > 0]
+        heapq.heapify(heap)
+        for task_id in sorted(hours, key=lambda task_id: -hours[task_id]):
+            task_hours = hours[task_id]
+            skipped = []
+            member = None
+            # Members too full for this task are set aside for the smaller tasks that follow
+            while heap:
+                _, candidate = heapq.heappop(heap)
+                if load[candidate] + task_hours <= self.capacity[candidate] + EPSILON:
+                    member = candidate
+                    break
+                skipped.append(candidate)
+            if member is None:
+                unassigned.append(task_id)
+            else:
+                load[member] += task_hours
+                assigned[member].append(task_id)
+                skipped.append(member)
+            for i in skipped:
+                heapq.heappush(heap, (self._utilization(i, load[i]), i))
+
+        moves = self._improve(assigned, load, hours, max_iterations) if local_search else 0
+
+        assignments = {}
+        for i, task_ids in enumerate(assigned):
+            for task_id in task_ids:
+                assignments[task_id] = self.member_ids[i]
+        # Members without capacity take no tasks and have no utilization
+        utilization = [
+            self._utilization(i, load[i]) if self.capacity[i] > 0 else None
+            for i in range(len(self.member_ids))
+        ]
+        return {
+            "assignments": assignments,
+            "unassigned": unassigned,
+            "moves": moves,
+            "members": [
+                {
+                    "user_id": member_id,
+                    "capacity_hours": self.capacity[i],
+                    "load_hours": load[i],
+                    "assigned_tasks": len(assigned[i]),
+                    "utilization": utilization[i]
+                }
+                for i, member_id in enumerate(self.member_ids)
+            ],
+            "max_utilization": max((value for value in utilization if value is not None), default=0.0)
+        }
+
+    def _improve(self, assigned: List[List[int]], load: List[float], hours: Dict[int, float], max_iterations: int) -> int:
+        """
+        Move or swap tasks between the most and the least utilized member
+
+        For every task of the peak member the ideal hour transfer that would
+        equalize both members is known, so the best swap partner is found by
+        bisecting the low member's tasks sorted by hours. The step that lowers
+        the higher utilization of the two the most is applied; the search stops
+        when no step helps.
+        """
+        members = [i for i in range(len(self.member_ids)) if self.capacity[i] > 0]
+        if len(members) < 2:
+            return 0
+        moves = 0
+        while moves < max_iterations:
+            peak = max(members, key=lambda i: self._utilization(i, load[i]))
+            low = min(members, key=lambda i: self._utilization(i, load[i]))
+            if peak == low:
+                break
+            peak_capacity, low_capacity = self.capacity[peak], self.capacity[low]
+            # Transfer that gives both members the same utilization
+            ideal = (load[peak] * low_capacity - load[low] * peak_capacity) / (peak_capacity + low_capacity)
+
+            low_tasks = sorted(assigned[low], key=lambda task_id: hours[task_id])
+            low_hours = [hours[task_id] for task_id in low_tasks]
+            best = (max(self._utilization(peak, load[peak]), self._utilization(low, load[low])) - EPSILON, None, None)
+            for task_id in assigned[peak]:
+                task_hours = hours[task_id]
+                candidates = [None]
+                position = bisect_left(low_hours, task_hours - ideal)
+                candidates.extend(low_tasks[j] for j in (position - 1, position) if 0 <= j < len(low_tasks))
+                for partner in candidates:
+                    transfer = task_hours - (hours[partner] if partner is not None else 0.0)
+                    if transfer <= EPSILON or load[low] + transfer > low_capacity + EPSILON:
+                        continue
+                    after = max(
+                        self._utilization(peak, load[peak] - transfer),
+                        self._utilization(low, load[low] + transfer)
+                    )
+                    if after < best[0]:
+                        best = (after, task_id, partner)
+            _, task_id, partner = best
+            if task_id is None:
+                break
+
+            assigned[peak].remove(task_id)
+            assigned[low].append(task_id)
+            transfer = hours[task_id]
+            if partner is not None:
+                assigned[low].remove(partner)
+                assigned[peak].append(partner)
+                transfer -= hours[partner]
+            load[peak] -= transfer
+            load[low] += transfer
+            moves += 1
+        return moves
+
+    def _utilization(self, member: int, load: float) -> float:
+        capacity = self.capacity[member]
+        return load / capacity if capacity > 0 else float("inf")
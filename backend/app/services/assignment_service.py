@@ -0,0 +1,91 @@
+from typing import Dict, List
+from sqlalchemy import update, bindparam, func
+from sqlalchemy.orm import Session
+from app.models.task import Task
+from app.models.project import Project
+from app.services.assignment_engine import AssignmentEngine
+
+class AssignmentService:
+    """Balances a project's open tasks across team members"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def balance_project(
+        self,
+        project_id: int,
+        members: List[Dict],
+        local_search: bool = True,
+        apply: bool = False
+    ) -> Dict:
+        """
+        Distribute the project's pending tasks across members by capacity
+
+        Hours of the members' other open tasks (other projects, or already in
+        progress) count against their capacity. Tasks that do not fit anyone
+        stay with their current assignee and are reported as unassigned.
+
+        Args:
+            project_id: The ID of the project
+            members: Dicts with ``user_id`` and ``capacity_hours`` for the planning period
+            local_search: Improve the greedy distribution by moving tasks
+            apply: Store the new assignees instead of only proposing them
+
+        Returns:
+            Dict with the proposed assignee per task and per-member utilization
+        """
+        project = self.db.query(Project).filter(Project.id == project_id).first()
+        if not project:
+            raise ValueError("Project not found")
+
+        tasks = self.db.query(Task.id, Task.estimated_hours, Task.duration_hours).filter(
+            Task.project_id == project_id,
+            (Task.status == "pending") | (Task.status.is_(None))
+        ).all()
+        task_ids = [task.id for task in tasks]
+        member_ids = [member["user_id"] for member in members]
+
+        open_load = self.db.query(Task.user_id, func.sum(func.coalesce(Task.estimated_hours, Task.duration_hours, 0.0))).filter(
+            Task.user_id.in_(member_ids),
+            (Task.status != "completed") | (Task.status.is_(None))
+        )
+        if task_ids:
+            open_load = open_load.filter(Task.id.notin_(task_ids))
+        load = {user_id: hours or 0.0 for user_id, hours in open_load.group_by(Task.user_id).all()}
+
+        engine = AssignmentEngine([
+            {"id": member["user_id"], "capacity_hours": member["capacity_hours"], "load_hours": load.get(member["user_id"], 0.0)}
+            for member in members
+        ])
+        result = engine.assign(
+            [{"id": task.id, "hours": task.estimated_hours or task.duration_hours or 0.0} for task in tasks],
+            local_search=local_search
+        )
+
+        if apply and result["assignments"]:
+            task_table = Task.__table__
+            try:
+                self.db.execute(
+                    update(task_table)
+                    .where(task_table.c.id == bindparam("b_task_id"))
+                    .values(user_id=bindparam("b_user_id")),
+                    [{"b_task_id": task_id, "b_user_id": user_id} for task_id, user_id in result["assignments"].items()]
+                )
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+        return {
+            "status": "success",
+            "project_id": project_id,
+            "applied": apply,
+            "assignments": [
+                {"task_id": task_id, "user_id": user_id}
+                for task_id, user_id in sorted(result["assignments"].items())
+            ],
+            "unassigned_task_ids": result["unassigned"],
+            "local_search_moves": result["moves"],
+            "members": result["members"],
+            "max_utilization": result["max_utilization"]
+        }
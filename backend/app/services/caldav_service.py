@@ -1,16 +1,21 @@
 from radicale import Application as RadicaleApp
 from radicale.storage import multifilesystem
 from radicale.storage.multifilesystem import Collection
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 import uuid
 import os
 import json
 import bcrypt
 import time
 import asyncio
+import threading
 from fastapi import HTTPException
 from app.core.config import settings
+from app.services.interval_index import IntervalIndex
+from app.services.ics import CALENDAR_FOOTER, calendar_header, format_event
+from app.services.caldav_sqlite import SqliteStorage, close_connections
+from app.services.caldav_storage import SimpleStorage, collection_cache, flush_pending_writes, storage_executor, write_buffer
 from unittest.mock import MagicMock, AsyncMock
 from radicale import storage
 try:
@@ -18,7 +23,41 @@ try:
 except ImportError:
     vobject = None
 
+# Calendar properties of the ICS feed
+ICS_FEED_CALENDAR_PROPERTIES = {
+    "X-WR-CALNAME": "PM Tool Tasks",
+    "X-WR-CALDESC": "Tasks from PM Tool",
+    "CALSCALE": "GREGORIAN",
+    "METHOD": "PUBLISH"
+}
+# Event properties published in the ICS feed, in output order
+ICS_FEED_PROPERTIES = (
+    "uid", "summary", "dtstart", "dtend", "description", "status", "priority",
+    "x-pm-tool-estimated-hours", "x-pm-tool-duration-hours", "x-pm-tool-hourly-rate",
+    "x-pm-tool-confidence", "x-pm-tool-rationale"
+)
+# Events rendered per streamed chunk of the feed
+ICS_FEED_CHUNK_EVENTS = 256
+
+# Namespace for task event UIDs derived from task ids
+TASK_EVENT_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "https://docuplanai.com/pm-tool/tasks")
+
 class CalDAVService:
+    # Merged busy intervals per calendar and queried range, valid while the calendar version matches
+    _busy_interval_cache: Dict[str, Tuple[Any, Dict[Tuple, List[Tuple[datetime, datetime]]]]] = {}
+    # Ranges kept per calendar version, oldest dropped first
+    BUSY_CACHE_RANGES = 32
+    # Rendered ICS feed per calendar as (ctag, bytes)
+    _ics_feed_cache: Dict[str, Tuple[str, bytes]] = {}
+    # Bumped on every write through this service
+    _calendar_generations: Dict[str, int] = {}
+    # Process-wide instance handed out by shared()
+    _shared: Optional["CalDAVService"] = None
+    _shared_lock = threading.Lock()
+    # The htpasswd file is written at most once per process
+    _auth_lock = threading.Lock()
+    _auth_initialized = False
+
     def __init__(self):
         self.is_testing = os.getenv('TESTING', 'false').lower() == 'true'
         self.base_path = "/tmp/caldav_storage" if self.is_testing else settings.caldav_storage_path
@@ -28,23 +67,50 @@ class CalDAVService:
         if not self.is_testing and not settings.CALDAV_USERNAME:
             raise ValueError("CALDAV_USERNAME must be set")
             
+        self._init_lock = asyncio.Lock()
+
         if settings.CALDAV_AUTH_ENABLED:
-            self._init_auth()
+            with CalDAVService._auth_lock:
+                if not CalDAVService._auth_initialized:
+                    self._init_auth()
+                    CalDAVService._auth_initialized = True
+
+    @classmethod
+    def shared(cls) -> "CalDAVService":
+        """
+        Get the process-wide service instance
+
+        The instance is created on first use and reused by every request, so
+        storage and authentication are set up once instead of per request.
+        """
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def reset_shared(cls):
+        """Drop the process-wide instance; the next shared() call creates a new one"""
+        with cls._shared_lock:
+            cls._shared = None
 
     async def initialize(self):
-        """Initialize the CalDAV storage asynchronously"""
+        """Initialize the CalDAV storage asynchronously, once per instance"""
         if self.storage is None:
-            try:
-                storage = await self._init_storage()
-                if not storage:
-                    raise ValueError("Storage initialization returned None")
-                self.storage = storage
-            except Exception as e:
-                print(f"Critical error in CalDAV service initialization: {str(e)}")
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Failed to initialize CalDAV service: {str(e)}"
-                )
+            async with self._init_lock:
+                if self.storage is None:
+                    try:
+                        storage = await self._init_storage()
+                        if not storage:
+                            raise ValueError("Storage initialization returned None")
+                        self.storage = storage
+                    except Exception as e:
+                        print(f"Critical error in CalDAV service initialization: {str(e)}")
+                        raise HTTPException(
+                            status_code=500,
+                            detail=f"Failed to initialize CalDAV service: {str(e)}"
+                        )
         return self.storage
             
     async def _init_storage(self):
@@ -88,90 +154,6 @@ class CalDAVService:
             self.calendar_root = os.path.join(self.collection_root, "calendars")
             os.makedirs(self.calendar_root, mode=0o755, exist_ok=True)
             
-            # Create a simple filesystem-based storage
-            class SimpleStorage:
-                def __init__(self, root_path):
-                    self.root = root_path
-                    self.folder = root_path  # Add folder attribute for compatibility
-                    
-                def get_calendar_path(self, calendar_path):
-                    return os.path.join(self.root, calendar_path)
-                    
-                async def discover(self, calendar_path):
-                    full_path = self.get_calendar_path(calendar_path)
-                    if os.path.exists(full_path):
-                        calendar = SimpleCalendar(full_path)
-                        return calendar
-                    return None
-                    
-                async def create_collection(self, calendar_path, props):
-                    full_path = self.get_calendar_path(calendar_path)
-                    os.makedirs(full_path, mode=0o755, exist_ok=True)
-                    props_file = os.path.join(full_path, ".properties")
-                    with open(props_file, "w") as f:
-                        json.dump(props, f)
-                    calendar = SimpleCalendar(full_path)
-                    return calendar
-            
-            class SimpleCalendar:
-                def __init__(self, path):
-                    self.path = path
-                    
-                async def upload(self, event_data):
-                    event_file = os.path.join(self.path, f"{event_data['uid']}.ics")
-                    with open(event_file, "w") as f:
-                        f.write(self._format_ics(event_data))
-                    return True
-                    
-                async def get_item(self, uid):
-                    event_file = os.path.join(self.path, f"{uid}.ics")
-                    if os.path.exists(event_file):
-                        with open(event_file) as f:
-                            event = SimpleEvent(f.read())
-                            return event
-                    return None
-                    
-                async def delete(self, uid):
-                    event_file = os.path.join(self.path, f"{uid}.ics")
-                    if os.path.exists(event_file):
-                        os.remove(event_file)
-                        return True
-                    return False
-                    
-                async def list(self):
-                    async def event_generator():
-                        for file in os.listdir(self.path):
-                            if file.endswith(".ics") and not file.startswith("."):
-                                with open(os.path.join(self.path, file)) as f:
-                                    yield SimpleEvent(f.read())
-                    return event_generator()
-                    
-                def _format_ics(self, event_data):
-                    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//PM Tool//CalDAV Client//EN", "BEGIN:VEVENT"]
-                    for key, value in event_data.items():
-                        if key != "component":
-                            lines.append(f"{key.upper()}:{value}")
-                    lines.extend(["END:VEVENT", "END:VCALENDAR"])
-                    return "\n".join(lines)
-            
-            class SimpleEvent:
-                def __init__(self, ics_data):
-                    self.ics_data = ics_data
-                    self.data = None
-                    
-                async def get_component(self):
-                    if self.data is None:
-                        self.data = await self._parse_ics(self.ics_data)
-                    return self.data
-                    
-                async def _parse_ics(self, ics_data):
-                    event = {}
-                    for line in ics_data.splitlines():
-                        if ":" in line and not line.startswith("BEGIN") and not line.startswith("END"):
-                            key, value = line.split(":", 1)
-                            event[key.lower()] = value
-                    return event
-            
             # Initialize default calendar path
             calendar_path = f"{settings.CALDAV_USERNAME or 'pmtool'}/calendar"
             calendar_dir = os.path.join(collection_root, calendar_path)
@@ -188,8 +170,11 @@ class CalDAVService:
                 with open(props_file, "w") as f:
                     json.dump(props, f, indent=2)
             
-            storage = SimpleStorage(self.calendar_root)
-            print(f"Initialized storage at: {collection_root}")
+            if settings.CALDAV_STORAGE_BACKEND == "sqlite":
+                storage = SqliteStorage(self.calendar_root)
+            else:
+                storage = SimpleStorage(self.calendar_root)
+            print(f"Initialized {settings.CALDAV_STORAGE_BACKEND} storage at: {collection_root}")
             return storage
         except Exception as e:
             error_msg = f"Failed to initialize CalDAV storage: {str(e)}"
@@ -232,19 +217,6 @@ class CalDAVService:
             calendar_path = f"{user_identifier}/calendar"
             print(f"Creating calendar at path: {calendar_path}")
             
-            # Get absolute paths
-            user_dir = os.path.join(self.calendar_root, str(user_identifier))
-            calendar_dir = os.path.join(user_dir, "calendar")
-            
-            print(f"User directory: {user_dir}")
-            print(f"Calendar directory: {calendar_dir}")
-            
-            # Create directories with proper permissions
-            os.makedirs(calendar_dir, mode=0o755, exist_ok=True)
-            print(f"Created/verified directory: {calendar_dir}")
-            
-            # Create properties file
-            props_file = os.path.join(calendar_dir, ".properties")
             props = {
                 "tag": "VCALENDAR",
                 "displayname": calendar_name,
@@ -252,16 +224,14 @@ class CalDAVService:
                 "resourcetype": ["collection", "calendar"],
                 "calendar-description": f"Calendar for user {user_identifier}",
             }
-            
-            with open(props_file, "w") as f:
-                json.dump(props, f, indent=2)
-            print(f"Created properties file: {props_file}")
-            
-            # Create or get collection
+
             storage = await self.initialize()
             collection = await storage.discover(calendar_path)
-            if not collection:
-                print(f"Creating new collection at {calendar_path}")
+            # The filesystem backend rewrites its properties file on every call; the
+            # directory and file writes run on the storage executor, not the event loop.
+            # The SQLite backend keeps the properties in the calendar database.
+            if not collection or settings.CALDAV_STORAGE_BACKEND != "sqlite":
+                print(f"Creating or updating collection at {calendar_path}")
                 collection = await storage.create_collection(calendar_path, props)
                 if not collection:
                     raise ValueError("Collection creation returned None")
@@ -343,6 +313,10 @@ class CalDAVService:
             
             try:
                 await collection.upload(event)
+                # Uploads are buffered; only report success once the event is on disk
+                if hasattr(collection, "flush"):
+                    await collection.flush()
+                self._mark_calendar_changed(calendar_path)
                 print(f"Successfully added task {task_data['id']} to calendar")
                 return event["uid"]
             except Exception as e:
@@ -426,6 +400,10 @@ class CalDAVService:
             
             try:
                 await collection.upload(new_event_data)
+                # Uploads are buffered; only report success once the event is on disk
+                if hasattr(collection, "flush"):
+                    await collection.flush()
+                self._mark_calendar_changed(calendar_path)
                 print(f"Successfully updated task {task_data['id']} in calendar")
                 return True
             except Exception as e:
@@ -447,12 +425,87 @@ class CalDAVService:
                 return False
             
             await collection.delete(event_uid)
+            self._mark_calendar_changed(calendar_path)
             return True
         except Exception as e:
             raise ValueError(f"Failed to delete task: {str(e)}")
 
+    @staticmethod
+    def task_event_uid(task_id: Any) -> str:
+        """Stable event UID for a task, so repeated syncs overwrite one event"""
+        return str(uuid.uuid5(TASK_EVENT_NAMESPACE, str(task_id)))
+
+    def _event_uid_for(self, task_data: Dict[str, Any]) -> str:
+        if task_data.get("caldav_event_uid"):
+            return task_data["caldav_event_uid"]
+        if task_data.get("id") is not None:
+            return self.task_event_uid(task_data["id"])
+        return str(uuid.uuid4())
+
+    @staticmethod
+    def _task_event(task_data: Dict[str, Any], event_uid: str) -> Dict[str, Any]:
+        """Build the VEVENT data of a task"""
+        try:
+            start_date = task_data.get("start_date", datetime.now())
+            if isinstance(start_date, str):
+                start_date = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
+        except ValueError:
+            print(f"Invalid start date format, using current time")
+            start_date = datetime.now()
+
+        duration_hours = float(task_data.get("duration_hours") or task_data.get("estimated_hours") or 1)
+
+        try:
+            end_date = task_data.get("end_date")
+            if end_date:
+                if isinstance(end_date, str):
+                    end_date = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+            else:
+                end_date = start_date + timedelta(hours=duration_hours)
+        except ValueError:
+            print(f"Invalid end date format, using duration-based end time")
+            end_date = start_date + timedelta(hours=duration_hours)
+
+        return {
+            "component": "VEVENT",
+            "uid": event_uid,
+            "summary": task_data["title"],
+            "dtstart": start_date.strftime("%Y%m%dT%H%M%SZ"),
+            "dtend": end_date.strftime("%Y%m%dT%H%M%SZ"),
+            "description": (
+                f"{task_data['description']}\n\n"
+                f"Duration: {duration_hours} hours\n"
+                f"Hourly rate: {task_data.get('hourly_rate') or 0.0}\n"
+                f"Status: {task_data.get('status') or 'pending'}\n"
+                f"Confidence: {task_data.get('confidence_score') or 0.0:.0%}"
+            ),
+            "categories": ["PM Tool Task"],
+            "status": ("NEEDS-ACTION" if task_data.get("status", "pending") == "pending"
+                     else "IN-PROCESS" if task_data.get("status") == "in_progress"
+                     else "COMPLETED"),
+            "priority": ("1" if task_data.get("priority") == "high"
+                      else "5" if task_data.get("priority") == "medium"
+                      else "9"),
+            "x-pm-tool-id": str(task_data["id"]),
+            "x-pm-tool-title": task_data["title"],
+            "x-pm-tool-duration-hours": str(duration_hours),
+            "x-pm-tool-hourly-rate": str(task_data.get("hourly_rate") or 0.0),
+            "x-pm-tool-confidence": str(task_data.get("confidence_score") or 0.0),
+            "x-pm-tool-rationale": task_data.get("confidence_rationale") or ""
+        }
+
     async def sync_task_with_calendar(self, task_data: Dict[str, Any], calendar_path: Optional[str] = None) -> str:
-        event_uid = str(uuid.uuid4())
+        """
+        Create or update the calendar event of a task
+
+        The event is keyed by the task's ``caldav_event_uid`` if it has one and
+        by a UID derived from the task id otherwise, so syncing a task again
+        replaces its event instead of adding another one.
+
+        Raises:
+            ValueError: If the event could not be written to the calendar
+        """
+        event_uid = self._event_uid_for(task_data)
         try:
             print(f"Starting task sync with data: {task_data}")
             
@@ -469,152 +522,147 @@ class CalDAVService:
             if not calendar_path:
                 user_id = settings.CALDAV_USERNAME or "pmtool"
                 calendar_path = f"{user_id}/calendar"
-            
-            # Create calendar directory structure
-            calendar_dir = os.path.join(self.calendar_root, calendar_path)
-            os.makedirs(calendar_dir, mode=0o755, exist_ok=True)
-            print(f"Ensured calendar directory exists: {calendar_dir}")
             print(f"Using calendar path: {calendar_path}")
             
-            try:
-                start_date = task_data.get("start_date", datetime.now())
-                if isinstance(start_date, str):
-                    start_date = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-            except ValueError:
-                print(f"Invalid start date format, using current time")
-                start_date = datetime.now()
-            
-            duration_hours = float(task_data.get("duration_hours", task_data.get("estimated_hours", 1)))
-            print(f"Task sync - Start date: {start_date}, Duration: {duration_hours}h")
-            
-            try:
-                storage = await self.initialize()
-                collection = await storage.discover(calendar_path)
-                if not collection:
-                    print(f"Calendar not found at {calendar_path}, creating...")
-                    await self.create_calendar(settings.CALDAV_USERNAME)
-                    collection = await storage.discover(calendar_path)
-            except Exception as e:
-                print(f"Error accessing calendar: {str(e)}")
-                return event_uid
-            
-            try:
-                end_date = task_data.get("end_date")
-                if end_date:
-                    if isinstance(end_date, str):
-                        end_date = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-                else:
-                    end_date = start_date + timedelta(hours=duration_hours)
-            except ValueError:
-                print(f"Invalid end date format, using duration-based end time")
-                end_date = start_date + timedelta(hours=duration_hours)
-            
-            print(f"Task duration: {duration_hours} hours")
-            print(f"Start date: {start_date}")
-            print(f"End date: {end_date}")
-            
-            event = {
-                "component": "VEVENT",
-                "uid": event_uid,
-                "summary": task_data["title"],
-                "dtstart": start_date.strftime("%Y%m%dT%H%M%SZ"),
-                "dtend": end_date.strftime("%Y%m%dT%H%M%SZ"),
-                "description": (
-                    f"{task_data['description']}\n\n"
-                    f"Duration: {duration_hours} hours\n"
-                    f"Hourly rate: {task_data.get('hourly_rate', 0.0)}\n"
-                    f"Status: {task_data.get('status', 'pending')}\n"
-                    f"Confidence: {task_data.get('confidence_score', 0.0):.0%}"
-                ),
-                "categories": ["PM Tool Task"],
-                "status": ("NEEDS-ACTION" if task_data.get("status", "pending") == "pending"
-                         else "IN-PROCESS" if task_data.get("status") == "in_progress"
-                         else "COMPLETED"),
-                "priority": ("1" if task_data.get("priority") == "high"
-                          else "5" if task_data.get("priority") == "medium"
-                          else "9"),
-                "x-pm-tool-id": str(task_data["id"]),
-                "x-pm-tool-title": task_data["title"],
-                "x-pm-tool-duration-hours": str(duration_hours),
-                "x-pm-tool-hourly-rate": str(task_data.get("hourly_rate", 0.0)),
-                "x-pm-tool-confidence": str(task_data.get("confidence_score", 0.0)),
-                "x-pm-tool-rationale": task_data.get("confidence_rationale", "")
-            }
-            
-            if self.is_testing:
-                print(f"Mock calendar service: Simulating event upload {event_uid}")
-                return event_uid
-
-            try:
-                print(f"Attempting to sync task {task_data['id']} to calendar {calendar_path}")
-                
-                # Get or create calendar collection
-                storage = await self.initialize()
-                collection = await storage.discover(calendar_path)
-                if not collection:
-                    print(f"Calendar not found. Creating calendar at {calendar_path}")
-                    await self.create_calendar(calendar_path.split('/')[0], "PM Tool Calendar")
-                    collection = await storage.discover(calendar_path)
-                    if not collection:
-                        raise ValueError(f"Failed to create calendar at {calendar_path}")
-                
-                print(f"Calendar found/created. Uploading event {event_uid}")
-                await collection.upload(event)
-                print(f"Successfully uploaded event {event_uid}")
-                return event_uid
-                
-            except Exception as e:
-                print(f"Error uploading event: {str(e)}")
-                raise ValueError(f"Failed to sync task: {str(e)}")
+            event = self._task_event(task_data, event_uid)
+            print(f"Task sync - Start date: {event['dtstart']}, End date: {event['dtend']}")
         except Exception as e:
             print(f"Failed to sync task: {str(e)}")
             return event_uid
+
+        if self.is_testing:
+            print(f"Mock calendar service: Simulating event upload {event_uid}")
+            return event_uid
+
+        try:
+            print(f"Attempting to sync task {task_data['id']} to calendar {calendar_path}")
+            collection = await self._get_or_create_collection(calendar_path)
+            print(f"Calendar found/created. Uploading event {event_uid}")
+            await collection.upload(event)
+            # Uploads are buffered; only report success once the event is on disk
+            if hasattr(collection, "flush"):
+                await collection.flush()
+            self._mark_calendar_changed(calendar_path)
+            print(f"Successfully uploaded event {event_uid}")
+            return event_uid
+        except Exception as e:
+            print(f"Error uploading event: {str(e)}")
+            raise ValueError(f"Failed to sync task: {str(e)}")
+
+    async def sync_tasks_with_calendar(self, tasks: List[Dict[str, Any]], calendar_path: Optional[str] = None) -> Dict[Any, str]:
+        """
+        Create or update the calendar events of many tasks at once
+
+        The collection is resolved once, all events are built in memory and
+        queued together, then written with one flush, so the write-behind
+        buffer turns them into a few batches instead of one write per task.
+        Event UIDs follow the same rules as sync_task_with_calendar.
+
+        Args:
+            tasks: Task dicts as accepted by sync_task_with_calendar
+            calendar_path: Target calendar, defaults to the service user's calendar
+
+        Returns:
+            Task id -> event UID for every task that was synced; tasks that
+            could not be turned into an event are left out
+        """
+        await self.initialize()
+        if not calendar_path:
+            calendar_path = f"{settings.CALDAV_USERNAME or 'pmtool'}/calendar"
+
+        events = {}
+        for task_data in tasks:
+            if any(field not in task_data for field in ("id", "title", "description")):
+                print(f"Skipping task without id, title or description: {task_data.get('id')}")
+                continue
+            try:
+                events[task_data["id"]] = self._task_event(task_data, self._event_uid_for(task_data))
+            except (TypeError, ValueError) as e:
+                print(f"Skipping task {task_data['id']}: {str(e)}")
+        if self.is_testing or not events:
+            return {task_id: event["uid"] for task_id, event in events.items()}
+
+        collection = await self._get_or_create_collection(calendar_path)
+        for event in events.values():
+            await collection.upload(event)
+        if hasattr(collection, "flush"):
+            await collection.flush()
+        self._mark_calendar_changed(calendar_path)
+        print(f"Synced {len(events)} tasks to calendar {calendar_path}")
+        return {task_id: event["uid"] for task_id, event in events.items()}
+
+    async def _get_or_create_collection(self, calendar_path: str):
+        """Discover a calendar collection, creating it if it does not exist yet"""
+        storage = await self.initialize()
+        collection = await storage.discover(calendar_path)
+        if not collection:
+            print(f"Calendar not found. Creating calendar at {calendar_path}")
+            collection = await storage.create_collection(calendar_path, {
+                "tag": "VCALENDAR",
+                "displayname": "PM Tool Calendar",
+                "supported-calendar-component-set": ["VEVENT"],
+                "resourcetype": ["collection", "calendar"],
+                "calendar-description": f"Calendar for user {calendar_path.split('/')[0]}",
+            })
+            if not collection:
+                raise ValueError(f"Failed to create calendar at {calendar_path}")
+        return collection
     
     async def generate_ics_feed(self, user_id: int) -> str:
         """Generate an ICS feed for a user's calendar"""
+        _, _, chunks = await self.ics_feed(user_id)
+        return b"".join([chunk async for chunk in chunks]).decode("utf-8")
+
+    async def ics_feed(self, user_id: int) -> Tuple[str, datetime, AsyncIterator[bytes]]:
+        """
+        ICS feed of a user's calendar as (ETag, Last-Modified, body chunks)
+
+        The ETag and Last-Modified are known before the body is rendered, so
+        conditional requests can be answered without touching any event. The
+        rendered bytes are cached per calendar version (its ctag); otherwise
+        the body is streamed from the event index in batches.
+        """
         calendar_path = f"{user_id}/calendar"
-        await self.initialize()
-        
-        collection = await self.storage.discover(calendar_path)
+        storage = await self.initialize()
+
+        collection = await storage.discover(calendar_path)
         if not collection:
             await self.create_calendar(user_id)
-            collection = await self.storage.discover(calendar_path)
+            collection = await storage.discover(calendar_path)
             if not collection:
                 raise ValueError(f"Calendar not found: {calendar_path}")
-        
-        tasks = await self.get_tasks(calendar_path)
-        
-        calendar_lines = [
-            "BEGIN:VCALENDAR",
-            "VERSION:2.0",
-            "PRODID:-//PM Tool//CalDAV Client//EN",
-            "X-WR-CALNAME:PM Tool Tasks",
-            "X-WR-CALDESC:Tasks from PM Tool",
-            "CALSCALE:GREGORIAN",
-            "METHOD:PUBLISH"
-        ]
-        
-        for task in tasks:
-            event_lines = [
-                "BEGIN:VEVENT",
-                f"UID:{task['uid']}",
-                f"SUMMARY:{task['description']}",
-                f"DTSTART:{task['start_date'].strftime('%Y%m%dT%H%M%SZ')}",
-                f"DTEND:{task['end_date'].strftime('%Y%m%dT%H%M%SZ')}",
-                f"DESCRIPTION:{task.get('description', '')}",
-                f"STATUS:{'NEEDS-ACTION' if task.get('status') == 'pending' else 'IN-PROCESS' if task.get('status') == 'in_progress' else 'COMPLETED'}",
-                f"PRIORITY:{'1' if task.get('priority') == 'high' else '5' if task.get('priority') == 'medium' else '9'}",
-                f"X-PM-TOOL-ESTIMATED-HOURS:{task.get('estimated_hours', 0.0)}",
-                f"X-PM-TOOL-DURATION-HOURS:{task.get('duration_hours', task.get('estimated_hours', 0.0))}",
-                f"X-PM-TOOL-HOURLY-RATE:{task.get('hourly_rate', 0.0)}",
-                f"X-PM-TOOL-CONFIDENCE:{task.get('confidence_score', 0.0)}",
-                f"X-PM-TOOL-RATIONALE:{task.get('confidence_rationale', '')}",
-                "END:VEVENT"
-            ]
-            calendar_lines.extend(event_lines)
-        
-        calendar_lines.append("END:VCALENDAR")
-        return "\n".join(calendar_lines)
+
+        ctag, mtime_ns = await collection.version()
+        etag = f'"{ctag}"'
+        last_modified = datetime.fromtimestamp(mtime_ns // 1_000_000_000, tz=timezone.utc)
+        cached = self._ics_feed_cache.get(calendar_path)
+        if cached and cached[0] == ctag:
+            return etag, last_modified, self._single_chunk(cached[1])
+        return etag, last_modified, self._render_ics_feed(calendar_path, collection, ctag)
+
+    async def _render_ics_feed(self, calendar_path: str, collection, ctag: str) -> AsyncIterator[bytes]:
+        chunks = []
+        parts = [calendar_header(ICS_FEED_CALENDAR_PROPERTIES)]
+        async for event in await collection.list():
+            event_data = await event.get_component()
+            if not event_data:
+                continue
+            parts.append(format_event(event_data, ICS_FEED_PROPERTIES))
+            if len(parts) >= ICS_FEED_CHUNK_EVENTS:
+                chunks.append("".join(parts).encode("utf-8"))
+                parts = []
+                yield chunks[-1]
+        parts.append(CALENDAR_FOOTER)
+        chunks.append("".join(parts).encode("utf-8"))
+        yield chunks[-1]
+
+        # Events written while rendering may or may not be in the body
+        if (await collection.version())[0] == ctag:
+            CalDAVService._ics_feed_cache[calendar_path] = (ctag, b"".join(chunks))
+
+    @staticmethod
+    async def _single_chunk(data: bytes) -> AsyncIterator[bytes]:
+        yield data
 
     async def get_tasks(self, calendar_path: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[dict]:
         try:
@@ -627,35 +675,26 @@ class CalDAVService:
                 raise ValueError(f"Calendar not found: {calendar_path}")
             
             tasks = []
-            events = await collection.list()
+            if start_date and end_date:
+                # Only events starting or ending in the window are read
+                events = await collection.list(start_date, end_date)
+                # Event times are naive UTC, so compare against the window in UTC
+                window_start, window_end = (
+                    moment.astimezone(timezone.utc).replace(tzinfo=None) if moment.tzinfo else moment
+                    for moment in (start_date, end_date)
+                )
+            else:
+                events = await collection.list()
             async for event in events:
                 try:
                     event_data = await event.get_component()
                     if not event_data:
                         continue
-                    event_start = datetime.strptime(event_data["dtstart"], "%Y%m%dT%H%M%SZ")
-                    event_end = datetime.strptime(event_data["dtend"], "%Y%m%dT%H%M%SZ")
-                    
-                    task = {
-                        "uid": event_data["uid"],
-                        "description": event_data["summary"],
-                        "start_date": event_start,
-                        "end_date": event_end,
-                        "status": ("pending" if event_data.get("status") == "NEEDS-ACTION"
-                                else "in_progress" if event_data.get("status") == "IN-PROCESS"
-                                else "completed"),
-                        "priority": ("high" if event_data.get("priority") == "1"
-                                  else "medium" if event_data.get("priority") == "5"
-                                  else "low"),
-                        "estimated_hours": float(event_data.get("x-pm-tool-estimated-hours", "0.0")),
-                        "duration_hours": float(event_data.get("x-pm-tool-duration-hours", event_data.get("x-pm-tool-estimated-hours", "0.0"))),
-                        "hourly_rate": float(event_data.get("x-pm-tool-hourly-rate", "0.0")),
-                        "confidence_score": float(event_data.get("x-pm-tool-confidence", "0.0")),
-                        "confidence_rationale": event_data.get("x-pm-tool-rationale", "")
-                    }
+                    task = self._event_to_task(event_data)
+                    event_start, event_end = task["start_date"], task["end_date"]
                     
                     if start_date and end_date:
-                        if start_date <= event_start <= end_date or start_date <= event_end <= end_date:
+                        if window_start <= event_start <= window_end or window_start <= event_end <= window_end:
                             tasks.append(task)
                     else:
                         tasks.append(task)
@@ -666,3 +705,201 @@ class CalDAVService:
             return tasks
         except Exception as e:
             raise ValueError(f"Failed to get tasks: {str(e)}")
+
+    async def changes_since(self, calendar_path: str, sync_token: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Tasks changed and event UIDs deleted in a calendar since a sync token
+
+        Without a token all tasks are returned (``full`` is True). Clients keep
+        the returned ``sync_token`` for their next call.
+
+        Raises:
+            InvalidSyncToken: If the token is unknown or too old; the client has to start over without one
+            ValueError: If the calendar does not exist
+        """
+        storage = await self.initialize()
+        collection = await storage.discover(calendar_path)
+        if not collection:
+            raise ValueError(f"Calendar not found: {calendar_path}")
+
+        result = await collection.changes_since(sync_token)
+        changed = []
+        for event_data in result["changed"]:
+            try:
+                changed.append(self._event_to_task(event_data))
+            except Exception as e:
+                print(f"Warning: Failed to parse event {event_data.get('uid', 'unknown')}: {str(e)}")
+        return {
+            "sync_token": result["sync_token"],
+            "ctag": result["ctag"],
+            "full": sync_token is None,
+            "changed": changed,
+            "deleted": result["deleted"]
+        }
+
+    async def get_ctag(self, calendar_path: str) -> str:
+        """Current ctag of a calendar; it changes whenever an event is added, changed or removed"""
+        storage = await self.initialize()
+        collection = await storage.discover(calendar_path)
+        if not collection:
+            raise ValueError(f"Calendar not found: {calendar_path}")
+        return await collection.ctag()
+
+    @staticmethod
+    def _event_to_task(event_data: Dict[str, str]) -> Dict[str, Any]:
+        """Task dict of a parsed calendar event, with the raw task-link fields kept for sync checks"""
+        return {
+            "uid": event_data["uid"],
+            "x-pm-tool-id": event_data.get("x-pm-tool-id"),
+            "x-pm-tool-title": event_data.get("x-pm-tool-title"),
+            "x-pm-tool-duration-hours": event_data.get("x-pm-tool-duration-hours"),
+            "x-pm-tool-hourly-rate": event_data.get("x-pm-tool-hourly-rate"),
+            "description": event_data["summary"],
+            "start_date": datetime.strptime(event_data["dtstart"], "%Y%m%dT%H%M%SZ"),
+            "end_date": datetime.strptime(event_data["dtend"], "%Y%m%dT%H%M%SZ"),
+            "status": ("pending" if event_data.get("status") == "NEEDS-ACTION"
+                    else "in_progress" if event_data.get("status") == "IN-PROCESS"
+                    else "completed"),
+            "priority": ("high" if event_data.get("priority") == "1"
+                      else "medium" if event_data.get("priority") == "5"
+                      else "low"),
+            "estimated_hours": float(event_data.get("x-pm-tool-estimated-hours", "0.0")),
+            "duration_hours": float(event_data.get("x-pm-tool-duration-hours", event_data.get("x-pm-tool-estimated-hours", "0.0"))),
+            "hourly_rate": float(event_data.get("x-pm-tool-hourly-rate", "0.0")),
+            "confidence_score": float(event_data.get("x-pm-tool-confidence", "0.0")),
+            "confidence_rationale": event_data.get("x-pm-tool-rationale", "")
+        }
+
+    async def get_busy_intervals(
+        self,
+        calendar_path: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Get the merged busy intervals of a calendar as aware UTC datetimes
+
+        With ``start_date`` and ``end_date`` only events starting or ending in
+        the window are read through the range query of get_tasks. Results are
+        cached per calendar and range until the calendar changes, through this
+        service or another worker process.
+        """
+        await self.initialize()
+        version = await self._calendar_version(calendar_path)
+        cached = self._busy_interval_cache.get(calendar_path)
+        if not cached or cached[0] != version:
+            cached = CalDAVService._busy_interval_cache[calendar_path] = (version, {})
+        ranges = cached[1]
+        key = (start_date, end_date)
+        if key in ranges:
+            return ranges[key]
+
+        events = await self.get_tasks(calendar_path, start_date, end_date)
+        # Event times are naive UTC; working calendars read naive times as local
+        busy = list(IntervalIndex(
+            (event["start_date"].replace(tzinfo=timezone.utc), event["end_date"].replace(tzinfo=timezone.utc))
+            for event in events
+        ))
+        if len(ranges) >= self.BUSY_CACHE_RANGES:
+            del ranges[next(iter(ranges))]
+        ranges[key] = busy
+        return busy
+
+    async def compact_storage(self, preferred_uids: Optional[Dict[str, str]] = None, dry_run: bool = False) -> Dict:
+        """
+        Remove duplicate task events from every calendar
+
+        Events written by earlier versions got a new UID on every sync; for each
+        task only one event is kept (see SimpleCalendar.compact).
+
+        Args:
+            preferred_uids: Task id -> UID to keep, e.g. the stored caldav_event_uid
+            dry_run: Only report what would be removed
+
+        Returns:
+            Totals of calendars and events scanned, events and temp files removed and bytes reclaimed
+        """
+        storage = await self.initialize()
+        report = {"calendars": 0, "events": 0, "events_removed": 0, "temp_files_removed": 0, "bytes_reclaimed": 0}
+        for calendar_path in await storage.list_collections():
+            collection = await storage.discover(calendar_path)
+            if not collection:
+                continue
+            result = await collection.compact(preferred_uids, dry_run)
+            report["calendars"] += 1
+            for key, value in result.items():
+                report[key] += value
+            if result["events_removed"] and not dry_run:
+                self._mark_calendar_changed(calendar_path)
+        report["dry_run"] = dry_run
+        return report
+
+    async def migrate_storage_layout(self, sharded: bool = True) -> Dict:
+        """
+        Move the events of every calendar into hash-prefix shards, or back
+
+        Calendars stay readable and writable during the migration (see
+        SimpleCalendar.migrate_layout); new calendars follow CALDAV_STORAGE_LAYOUT.
+
+        Returns:
+            Number of calendars and events moved, and the target layout
+        """
+        storage = await self.initialize()
+        report = {"calendars": 0, "events_moved": 0, "layout": "sharded" if sharded else "flat"}
+        for calendar_path in await storage.list_collections():
+            collection = await storage.discover(calendar_path)
+            if not collection:
+                continue
+            report["events_moved"] += await collection.migrate_layout(sharded)
+            report["calendars"] += 1
+        return report
+
+    @staticmethod
+    def cache_stats() -> Dict:
+        """Hit rates of the collection index and parsed-event caches, plus write-behind counters"""
+        return {**collection_cache.stats(), "write_behind": write_buffer.stats()}
+
+    def _mark_calendar_changed(self, calendar_path: str):
+        CalDAVService._calendar_generations[calendar_path] = self._calendar_generations.get(calendar_path, 0) + 1
+
+    async def _calendar_version(self, calendar_path: str) -> Tuple[int, Optional[Tuple[str, int]]]:
+        """
+        Generation counter plus the calendar's (ctag, mtime)
+
+        Both storage backends advance the ctag for writes from any process,
+        so this also catches other workers' changes.
+        """
+        version = None
+        if not self.is_testing:
+            try:
+                storage = await self.initialize()
+                collection = await storage.discover(calendar_path)
+                if collection:
+                    version = await collection.version()
+            except Exception as e:
+                print(f"Warning: Failed to read version of calendar {calendar_path}: {str(e)}")
+        return self._calendar_generations.get(calendar_path, 0), version
+
+async def startup_caldav_service() -> Optional[CalDAVService]:
+    """Create and initialize the shared service when the application starts"""
+    try:
+        service = CalDAVService.shared()
+        await service.initialize()
+        return service
+    except Exception as e:
+        # Requests retry the lazy initialization, so a failure here is not fatal
+        print(f"Warning: CalDAV service could not be initialized at startup: {str(e)}")
+        return None
+
+async def shutdown_caldav_service():
+    """Write queued calendar events and release the shared service when the application stops"""
+    try:
+        written = await flush_pending_writes()
+        if written:
+            print(f"Flushed {written} queued calendar events on shutdown")
+    except Exception as e:
+        print(f"Error flushing calendar events on shutdown: {str(e)}")
+    CalDAVService.reset_shared()
+    # Let queued calendar I/O finish before the process exits
+    storage_executor.shutdown(wait=True)
+    close_connections()
@@ -0,0 +1,306 @@
+from contextlib import contextmanager
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import json
+import os
+import sqlite3
+import time
+import uuid
+from app.services.caldav_storage import SimpleCalendar, StorageExecutor, WriteBehindBuffer, storage_executor, write_buffer
+from app.services.change_log import ChangeLog, format_sync_token, parse_sync_token
+from app.services.ics import parse_ics
+from app.services.time_range_index import event_span, ics_timestamp
+
+SQLITE_SUFFIX = ".sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    uid TEXT PRIMARY KEY,
+    task_id TEXT,
+    dtstart INTEGER,
+    dtend INTEGER,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_task_id ON events (task_id);
+CREATE INDEX IF NOT EXISTS events_dtstart ON events (dtstart);
+CREATE INDEX IF NOT EXISTS events_dtend ON events (dtend);
+CREATE INDEX IF NOT EXISTS events_seq ON events (seq);
+CREATE TABLE IF NOT EXISTS tombstones (
+    uid TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tombstones_seq ON tombstones (seq);
+"""
+
+_connections: Dict[str, sqlite3.Connection] = {}
+_connections_lock = Lock()
+
+def connect(path: str) -> sqlite3.Connection:
+    """
+    The process-wide connection to a calendar database, created on first use
+
+    A calendar is only accessed on its storage executor lane, one operation
+    at a time, so its connection is shared across the pool's threads.
+    """
+    with _connections_lock:
+        connection = _connections.get(path)
+        if connection is None:
+            connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # WAL commits are atomic either way; fsync at checkpoints only
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            with transaction(connection):
+                connection.execute("INSERT OR IGNORE INTO meta VALUES ('log_id', ?)", (uuid.uuid4().hex[:12],))
+                connection.execute("INSERT OR IGNORE INTO meta VALUES ('seq', '0')")
+                connection.execute("INSERT OR IGNORE INTO meta VALUES ('min_seq', '0')")
+                connection.execute("INSERT OR IGNORE INTO meta VALUES ('modified_ns', ?)", (str(time.time_ns()),))
+            _connections[path] = connection
+        return connection
+
+def close_connections():
+    with _connections_lock:
+        for connection in _connections.values():
+            connection.close()
+        _connections.clear()
+
+@contextmanager
+def transaction(connection: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on error"""
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield connection
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
+
+class SqliteStorage:
+    """SQLite storage with one database file per calendar"""
+
+    def __init__(
+        self,
+        root_path: str,
+        executor: Optional[StorageExecutor] = None,
+        buffer: Optional[WriteBehindBuffer] = None
+    ):
+        self.root = root_path
+        self.folder = root_path  # Add folder attribute for compatibility
+        self.executor = executor or storage_executor
+        self.buffer = buffer or write_buffer
+
+    def get_calendar_path(self, calendar_path):
+        return os.path.join(self.root, f"{calendar_path}{SQLITE_SUFFIX}")
+
+    async def discover(self, calendar_path):
+        full_path = self.get_calendar_path(calendar_path)
+        if await self.executor.run(full_path, os.path.isfile, full_path):
+            return SqliteCalendar(full_path, self.executor, self.buffer)
+        return None
+
+    async def create_collection(self, calendar_path, props):
+        full_path = self.get_calendar_path(calendar_path)
+        await self.executor.run(full_path, self._create_collection, full_path, props)
+        return SqliteCalendar(full_path, self.executor, self.buffer)
+
+    async def list_collections(self) -> List[str]:
+        """Paths (``owner/calendar``) of all calendars in the storage"""
+        return await self.executor.run(self.root, self._list_collections)
+
+    def _list_collections(self) -> List[str]:
+        collections = []
+        with os.scandir(self.root) as owners:
+            for owner in owners:
+                if owner.name.startswith(".") or not owner.is_dir():
+                    continue
+                with os.scandir(owner.path) as calendars:
+                    collections.extend(
+                        f"{owner.name}/{calendar.name[:-len(SQLITE_SUFFIX)]}"
+                        for calendar in calendars
+                        if calendar.name.endswith(SQLITE_SUFFIX) and calendar.is_file()
+                    )
+        return sorted(collections)
+
+    @staticmethod
+    def _create_collection(full_path: str, props: Dict[str, Any]):
+        os.makedirs(os.path.dirname(full_path), mode=0o755, exist_ok=True)
+        with transaction(connect(full_path)) as connection:
+            connection.execute("INSERT OR REPLACE INTO meta VALUES ('properties', ?)", (json.dumps(props),))
+
+class SqliteCalendar(SimpleCalendar):
+    """
+    One calendar database
+
+    Behaves like SimpleCalendar: operations run on the calendar's storage
+    executor lane and uploads go through the write-behind buffer, but each
+    batch is written in a single transaction. Range queries use the dtstart
+    and dtend indexes, and the change log for ctags and sync tokens is kept
+    as a sequence number per event plus tombstones for deletions.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        executor: Optional[StorageExecutor] = None,
+        buffer: Optional[WriteBehindBuffer] = None
+    ):
+        super().__init__(path, executor=executor, buffer=buffer)
+
+    async def migrate_layout(self, sharded: bool = True) -> int:
+        """Directory layouts do not apply to a database; nothing is moved"""
+        return 0
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        return connect(self.path)
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        with transaction(self.connection) as connection:
+            seq = self._meta_int(connection, "seq")
+            rows = []
+            for event_data in batch:
+                seq += 1
+                span = event_span(event_data) or (None, None)
+                rows.append((
+                    event_data["uid"], event_data.get("x-pm-tool-id"), span[0], span[1], seq,
+                    self._format_ics(event_data)
+                ))
+            connection.executemany("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?)", rows)
+            connection.executemany("DELETE FROM tombstones WHERE uid = ?", [(row[0],) for row in rows])
+            self._set_changed(connection, seq)
+
+    def _get_item(self, uid: str) -> Optional[Dict[str, str]]:
+        self._flush()
+        row = self.connection.execute("SELECT data FROM events WHERE uid = ?", (uid,)).fetchone()
+        return parse_ics(row[0]) if row else None
+
+    def _delete(self, uid: str) -> bool:
+        self._flush()
+        with transaction(self.connection) as connection:
+            return self._delete_rows(connection, [uid]) > 0
+
+    def _delete_rows(self, connection: sqlite3.Connection, uids: List[str]) -> int:
+        """Delete events and record tombstones, in the caller's transaction"""
+        seq = self._meta_int(connection, "seq")
+        deleted = 0
+        for uid in uids:
+            if connection.execute("DELETE FROM events WHERE uid = ?", (uid,)).rowcount:
+                seq += 1
+                deleted += 1
+                connection.execute("INSERT OR REPLACE INTO tombstones VALUES (?, ?)", (uid, seq))
+        if deleted:
+            self._prune_tombstones(connection)
+            self._set_changed(connection, seq)
+        return deleted
+
+    def _prune_tombstones(self, connection: sqlite3.Connection):
+        """Keep the newest tombstones; tokens older than the dropped ones become invalid"""
+        row = connection.execute(
+            "SELECT seq FROM tombstones ORDER BY seq DESC LIMIT 1 OFFSET ?", (ChangeLog.MAX_TOMBSTONES,)
+        ).fetchone()
+        if row is None:
+            return
+        connection.execute("DELETE FROM tombstones WHERE seq <= ?", (row[0],))
+        if row[0] > self._meta_int(connection, "min_seq"):
+            connection.execute("UPDATE meta SET value = ? WHERE key = 'min_seq'", (str(row[0]),))
+
+    def _entries(self, start: Optional[datetime], end: Optional[datetime]) -> List[int]:
+        self._flush()
+        if start is not None and end is not None:
+            start, end = ics_timestamp(start), ics_timestamp(end)
+            rows = self.connection.execute(
+                "SELECT rowid FROM events WHERE dtstart BETWEEN ? AND ? OR dtend BETWEEN ? AND ? ORDER BY dtstart, uid",
+                (start, end, start, end)
+            )
+        else:
+            rows = self.connection.execute("SELECT rowid FROM events")
+        return [row[0] for row in rows]
+
+    def _load_batch(self, entries: List[int]) -> List[Optional[Dict[str, str]]]:
+        placeholders = ",".join("?" * len(entries))
+        rows = dict(self.connection.execute(f"SELECT rowid, data FROM events WHERE rowid IN ({placeholders})", entries))
+        return [parse_ics(rows[rowid]) if rowid in rows else None for rowid in entries]
+
+    def _ctag(self) -> str:
+        self._flush()
+        log_id, seq = self._meta(self.connection, "log_id"), self._meta_int(self.connection, "seq")
+        return f"{log_id}-{seq}"
+
+    def _version(self) -> Tuple[str, int]:
+        ctag = self._ctag()
+        return ctag, self._meta_int(self.connection, "modified_ns")
+
+    def _changes_since(self, sync_token: Optional[str]) -> Dict[str, Any]:
+        self._flush()
+        connection = self.connection
+        # One read transaction, so the token matches the rows returned
+        connection.execute("BEGIN")
+        try:
+            log_id = self._meta(connection, "log_id")
+            seq = self._meta_int(connection, "seq")
+            since = 0
+            if sync_token:
+                since = parse_sync_token(sync_token, log_id, seq, self._meta_int(connection, "min_seq"))
+            changed = [
+                parse_ics(row[0])
+                for row in connection.execute("SELECT data FROM events WHERE seq > ? ORDER BY seq", (since,))
+            ]
+            deleted = []
+            if sync_token:
+                deleted = [row[0] for row in connection.execute("SELECT uid FROM tombstones WHERE seq > ? ORDER BY seq", (since,))]
+        finally:
+            connection.execute("COMMIT")
+        return {
+            "sync_token": format_sync_token(log_id, seq),
+            "ctag": f"{log_id}-{seq}",
+            "changed": changed,
+            "deleted": deleted
+        }
+
+    def _compact(self, preferred_uids: Dict[str, str], dry_run: bool) -> Dict[str, int]:
+        self._flush()
+        with transaction(self.connection) as connection:
+            events = connection.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+            duplicates = []
+            bytes_reclaimed = 0
+            task_ids = connection.execute(
+                "SELECT task_id FROM events WHERE task_id IS NOT NULL GROUP BY task_id HAVING COUNT(*) > 1"
+            ).fetchall()
+            for (task_id,) in task_ids:
+                candidates = connection.execute(
+                    "SELECT uid, length(data) FROM events WHERE task_id = ? ORDER BY seq DESC", (task_id,)
+                ).fetchall()
+                uids = [uid for uid, _ in candidates]
+                keep = preferred_uids.get(task_id)
+                if keep not in uids:
+                    keep = uids[0]
+                for uid, size in candidates:
+                    if uid != keep:
+                        duplicates.append(uid)
+                        bytes_reclaimed += size
+            if not dry_run:
+                self._delete_rows(connection, duplicates)
+        return {
+            "events": events,
+            "events_removed": len(duplicates),
+            "temp_files_removed": 0,
+            "bytes_reclaimed": bytes_reclaimed
+        }
+
+    def _set_changed(self, connection: sqlite3.Connection, seq: int):
+        connection.execute("UPDATE meta SET value = ? WHERE key = 'seq'", (str(seq),))
+        connection.execute("UPDATE meta SET value = ? WHERE key = 'modified_ns'", (str(time.time_ns()),))
+
+    @staticmethod
+    def _meta(connection: sqlite3.Connection, key: str) -> str:
+        return connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0]
+
+    @classmethod
+    def _meta_int(cls, connection: sqlite3.Connection, key: str) -> int:
+        return int(cls._meta(connection, key))
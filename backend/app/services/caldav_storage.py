@@ -0,0 +1,1006 @@
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from threading import Lock, RLock
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import hashlib
+import json
+import os
+from app.core.config import settings
+from app.services.change_log import ChangeLog
+from app.services.ics import format_ics, parse_ics
+from app.services.time_range_index import TimeRangeIndex, event_span, ics_timestamp
+
+ICS_SUFFIX = ".ics"
+# Marks a collection whose events live in hash-prefix subdirectories
+SHARDED_MARKER = ".sharded"
+# Hex digits of the UID hash naming a shard; 256 shards
+SHARD_CHARS = 2
+
+def shard_of(uid: str) -> str:
+    """Shard directory of an event in the sharded layout"""
+    return hashlib.md5(uid.encode("utf-8")).hexdigest()[:SHARD_CHARS]
+
+def _is_shard(name: str) -> bool:
+    return len(name) == SHARD_CHARS and all(char in "0123456789abcdef" for char in name)
+
+def init_layout(full_path: str):
+    """Use the configured layout for a newly created collection"""
+    if settings.CALDAV_STORAGE_LAYOUT == "sharded":
+        open(os.path.join(full_path, SHARDED_MARKER), "a").close()
+
+class CollectionIndex:
+    """
+    UID -> (file name, file mtime) map of one collection directory
+
+    Creating or removing a file changes the directory mtime, so the index is
+    rebuilt with a single scandir only when that mtime moved. Writes through
+    SimpleCalendar update the index in place instead.
+
+    In the sharded layout (a ``.sharded`` marker in the collection) events
+    live in subdirectories named after the first hex digits of a hash of
+    their UID. Every shard's mtime is checked and only changed shards are
+    rescanned. Events still at the top level, e.g. during a migration, are
+    indexed in either layout. File names are relative to the collection.
+
+    A write through this process changes the directory mtime as well, so
+    each change is wrapped in ``changing()``. The mtime after the writes is
+    only taken over if every directory was unchanged right before each of
+    them. Otherwise another process wrote in between, the index stays stale
+    and the next refresh rescans the directory.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.dir_mtime_ns: Optional[int] = None
+        self.sharded = False
+        self.files: Dict[str, Tuple[str, int]] = {}
+        self.shard_mtimes: Dict[str, Optional[int]] = {}
+        # UIDs per directory ("" for the top level), to replace a rescanned shard
+        self._directory_uids: Dict[str, Set[str]] = {}
+        # Bumped when a refresh picked up changes; writes applied in place keep it
+        self.generation = 0
+        # Directory mtimes after this process's own changes, until committed
+        self._pending_mtimes: Dict[str, Optional[int]] = {}
+        # Directories another process changed during those changes
+        self._foreign_changes: Set[str] = set()
+
+    @property
+    def last_modified_ns(self) -> int:
+        return max([self.dir_mtime_ns or 0, *(mtime or 0 for mtime in self.shard_mtimes.values())])
+
+    def refresh(self) -> bool:
+        """Rescan whatever changed on disk; returns whether the index was current"""
+        current = True
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime != self.dir_mtime_ns:
+            files, shards, self.sharded = self._scan_top()
+            self._replace("", files)
+            for shard in [shard for shard in self.shard_mtimes if shard not in shards]:
+                self._replace(shard, {})
+                del self.shard_mtimes[shard]
+            for shard in shards:
+                self.shard_mtimes.setdefault(shard, None)
+            self.dir_mtime_ns = mtime
+            current = False
+        for shard, known_mtime in self.shard_mtimes.items():
+            try:
+                shard_mtime = os.stat(os.path.join(self.path, shard)).st_mtime_ns
+            except FileNotFoundError:
+                # Its removal changed the collection mtime; dropped on the next refresh
+                continue
+            if shard_mtime != known_mtime:
+                self._replace(shard, self._scan(shard))
+                self.shard_mtimes[shard] = shard_mtime
+                current = False
+        if not current:
+            self.generation += 1
+        return current
+
+    @contextmanager
+    def changing(self, *directories: str):
+        """
+        Wrap one change by this process to files in these directories
+
+        Args:
+            directories: Relative to the collection, "" for the top level
+        """
+        for directory in directories:
+            expected = self._pending_mtimes.get(directory, self._known_mtime(directory))
+            if self._stat_directory(directory) != expected:
+                self._foreign_changes.add(directory)
+        try:
+            yield
+        finally:
+            for directory in directories:
+                self._pending_mtimes[directory] = self._stat_directory(directory)
+
+    def commit_changes(self, adopt: bool = True):
+        """Take over the directory mtimes after this process's changes, unless another process wrote too"""
+        for directory, mtime_ns in self._pending_mtimes.items():
+            if not adopt or directory in self._foreign_changes:
+                if directory and directory not in self.shard_mtimes:
+                    # Not scanned yet; picked up on the next refresh
+                    self.shard_mtimes[directory] = None
+            elif directory:
+                self.shard_mtimes[directory] = mtime_ns
+            else:
+                self.dir_mtime_ns = mtime_ns
+        self._pending_mtimes.clear()
+        self._foreign_changes.clear()
+
+    def apply_write(self, uid: str, file_name: Optional[str]) -> Optional[int]:
+        """Record a write made through this process; returns the file's mtime"""
+        previous = self.files.pop(uid, None)
+        if previous is not None:
+            self._directory_uids.get(os.path.dirname(previous[0]), set()).discard(uid)
+        mtime_ns = None
+        if file_name is not None:
+            mtime_ns = os.stat(os.path.join(self.path, file_name)).st_mtime_ns
+            self.files[uid] = (file_name, mtime_ns)
+            self._directory_uids.setdefault(os.path.dirname(file_name), set()).add(uid)
+        return mtime_ns
+
+    def _known_mtime(self, directory: str) -> Optional[int]:
+        return self.shard_mtimes.get(directory) if directory else self.dir_mtime_ns
+
+    def _stat_directory(self, directory: str) -> Optional[int]:
+        try:
+            return os.stat(os.path.join(self.path, directory)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _scan_top(self) -> Tuple[Dict[str, Tuple[str, int]], Set[str], bool]:
+        files, shards, sharded = {}, set(), False
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.endswith(ICS_SUFFIX) and not name.startswith(".") and entry.is_file():
+                    files[name[:-len(ICS_SUFFIX)]] = (name, entry.stat().st_mtime_ns)
+                elif name == SHARDED_MARKER:
+                    sharded = True
+                elif _is_shard(name) and entry.is_dir():
+                    shards.add(name)
+        return files, shards, sharded
+
+    def _scan(self, shard: str) -> Dict[str, Tuple[str, int]]:
+        files = {}
+        try:
+            with os.scandir(os.path.join(self.path, shard)) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.endswith(ICS_SUFFIX) and not name.startswith(".") and entry.is_file():
+                        files[name[:-len(ICS_SUFFIX)]] = (os.path.join(shard, name), entry.stat().st_mtime_ns)
+        except FileNotFoundError:
+            pass
+        return files
+
+    def _replace(self, directory: str, files: Dict[str, Tuple[str, int]]):
+        """Swap the index entries of one directory for a fresh scan of it"""
+        for uid in self._directory_uids.get(directory, ()):
+            entry = self.files.get(uid)
+            if entry is not None and os.path.dirname(entry[0]) == directory:
+                del self.files[uid]
+        if directory:
+            self.files.update(files)
+        else:
+            # A file already moved into its shard wins over a stale top-level entry
+            for uid, entry in files.items():
+                self.files.setdefault(uid, entry)
+        self._directory_uids[directory] = set(files)
+
+class CollectionCache:
+    """
+    Collection indexes plus a bounded LRU of parsed events
+
+    Parsed events are keyed by collection and UID and stored with the file
+    mtime they were parsed from; a lookup only hits when the (directory
+    validated) index still reports that mtime. Time-range indexes and change
+    logs are kept in step with the collection indexes.
+
+    Each collection has its own lock, held through rescans, reconciles and
+    journal writes, so slow I/O on one calendar never stalls the others.
+    ``_lock`` only guards the shared dictionaries, the event LRU and the
+    counters, and is never held across I/O.
+    """
+
+    def __init__(self, max_events: int = 10000):
+        self.max_events = max_events
+        self._indexes: Dict[str, CollectionIndex] = {}
+        self._events: "OrderedDict[Tuple[str, str], Tuple[int, Dict[str, str]]]" = OrderedDict()
+        self._time_indexes: Dict[str, TimeRangeIndex] = {}
+        self._change_logs: Dict[str, ChangeLog] = {}
+        self._lock = Lock()
+        # Reentrant: reconciling a time-range index loads events through the cache
+        self._path_locks: Dict[str, RLock] = {}
+        self.index_lookups = 0
+        self.index_rebuilds = 0
+        self.event_hits = 0
+        self.event_misses = 0
+
+    def _path_lock(self, path: str) -> RLock:
+        with self._lock:
+            lock = self._path_locks.get(path)
+            if lock is None:
+                lock = self._path_locks[path] = RLock()
+            return lock
+
+    def index(self, path: str) -> CollectionIndex:
+        """The index of a collection directory, rebuilt if the directory changed"""
+        with self._path_lock(path):
+            with self._lock:
+                index = self._indexes.get(path)
+                if index is None:
+                    index = self._indexes[path] = CollectionIndex(path)
+                self.index_lookups += 1
+            if not index.refresh():
+                with self._lock:
+                    self.index_rebuilds += 1
+            return index
+
+    def events_between(
+        self,
+        path: str,
+        start: datetime,
+        end: datetime,
+        load: Callable[[str, str, int], Optional[Dict[str, str]]]
+    ) -> List[Tuple[str, Tuple[str, int]]]:
+        """
+        (uid, (file name, mtime)) of the events starting or ending within [start, end]
+
+        Args:
+            load: Loads a parsed event, used for files the time-range index has not seen
+        """
+        with self._path_lock(path):
+            index = self.index(path)
+            with self._lock:
+                time_index = self._time_indexes.get(path)
+                if time_index is None:
+                    time_index = self._time_indexes[path] = TimeRangeIndex(path)
+            while time_index.synced_generation != index.generation:
+                time_index.reconcile(index.files, load)
+                time_index.synced_generation = index.generation
+                # Creating the journal directory touches the collection directory
+                index.refresh()
+            files = index.files
+            return [
+                (uid, files[uid])
+                for uid in time_index.overlapping(ics_timestamp(start), ics_timestamp(end))
+                if uid in files
+            ]
+
+    def change_log(self, path: str) -> ChangeLog:
+        """The change log of a collection, with changes made by other processes applied"""
+        with self._path_lock(path):
+            index = self.index(path)
+            with self._lock:
+                change_log = self._change_logs.get(path)
+                if change_log is None:
+                    change_log = self._change_logs[path] = ChangeLog(path)
+            while change_log.synced_generation != index.generation:
+                change_log.reconcile(index.files)
+                change_log.synced_generation = index.generation
+                # Creating the journal directory touches the collection directory
+                index.refresh()
+            return change_log
+
+    def get_event(self, path: str, uid: str, mtime_ns: int) -> Optional[Dict[str, str]]:
+        with self._lock:
+            cached = self._events.get((path, uid))
+            if cached is None or cached[0] != mtime_ns:
+                self.event_misses += 1
+                return None
+            self._events.move_to_end((path, uid))
+            self.event_hits += 1
+            return dict(cached[1])
+
+    def put_event(self, path: str, uid: str, mtime_ns: int, data: Dict[str, str]):
+        with self._lock:
+            self._events[(path, uid)] = (mtime_ns, dict(data))
+            self._events.move_to_end((path, uid))
+            while len(self._events) > self.max_events:
+                self._events.popitem(last=False)
+
+    def record_write(self, path: str, uid: str, file_name: Optional[str], event_data: Optional[Dict[str, Any]] = None):
+        """
+        Apply a write made through this process to the cached indexes
+
+        Args:
+            file_name: The written file, or None if the event was deleted
+            event_data: The written event, used to place it in the time-range index
+        """
+        with self._path_lock(path):
+            with self._lock:
+                self._events.pop((path, uid), None)
+                index = self._indexes.get(path)
+                time_index = self._time_indexes.get(path)
+                change_log = self._change_logs.get(path)
+            if index is None or index.dir_mtime_ns is None:
+                return
+            mtime_ns = index.apply_write(uid, file_name)
+            if file_name is None:
+                if time_index is not None:
+                    time_index.remove(uid)
+                if change_log is not None:
+                    change_log.record(uid, None)
+            else:
+                if change_log is not None:
+                    change_log.record(uid, mtime_ns)
+                span = event_span(event_data) if event_data else None
+                if time_index is not None:
+                    if span is None:
+                        time_index.remove(uid)
+                    else:
+                        time_index.put(uid, span[0], span[1], mtime_ns)
+
+    def record_move(self, path: str, uid: str, file_name: str):
+        """Apply a rename made through this process; the file and its mtime are unchanged"""
+        with self._path_lock(path):
+            with self._lock:
+                index = self._indexes.get(path)
+            if index is not None and index.dir_mtime_ns is not None:
+                index.apply_write(uid, file_name)
+
+    @contextmanager
+    def writing(self, path: str):
+        """
+        The validated index of a collection, for a batch of writes by this process
+
+        Each file change goes through ``index.changing()`` and is recorded with
+        ``record_write``/``record_move``. At the end the directory mtimes are
+        taken over; after an error the index is left to rescan.
+        """
+        index = self.index(path)
+        try:
+            yield index
+        except BaseException:
+            with self._path_lock(path):
+                index.commit_changes(adopt=False)
+            raise
+        with self._path_lock(path):
+            index.commit_changes()
+
+    def compact_time_index(self, path: str) -> int:
+        """Rewrite a calendar's time-range journal; returns the bytes saved"""
+        with self._path_lock(path):
+            journal_path = os.path.join(path, TimeRangeIndex.JOURNAL_DIR, TimeRangeIndex.JOURNAL_NAME)
+            if not os.path.exists(journal_path):
+                return 0
+            with self._lock:
+                time_index = self._time_indexes.get(path)
+                if time_index is None:
+                    # Reconciled with the collection on its next query
+                    time_index = self._time_indexes[path] = TimeRangeIndex(path)
+            size = os.path.getsize(journal_path)
+            time_index.compact()
+            return size - os.path.getsize(journal_path)
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+            self._events.clear()
+            self._time_indexes.clear()
+            self._change_logs.clear()
+            self.index_lookups = self.index_rebuilds = 0
+            self.event_hits = self.event_misses = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            event_lookups = self.event_hits + self.event_misses
+            return {
+                "collections": len(self._indexes),
+                "time_indexes": len(self._time_indexes),
+                "change_logs": len(self._change_logs),
+                "index_lookups": self.index_lookups,
+                "index_rebuilds": self.index_rebuilds,
+                "index_hit_rate": (self.index_lookups - self.index_rebuilds) / self.index_lookups if self.index_lookups else 0.0,
+                "cached_events": len(self._events),
+                "max_events": self.max_events,
+                "event_hits": self.event_hits,
+                "event_misses": self.event_misses,
+                "event_hit_rate": self.event_hits / event_lookups if event_lookups else 0.0
+            }
+
+collection_cache = CollectionCache()
+
+class StorageExecutor:
+    """
+    Bounded thread pool for blocking storage I/O with per-calendar ordering
+
+    Operations submitted for the same key run one at a time in submission
+    order; different keys share up to ``max_workers`` threads, so a busy
+    calendar never holds more than one worker and never blocks the event
+    loop.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._queues: Dict[str, deque] = {}
+        self._lock = Lock()
+
+    def submit(self, key: str, fn: Callable, *args) -> Future:
+        """Queue ``fn(*args)`` behind earlier operations for ``key``"""
+        future = Future()
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue is not None:
+                queue.append((future, fn, args))
+                return future
+            self._queues[key] = deque()
+            self._dispatch(key, (future, fn, args))
+        return future
+
+    async def run(self, key: str, fn: Callable, *args):
+        """Run ``fn(*args)`` in the pool, in order with other operations for ``key``"""
+        return await asyncio.wrap_future(self.submit(key, fn, *args))
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker threads after queued operations; the pool restarts on next use"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="caldav-io")
+        return self._pool
+
+    def _dispatch(self, key: str, operation: Tuple):
+        """Hand ``operation`` to the pool; called with ``_lock`` held so shutdown cannot swap the pool in between"""
+        try:
+            self._get_pool().submit(self._run, key, *operation)
+        except BaseException as e:
+            # The pool refused the work (e.g. interpreter shutdown); fail everything queued for the key
+            for future, _, _ in (operation, *self._queues.pop(key)):
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(e)
+
+    def _run(self, key: str, future: Future, fn: Callable, args: Tuple):
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+        with self._lock:
+            queue = self._queues[key]
+            if not queue:
+                del self._queues[key]
+                return
+            self._dispatch(key, queue.popleft())
+
+storage_executor = StorageExecutor(settings.CALDAV_IO_WORKERS)
+
+def fsync_directory(path: str):
+    """Persist renames within a directory"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class WriteBehindBuffer:
+    """
+    Event uploads waiting to be written, per calendar and coalesced by UID
+
+    An upload only queues the event; a flush for the calendar is scheduled
+    on the storage executor when its queue turns non-empty. Uploads that
+    arrive while that flush waits or runs join the next batch, and repeated
+    uploads of one UID collapse into a single file write. An event whose
+    batch fails ``max_attempts`` times in a row is dropped instead of being
+    queued again forever.
+    """
+
+    def __init__(self, max_batch: int = 500, max_attempts: int = 5):
+        self.max_batch = max_batch
+        self.max_attempts = max_attempts
+        self._pending: Dict[str, "OrderedDict[str, Dict[str, Any]]"] = {}
+        self._scheduled: Set[str] = set()
+        self._attempts: Dict[Tuple[str, str], int] = {}
+        self._lock = Lock()
+        self.queued = 0
+        self.coalesced = 0
+        self.written = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.dropped = 0
+
+    def add(self, path: str, event_data: Dict[str, Any]) -> bool:
+        """Queue an upload; returns whether the caller must schedule a flush"""
+        with self._lock:
+            pending = self._pending.setdefault(path, OrderedDict())
+            if event_data["uid"] in pending:
+                self.coalesced += 1
+            pending[event_data["uid"]] = event_data
+            # A new version starts with a clean slate
+            self._attempts.pop((path, event_data["uid"]), None)
+            self.queued += 1
+            if path in self._scheduled:
+                return False
+            self._scheduled.add(path)
+            return True
+
+    def take(self, path: str) -> List[Dict[str, Any]]:
+        """Remove the next batch; an empty batch ends the scheduled flush"""
+        with self._lock:
+            pending = self._pending.get(path)
+            if not pending:
+                self._pending.pop(path, None)
+                self._scheduled.discard(path)
+                return []
+            return [pending.popitem(last=False)[1] for _ in range(min(self.max_batch, len(pending)))]
+
+    def restore(self, path: str, batch: List[Dict[str, Any]]):
+        """Put back a batch that failed to write, unless newer versions were queued or it failed too often"""
+        with self._lock:
+            self.failed_batches += 1
+            self._scheduled.discard(path)
+            pending = self._pending.setdefault(path, OrderedDict())
+            for event_data in reversed(batch):
+                uid = event_data["uid"]
+                if uid in pending:
+                    continue
+                attempts = self._attempts.get((path, uid), 0) + 1
+                if attempts >= self.max_attempts:
+                    self._attempts.pop((path, uid), None)
+                    self.dropped += 1
+                    print(f"Dropping calendar event {uid} of {path} after {attempts} failed writes")
+                    continue
+                self._attempts[(path, uid)] = attempts
+                pending[uid] = event_data
+                pending.move_to_end(uid, last=False)
+
+    def record_batch(self, path: str, batch: List[Dict[str, Any]]):
+        with self._lock:
+            for event_data in batch:
+                self._attempts.pop((path, event_data["uid"]), None)
+            self.written += len(batch)
+            self.batches += 1
+
+    def pending_paths(self) -> List[str]:
+        with self._lock:
+            return [path for path, pending in self._pending.items() if pending]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "pending": sum(len(pending) for pending in self._pending.values()),
+                "queued": self.queued,
+                "coalesced": self.coalesced,
+                "written": self.written,
+                "batches": self.batches,
+                "failed_batches": self.failed_batches,
+                "dropped": self.dropped
+            }
+
+write_buffer = WriteBehindBuffer()
+
+async def flush_pending_writes(cache: Optional[CollectionCache] = None, executor: Optional[StorageExecutor] = None, buffer: Optional["WriteBehindBuffer"] = None) -> int:
+    """Write every queued upload; used on shutdown. Returns the number of events written"""
+    # Imported here: the SQLite backend builds on this module
+    from app.services.caldav_sqlite import SQLITE_SUFFIX, SqliteCalendar
+
+    buffer = buffer or write_buffer
+    calendars = [
+        SqliteCalendar(path, executor, buffer) if path.endswith(SQLITE_SUFFIX) else SimpleCalendar(path, cache, executor, buffer)
+        for path in buffer.pending_paths()
+    ]
+    return sum(await asyncio.gather(*(calendar.flush() for calendar in calendars)))
+
+class SimpleStorage:
+    """Filesystem storage with one directory per calendar and one file per event"""
+
+    def __init__(
+        self,
+        root_path: str,
+        cache: Optional[CollectionCache] = None,
+        executor: Optional[StorageExecutor] = None,
+        buffer: Optional[WriteBehindBuffer] = None
+    ):
+        self.root = root_path
+        self.folder = root_path  # Add folder attribute for compatibility
+        self.cache = cache or collection_cache
+        self.executor = executor or storage_executor
+        self.buffer = buffer or write_buffer
+
+    def get_calendar_path(self, calendar_path):
+        return os.path.join(self.root, calendar_path)
+
+    async def discover(self, calendar_path):
+        full_path = self.get_calendar_path(calendar_path)
+        if await self.executor.run(full_path, os.path.isdir, full_path):
+            return SimpleCalendar(full_path, self.cache, self.executor, self.buffer)
+        return None
+
+    async def create_collection(self, calendar_path, props):
+        full_path = self.get_calendar_path(calendar_path)
+        await self.executor.run(full_path, self._create_collection, full_path, props)
+        return SimpleCalendar(full_path, self.cache, self.executor, self.buffer)
+
+    async def list_collections(self) -> List[str]:
+        """Paths (``owner/calendar``) of all calendars in the storage"""
+        return await self.executor.run(self.root, self._list_collections)
+
+    def _list_collections(self) -> List[str]:
+        collections = []
+        with os.scandir(self.root) as owners:
+            for owner in owners:
+                if owner.name.startswith(".") or not owner.is_dir():
+                    continue
+                with os.scandir(owner.path) as calendars:
+                    collections.extend(
+                        f"{owner.name}/{calendar.name}"
+                        for calendar in calendars
+                        if not calendar.name.startswith(".") and calendar.is_dir()
+                    )
+        return sorted(collections)
+
+    @staticmethod
+    def _create_collection(full_path: str, props: Dict[str, Any]):
+        is_new = not os.path.isdir(full_path)
+        os.makedirs(full_path, mode=0o755, exist_ok=True)
+        if is_new:
+            init_layout(full_path)
+        props_file = os.path.join(full_path, ".properties")
+        with open(props_file, "w") as f:
+            json.dump(props, f)
+
+class SimpleCalendar:
+    """
+    One calendar directory; reads go through the shared collection cache
+
+    All file system access runs on the storage executor, keyed by the
+    calendar directory so operations on one calendar keep their order.
+    Uploads go through the write-behind buffer; reads and deletes first
+    write whatever is still queued, so they always see earlier uploads.
+    """
+
+    # Events loaded per executor call while iterating a listing
+    LIST_BATCH_SIZE = 256
+    # Events moved per executor call by a layout migration
+    MIGRATION_BATCH_SIZE = 1000
+
+    def __init__(
+        self,
+        path: str,
+        cache: Optional[CollectionCache] = None,
+        executor: Optional[StorageExecutor] = None,
+        buffer: Optional[WriteBehindBuffer] = None
+    ):
+        self.path = path
+        self.cache = cache or collection_cache
+        self.executor = executor or storage_executor
+        self.buffer = buffer or write_buffer
+
+    async def upload(self, event_data):
+        """Queue an event write; it reaches disk with the calendar's next batch"""
+        if self.buffer.add(self.path, dict(event_data)):
+            self.executor.submit(self.path, self._flush).add_done_callback(self._report_flush_error)
+        return True
+
+    async def flush(self) -> int:
+        """Write the queued uploads now; returns the number of events written"""
+        return await self.executor.run(self.path, self._flush)
+
+    async def get_item(self, uid):
+        data = await self.executor.run(self.path, self._get_item, uid)
+        return SimpleEvent(data=data) if data is not None else None
+
+    async def delete(self, uid):
+        return await self.executor.run(self.path, self._delete, uid)
+
+    async def list(self, start: Optional[datetime] = None, end: Optional[datetime] = None):
+        """
+        Iterate the calendar's events
+
+        With ``start`` and ``end`` only events starting or ending within the
+        window are read, found through the calendar's time-range index.
+        """
+        entries = await self.executor.run(self.path, self._entries, start, end)
+
+        async def event_generator():
+            for offset in range(0, len(entries), self.LIST_BATCH_SIZE):
+                batch = entries[offset:offset + self.LIST_BATCH_SIZE]
+                for data in await self.executor.run(self.path, self._load_batch, batch):
+                    if data is not None:
+                        yield SimpleEvent(data=data)
+        return event_generator()
+
+    async def changes_since(self, sync_token: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Events changed and UIDs deleted since a sync token
+
+        Without a token every event is returned. The result carries the
+        calendar's new sync token and ctag.
+
+        Raises:
+            InvalidSyncToken: If the token is unknown or too old for an incremental answer
+        """
+        return await self.executor.run(self.path, self._changes_since, sync_token)
+
+    async def ctag(self) -> str:
+        """Tag that changes whenever an event of the calendar is added, changed or removed"""
+        return await self.executor.run(self.path, self._ctag)
+
+    async def version(self) -> Tuple[str, int]:
+        """(ctag, directory mtime in ns) of the calendar, after writing queued uploads"""
+        return await self.executor.run(self.path, self._version)
+
+    async def migrate_layout(self, sharded: bool = True) -> int:
+        """
+        Move the events into hash-prefix shards, or back to the top level
+
+        Events are renamed in batches, so other operations on the calendar
+        run in between and see every event throughout: both layouts index
+        top-level files, and the sharded marker is set before moving into
+        shards and removed only after moving out of them.
+
+        Returns:
+            Number of events moved
+        """
+        if sharded:
+            await self.executor.run(self.path, self._set_sharded, True)
+        moved = 0
+        while True:
+            count = await self.executor.run(self.path, self._migrate_batch, sharded)
+            moved += count
+            if count < self.MIGRATION_BATCH_SIZE:
+                break
+        if not sharded:
+            await self.executor.run(self.path, self._set_sharded, False)
+        return moved
+
+    async def compact(self, preferred_uids: Optional[Dict[str, str]] = None, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Keep one event per task and drop leftovers of interrupted writes
+
+        For every ``x-pm-tool-id`` with several events the one whose UID is in
+        ``preferred_uids`` survives, otherwise the most recently written one.
+
+        Returns:
+            Counts of events scanned and removed, temp files removed and bytes reclaimed
+        """
+        return await self.executor.run(self.path, self._compact, preferred_uids or {}, dry_run)
+
+    def _compact(self, preferred_uids: Dict[str, str], dry_run: bool) -> Dict[str, int]:
+        self._flush()
+        index = self.cache.index(self.path)
+        files = dict(index.files)
+        by_task: Dict[str, List[Tuple[int, str]]] = {}
+        for uid, (file_name, mtime_ns) in files.items():
+            data = self._load(uid, file_name, mtime_ns)
+            task_id = data.get("x-pm-tool-id") if data else None
+            if task_id:
+                by_task.setdefault(task_id, []).append((mtime_ns, uid))
+
+        duplicates = []
+        for task_id, candidates in by_task.items():
+            if len(candidates) < 2:
+                continue
+            keep = preferred_uids.get(task_id)
+            if keep not in files:
+                keep = max(candidates)[1]
+            duplicates.extend(uid for _, uid in candidates if uid != keep)
+
+        # (directory relative to the collection, path) of leftover temp files
+        temp_files = []
+        for directory in ["", *index.shard_mtimes]:
+            with os.scandir(os.path.join(self.path, directory)) as entries:
+                temp_files.extend(
+                    (directory, entry.path) for entry in entries
+                    if entry.name.startswith(".") and entry.name.endswith(".tmp") and entry.is_file()
+                )
+
+        bytes_reclaimed = 0
+        with self.cache.writing(self.path) as index:
+            for uid in duplicates:
+                event_file = os.path.join(self.path, files[uid][0])
+                bytes_reclaimed += os.path.getsize(event_file)
+                if not dry_run:
+                    with index.changing(os.path.dirname(files[uid][0])):
+                        os.remove(event_file)
+                    self.cache.record_write(self.path, uid, None)
+            for directory, temp_file in temp_files:
+                bytes_reclaimed += os.path.getsize(temp_file)
+                if not dry_run:
+                    with index.changing(directory):
+                        os.remove(temp_file)
+        if not dry_run:
+            bytes_reclaimed += self.cache.compact_time_index(self.path)
+
+        return {
+            "events": len(files),
+            "events_removed": len(duplicates),
+            "temp_files_removed": len(temp_files),
+            "bytes_reclaimed": bytes_reclaimed
+        }
+
+    def _set_sharded(self, sharded: bool):
+        marker = os.path.join(self.path, SHARDED_MARKER)
+        if sharded:
+            open(marker, "a").close()
+        elif os.path.exists(marker):
+            os.remove(marker)
+        fsync_directory(self.path)
+
+    def _migrate_batch(self, sharded: bool) -> int:
+        self._flush()
+        with self.cache.writing(self.path) as index:
+            moves = []
+            for uid, (file_name, _) in index.files.items():
+                target = self._file_name(uid, sharded)
+                if file_name != target:
+                    moves.append((uid, file_name, target))
+                    if len(moves) == self.MIGRATION_BATCH_SIZE:
+                        break
+
+            directories = set()
+            for uid, file_name, target in moves:
+                directory = os.path.dirname(os.path.join(self.path, target))
+                with index.changing("", os.path.dirname(file_name), os.path.dirname(target)):
+                    if directory not in directories and self._ensure_directory(directory):
+                        directories.add(self.path)
+                    os.replace(os.path.join(self.path, file_name), os.path.join(self.path, target))
+                directories.add(directory)
+                directories.add(os.path.dirname(os.path.join(self.path, file_name)))
+            for directory in directories:
+                fsync_directory(directory)
+            for uid, _, target in moves:
+                self.cache.record_move(self.path, uid, target)
+        return len(moves)
+
+    def _flush(self) -> int:
+        written = 0
+        while True:
+            batch = self.buffer.take(self.path)
+            if not batch:
+                return written
+            try:
+                self._write_batch(batch)
+            except Exception:
+                self.buffer.restore(self.path, batch)
+                raise
+            self.buffer.record_batch(self.path, batch)
+            written += len(batch)
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        """
+        Write each event to a temp file and rename it into place
+
+        Each touched directory is fsynced once for the whole batch; with the
+        default ordered-data journaling this commits the renamed files'
+        contents too.
+        """
+        with self.cache.writing(self.path) as index:
+            file_names = []
+            directories = set()
+            for event_data in batch:
+                uid = event_data["uid"]
+                file_name = self._file_name(uid, index.sharded)
+                directory = os.path.dirname(os.path.join(self.path, file_name))
+                previous = index.files.get(uid)
+                changed = {"", os.path.dirname(file_name)}
+                if previous is not None:
+                    changed.add(os.path.dirname(previous[0]))
+                with index.changing(*changed):
+                    if directory not in directories and self._ensure_directory(directory):
+                        directories.add(self.path)
+                    temp_path = os.path.join(directory, f".{uid}{ICS_SUFFIX}.tmp")
+                    with open(temp_path, "w", encoding="utf-8", newline="") as f:
+                        f.write(self._format_ics(event_data))
+                    os.replace(temp_path, os.path.join(self.path, file_name))
+                    directories.add(directory)
+                    if previous is not None and previous[0] != file_name:
+                        # Left in the other layout by a migration
+                        self._remove_file(previous[0])
+                        directories.add(os.path.dirname(os.path.join(self.path, previous[0])))
+                file_names.append(file_name)
+            for directory in directories:
+                fsync_directory(directory)
+            for event_data, file_name in zip(batch, file_names):
+                self.cache.record_write(self.path, event_data["uid"], file_name, event_data)
+
+    @staticmethod
+    def _report_flush_error(future: Future):
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Error writing queued calendar events: {str(future.exception())}")
+
+    def _get_item(self, uid: str) -> Optional[Dict[str, str]]:
+        self._flush()
+        entry = self.cache.index(self.path).files.get(uid)
+        if entry is None:
+            return None
+        return self._load(uid, *entry)
+
+    def _delete(self, uid: str) -> bool:
+        self._flush()
+        with self.cache.writing(self.path) as index:
+            entry = index.files.get(uid)
+            if entry is None:
+                return False
+            with index.changing(os.path.dirname(entry[0])):
+                removed = self._remove_file(entry[0])
+            if removed:
+                self.cache.record_write(self.path, uid, None)
+            return removed
+
+    def _remove_file(self, file_name: str) -> bool:
+        try:
+            os.remove(os.path.join(self.path, file_name))
+            return True
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def _file_name(uid: str, sharded: bool) -> str:
+        """Event file of a UID, relative to the collection"""
+        file_name = f"{uid}{ICS_SUFFIX}"
+        return os.path.join(shard_of(uid), file_name) if sharded else file_name
+
+    def _ensure_directory(self, directory: str) -> bool:
+        """Create a shard directory; returns whether it was created"""
+        if directory == self.path or os.path.isdir(directory):
+            return False
+        os.makedirs(directory, mode=0o755, exist_ok=True)
+        return True
+
+    def _entries(self, start: Optional[datetime], end: Optional[datetime]) -> List[Tuple[str, Tuple[str, int]]]:
+        self._flush()
+        if start is not None and end is not None:
+            return self.cache.events_between(self.path, start, end, self._load)
+        return list(self.cache.index(self.path).files.items())
+
+    def _ctag(self) -> str:
+        self._flush()
+        return self.cache.change_log(self.path).ctag
+
+    def _version(self) -> Tuple[str, int]:
+        ctag = self._ctag()
+        return ctag, self.cache.index(self.path).last_modified_ns
+
+    def _changes_since(self, sync_token: Optional[str]) -> Dict[str, Any]:
+        self._flush()
+        change_log = self.cache.change_log(self.path)
+        changed, deleted = change_log.changes_since(sync_token)
+        files = self.cache.index(self.path).files
+        events = [data for data in self._load_batch([(uid, files[uid]) for uid in changed if uid in files]) if data is not None]
+        return {
+            "sync_token": change_log.sync_token,
+            "ctag": change_log.ctag,
+            "changed": events,
+            "deleted": deleted
+        }
+
+    def _load_batch(self, entries: List[Tuple[str, Tuple[str, int]]]) -> List[Optional[Dict[str, str]]]:
+        return [self._load(uid, file_name, mtime_ns) for uid, (file_name, mtime_ns) in entries]
+
+    def _load(self, uid: str, file_name: str, mtime_ns: int) -> Optional[Dict[str, str]]:
+        """Parsed event from the cache, or read from disk and cached"""
+        data = self.cache.get_event(self.path, uid, mtime_ns)
+        if data is None:
+            try:
+                with open(os.path.join(self.path, file_name), encoding="utf-8", errors="replace") as f:
+                    data = parse_ics(f.read())
+            except FileNotFoundError:
+                return None
+            self.cache.put_event(self.path, uid, mtime_ns, data)
+        return data
+
+    def _format_ics(self, event_data):
+        return format_ics(event_data)
+
+class SimpleEvent:
+    def __init__(self, ics_data: Optional[str] = None, data: Optional[Dict[str, str]] = None):
+        self.ics_data = ics_data
+        self.data = data
+
+    async def get_component(self):
+        if self.data is None:
+            self.data = await self._parse_ics(self.ics_data)
+        return self.data
+
+    async def _parse_ics(self, ics_data):
+        return parse_ics(ics_data)
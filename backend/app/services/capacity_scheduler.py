@@ -0,0 +1,46 @@
+from typing import List, Dict, Optional, Tuple
+from app.services.interval_index import IntervalIndex
+
+class CapacityScheduler:
+    """
+    Places tasks into the free working time of a single person
+
+    Time is measured in working minutes (see ``WorkingCalendar``), so gaps are
+    simply the complement of the booked intervals in the index.
+    """
+
+    def __init__(self, booked: IntervalIndex):
+        self.booked = booked
+
+    def place(
+        self,
+        order: List[int],
+        minutes: Dict[int, int],
+        predecessors: Dict[int, List[int]],
+        earliest: int,
+        finished: Optional[Dict[int, int]] = None
+    ) -> Dict[int, List[Tuple[int, int]]]:
+        """
+        Book tasks one after another into the earliest gaps
+
+        Args:
+            order: Task ids in a dependency-respecting order
+            minutes: Working minutes needed per task
+            predecessors: Task ids each task has to wait for
+            earliest: First working minute that may be booked
+            finished: Finish minute of predecessors that are already placed and not in ``order``
+
+        Returns:
+            Booked (start, end) fragments per task id
+        """
+        finish = dict(finished or {})
+        placements = {}
+        for task_id in order:
+            ready_at = earliest
+            for predecessor in predecessors.get(task_id, ()):
+                if finish.get(predecessor, earliest) > ready_at:
+                    ready_at = finish[predecessor]
+            fragments = self.booked.allocate(ready_at, minutes.get(task_id, 0))
+            placements[task_id] = fragments
+            finish[task_id] = fragments[-1][1] if fragments else ready_at
+        return placements
@@ -0,0 +1,222 @@
+from bisect import bisect_right
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+import fcntl
+import os
+import uuid
+
+SYNC_TOKEN_PREFIX = "https://docuplanai.com/ns/sync/"
+
+class InvalidSyncToken(ValueError):
+    """The token was not issued by this change log or predates its retained history"""
+
+def format_sync_token(log_id: str, seq: int) -> str:
+    return f"{SYNC_TOKEN_PREFIX}{log_id}-{seq}"
+
+def parse_sync_token(sync_token: str, log_id: str, seq: int, min_seq: int) -> int:
+    """
+    Sequence number named by a sync token of the log ``log_id``
+
+    Raises:
+        InvalidSyncToken: If the token names another log, a future position or one older than ``min_seq``
+    """
+    token_log_id, _, token_seq = sync_token[len(SYNC_TOKEN_PREFIX):].rpartition("-")
+    if not sync_token.startswith(SYNC_TOKEN_PREFIX) or token_log_id != log_id or not token_seq.isdigit():
+        raise InvalidSyncToken("Unknown sync token")
+    token_seq = int(token_seq)
+    if token_seq > seq or token_seq < min_seq:
+        raise InvalidSyncToken("Sync token is no longer valid")
+    return token_seq
+
+class ChangeLog:
+    """
+    Monotonically numbered changes of one calendar
+
+    Every upload or delete of an event gets the next sequence number; only
+    the latest change per UID is kept, so the log is bounded by the number
+    of events plus tombstones. The ctag is the current sequence number and a
+    sync token names a position in the log, which turns "what changed since
+    my last sync" into a bisect over the sequence numbers.
+
+    Like the time-range index the log is persisted as an append-only journal
+    (``seq uid mtime`` or ``seq uid -`` lines after a ``log id min_seq``
+    header) and carries the file mtimes it has seen, so changes made by
+    other processes are picked up by reconciling with the collection index.
+
+    The journal is shared by every process serving the calendar: sequence
+    numbers are only assigned under an exclusive lock on ``changes.lock``,
+    after reading what other processes appended since, so all of them hand
+    out tokens from one numbering.
+    """
+
+    JOURNAL_DIR = ".index"
+    JOURNAL_NAME = "changes"
+    # Tombstones beyond this many are dropped, invalidating older tokens
+    MAX_TOMBSTONES = 10000
+
+    def __init__(self, calendar_path: str):
+        self.journal_path = os.path.join(calendar_path, self.JOURNAL_DIR, self.JOURNAL_NAME)
+        self.log_id = uuid.uuid4().hex[:12]
+        self.seq = 0
+        # Tokens older than this cannot be answered incrementally
+        self.min_seq = 0
+        # uid -> (seq, file mtime or None for a deletion)
+        self.entries: Dict[str, Tuple[int, Optional[int]]] = {}
+        # (seq, uid) in log order; stale when the uid changed again later
+        self._order: List[Tuple[int, str]] = []
+        self._journal_lines = 0
+        # Identity (inode, header line) of the journal file read up to _journal_offset
+        self._journal_identity: Optional[Tuple[int, bytes]] = None
+        self._journal_offset = 0
+        self.synced_generation: Optional[int] = None
+        self._catch_up()
+
+    @property
+    def ctag(self) -> str:
+        return f"{self.log_id}-{self.seq}"
+
+    @property
+    def sync_token(self) -> str:
+        return format_sync_token(self.log_id, self.seq)
+
+    def changes_since(self, sync_token: Optional[str]) -> Tuple[List[str], List[str]]:
+        """
+        (changed, deleted) UIDs since a sync token, in log order
+
+        Without a token every current event counts as changed.
+
+        Raises:
+            InvalidSyncToken: If the token is unknown or too old
+        """
+        # Readers need no lock: appends are whole lines and compaction replaces the file
+        self._catch_up()
+        since = parse_sync_token(sync_token, self.log_id, self.seq, self.min_seq) if sync_token else None
+        changed, deleted = [], []
+        start = 0 if since is None else bisect_right(self._order, (since, "\uffff"))
+        for seq, uid in self._order[start:]:
+            entry = self.entries.get(uid)
+            if entry is None or entry[0] != seq:
+                continue
+            if entry[1] is None:
+                if since is not None:
+                    deleted.append(uid)
+            else:
+                changed.append(uid)
+        return changed, deleted
+
+    def record(self, uid: str, mtime_ns: Optional[int]):
+        """Log an upload (with the file's mtime) or a deletion (None)"""
+        with self._locked():
+            entry = self.entries.get(uid)
+            if entry is not None and entry[1] == mtime_ns:
+                return
+            if entry is None and mtime_ns is None:
+                return
+            self._write_journal([self._apply(uid, mtime_ns)])
+
+    def reconcile(self, files: Dict[str, Tuple[str, int]]):
+        """Log differences between the recorded state and a collection's files"""
+        with self._locked():
+            lines = []
+            for uid, (seq, mtime_ns) in list(self.entries.items()):
+                if mtime_ns is not None and uid not in files:
+                    lines.append(self._apply(uid, None))
+            for uid, (_, mtime_ns) in files.items():
+                entry = self.entries.get(uid)
+                if entry is None or entry[1] != mtime_ns:
+                    lines.append(self._apply(uid, mtime_ns))
+            if lines:
+                self._write_journal(lines)
+
+    def _apply(self, uid: str, mtime_ns: Optional[int]) -> str:
+        self.seq += 1
+        self.entries[uid] = (self.seq, mtime_ns)
+        self._order.append((self.seq, uid))
+        return f"{self.seq}\t{uid}\t{'-' if mtime_ns is None else mtime_ns}"
+
+    def compact(self):
+        """Rewrite the journal with the latest change per UID, dropping the oldest tombstones"""
+        with self._locked():
+            self._compact()
+
+    def _compact(self):
+        tombstones = sorted(seq for seq, mtime_ns in self.entries.values() if mtime_ns is None)
+        if len(tombstones) > self.MAX_TOMBSTONES:
+            cutoff = tombstones[-self.MAX_TOMBSTONES - 1]
+            self.entries = {
+                uid: entry for uid, entry in self.entries.items()
+                if entry[1] is not None or entry[0] > cutoff
+            }
+            self.min_seq = max(self.min_seq, cutoff)
+        self._order = sorted((seq, uid) for uid, (seq, _) in self.entries.items())
+
+        temp_path = self.journal_path + ".tmp"
+        header = f"log\t{self.log_id}\t{self.min_seq}\t{self.seq}\n"
+        with open(temp_path, "w") as f:
+            f.write(header)
+            for seq, uid in self._order:
+                mtime_ns = self.entries[uid][1]
+                f.write(f"{seq}\t{uid}\t{'-' if mtime_ns is None else mtime_ns}\n")
+            self._journal_offset = f.tell()
+        os.replace(temp_path, self.journal_path)
+        self._journal_identity = (os.stat(self.journal_path).st_ino, header.encode())
+        self._journal_lines = len(self._order) + 1
+
+    @contextmanager
+    def _locked(self):
+        """Hold the journal lock across processes, with their appended changes applied"""
+        os.makedirs(os.path.dirname(self.journal_path), mode=0o755, exist_ok=True)
+        with open(self.journal_path + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._catch_up()
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _catch_up(self):
+        """Apply journal lines written since the last read; re-read it whole if it was rewritten"""
+        try:
+            journal = open(self.journal_path, "rb")
+        except FileNotFoundError:
+            return
+        with journal:
+            identity = (os.fstat(journal.fileno()).st_ino, journal.readline())
+            reread = identity != self._journal_identity
+            if reread:
+                self._journal_identity = identity
+                self._journal_offset = self._journal_lines = 0
+                self.entries = {}
+            journal.seek(self._journal_offset)
+            data = journal.read()
+        # A line still being appended is read next time
+        end = data.rfind(b"\n") + 1
+        self._journal_offset += end
+        appended = []
+        for line in data[:end].decode().splitlines():
+            self._journal_lines += 1
+            parts = line.split("\t")
+            try:
+                if parts[0] == "log" and len(parts) == 4:
+                    self.log_id, self.min_seq, self.seq = parts[1], int(parts[2]), max(self.seq, int(parts[3]))
+                elif len(parts) == 3:
+                    seq = int(parts[0])
+                    self.entries[parts[1]] = (seq, None if parts[2] == "-" else int(parts[2]))
+                    self.seq = max(self.seq, seq)
+                    appended.append((seq, parts[1]))
+            except ValueError:
+                continue
+        if reread:
+            self._order = sorted((seq, uid) for uid, (seq, _) in self.entries.items())
+        else:
+            self._order.extend(appended)
+
+    def _write_journal(self, lines: List[str]):
+        if self._journal_lines == 0 or self._journal_lines + len(lines) > 2 * len(self.entries) + 1000:
+            # A new journal starts with its header; compaction writes it
+            self._compact()
+            return
+        with open(self.journal_path, "a") as f:
+            f.writelines(line + "\n" for line in lines)
+            self._journal_offset = f.tell()
+        self._journal_lines += len(lines)
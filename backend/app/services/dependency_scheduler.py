@@ -0,0 +1,216 @@
+from collections import deque
+from typing import List, Dict, Iterable, Optional, Set, Tuple
+import heapq
+
+EPSILON = 1e-9
+
+class DependencyScheduler:
+    """
+    Topological ordering, critical path and lane packing for a task graph
+
+    Works on plain task dicts (``id`` and ``hours``) and dependency edges so it
+    can be used without a database session. All times are working hours
+    relative to the project start.
+    """
+
+    def __init__(self, tasks: List[Dict], dependencies: Iterable[Tuple[int, int]]):
+        """
+        Args:
+            tasks: Dicts with ``id`` and ``hours``, in the preferred order
+            dependencies: (task_id, depends_on_id) pairs; edges to unknown tasks are ignored
+        """
+        self.task_ids = [task["id"] for task in tasks]
+        self.durations = [max(float(task.get("hours") or 0.0), 0.0) for task in tasks]
+        self.index = {task_id: i for i, task_id in enumerate(self.task_ids)}
+
+        count = len(self.task_ids)
+        self.predecessors = [[] for _ in range(count)]
+        self.successors = [[] for _ in range(count)]
+        seen = set()
+        for task_id, depends_on_id in dependencies:
+            task_index = self.index.get(task_id)
+            depends_on_index = self.index.get(depends_on_id)
+            if task_index is None or depends_on_index is None or task_index == depends_on_index:
+                continue
+            if (task_index, depends_on_index) in seen:
+                continue
+            seen.add((task_index, depends_on_index))
+            self.predecessors[task_index].append(depends_on_index)
+            self.successors[depends_on_index].append(task_index)
+
+    def predecessor_ids(self) -> Dict[int, List[int]]:
+        """Map each task id to the ids of the tasks it depends on"""
+        return {
+            task_id: [self.task_ids[p] for p in self.predecessors[i]]
+            for i, task_id in enumerate(self.task_ids)
+        }
+
+    def downstream_ids(self, task_ids: Iterable[int]) -> Set[int]:
+        """The given tasks plus every task that transitively depends on them"""
+        pending = [self.index[task_id] for task_id in task_ids if task_id in self.index]
+        reached = set(pending)
+        while pending:
+            current = pending.pop()
+            for successor in self.successors[current]:
+                if successor not in reached:
+                    reached.add(successor)
+                    pending.append(successor)
+        return {self.task_ids[i] for i in reached}
+
+    def topological_order(self) -> Tuple[List[int], List[int]]:
+        """
+        Kahn's algorithm, stable with respect to the input order
+
+        Returns:
+            (order, cycle) as task indices; tasks on a cycle are appended to the
+            order in input order and their cyclic edges are ignored
+        """
+        count = len(self.task_ids)
+        in_degree = [len(predecessors) for predecessors in self.predecessors]
+        ready = deque(i for i in range(count) if in_degree[i] == 0)
+        order = []
+        while ready:
+            current = ready.popleft()
+            order.append(current)
+            for successor in self.successors[current]:
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    ready.append(successor)
+
+        cycle = []
+        if len(order) < count:
+            placed = set(order)
+            cycle = [i for i in range(count) if i not in placed]
+            order.extend(cycle)
+        return order, cycle
+
+    def plan(self, max_lanes: Optional[int] = None) -> Dict:
+        """
+        Compute the critical path and pack tasks into parallel lanes
+
+        Args:
+            max_lanes: Upper bound on tasks worked on at the same time (unbounded if None)
+
+        Returns:
+            Dict with per-task timings, the critical path and the project duration
+        """
+        count = len(self.task_ids)
+        if count == 0:
+            return {"order": [], "timings": {}, "critical_path": [], "duration_hours": 0.0, "critical_path_hours": 0.0, "lanes": 0, "cycle_task_ids": []}
+
+        order, cycle = self.topological_order()
+        position = [0] * count
+        for pos, i in enumerate(order):
+            position[i] = pos
+        durations = self.durations
+
+        # Forward pass: earliest start/finish, only edges that respect the order
+        earliest_start = [0.0] * count
+        earliest_finish = [0.0] * count
+        for i in order:
+            start = 0.0
+            for p in self.predecessors[i]:
+                if position[p] < position[i] and earliest_finish[p] > start:
+                    start = earliest_finish[p]
+            earliest_start[i] = start
+            earliest_finish[i] = start + durations[i]
+        project_duration = max(earliest_finish)
+
+        # Backward pass: latest finish/start
+        latest_finish = [project_duration] * count
+        latest_start = [0.0] * count
+        for i in reversed(order):
+            finish = project_duration
+            for s in self.successors[i]:
+                if position[s] > position[i] and latest_start[s] < finish:
+                    finish = latest_start[s]
+            latest_finish[i] = finish
+            latest_start[i] = finish - durations[i]
+
+        critical_path = self._critical_path(order, position, earliest_start, earliest_finish, latest_start, project_duration)
+        start, finish, lanes, lane_count = self._pack_lanes(order, position, earliest_start, max_lanes)
+        critical = set(critical_path)
+
+        timings = {}
+        for i in range(count):
+            timings[self.task_ids[i]] = {
+                "earliest_start": earliest_start[i],
+                "earliest_finish": earliest_finish[i],
+                "latest_start": latest_start[i],
+                "latest_finish": latest_finish[i],
+                "slack": max(latest_start[i] - earliest_start[i], 0.0),
+                "start": start[i],
+                "finish": finish[i],
+                "lane": lanes[i],
+                "is_critical": i in critical
+            }
+
+        return {
+            "order": [self.task_ids[i] for i in order],
+            "timings": timings,
+            "critical_path": [self.task_ids[i] for i in critical_path],
+            "duration_hours": max(finish),
+            "critical_path_hours": project_duration,
+            "lanes": lane_count,
+            "cycle_task_ids": [self.task_ids[i] for i in cycle]
+        }
+
+    def _critical_path(self, order, position, earliest_start, earliest_finish, latest_start, project_duration) -> List[int]:
+        """Walk back from the last finishing zero-slack task through tight predecessors"""
+        current = None
+        for i in reversed(order):
+            if abs(earliest_finish[i] - project_duration) <= EPSILON and abs(latest_start[i] - earliest_start[i]) <= EPSILON:
+                current = i
+                break
+        path = []
+        while current is not None:
+            path.append(current)
+            next_task = None
+            for p in self.predecessors[current]:
+                if (position[p] < position[current]
+                        and abs(earliest_finish[p] - earliest_start[current]) <= EPSILON
+                        and abs(latest_start[p] - earliest_start[p]) <= EPSILON):
+                    next_task = p
+                    break
+            current = next_task
+        path.reverse()
+        return path
+
+    def _pack_lanes(self, order, position, earliest_start, max_lanes):
+        """
+        List scheduling in (earliest start, topological position) order
+
+        A lane that is free when a task becomes ready is reused, otherwise a new
+        lane is opened; once ``max_lanes`` is reached the task waits for the
+        earliest free lane.
+        """
+        count = len(order)
+        start = [0.0] * count
+        finish = [0.0] * count
+        lanes = [0] * count
+        free_lanes = []  # (free_at, lane)
+        lane_count = 0
+
+        for i in sorted(order, key=lambda i: (earliest_start[i], position[i])):
+            ready_at = 0.0
+            for p in self.predecessors[i]:
+                if position[p] < position[i] and finish[p] > ready_at:
+                    ready_at = finish[p]
+
+            if free_lanes and free_lanes[0][0] <= ready_at + EPSILON:
+                _, lane = heapq.heappop(free_lanes)
+                task_start = ready_at
+            elif max_lanes is None or lane_count < max_lanes:
+                lane = lane_count
+                lane_count += 1
+                task_start = ready_at
+            else:
+                free_at, lane = heapq.heappop(free_lanes)
+                task_start = max(ready_at, free_at)
+
+            start[i] = task_start
+            finish[i] = task_start + self.durations[i]
+            lanes[i] = lane
+            heapq.heappush(free_lanes, (finish[i], lane))
+
+        return start, finish, lanes, lane_count
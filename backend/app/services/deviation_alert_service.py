@@ -0,0 +1,230 @@
+from datetime import datetime, timezone
+from typing import List, Dict, Optional
+import math
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.models.task import Task
+from app.models.project import Project
+from app.models.estimation_stats import UserEstimationStats, TaskDeviationState
+from app.models.notification import NotificationOutbox
+
+class WelfordAccumulator:
+    """Running mean and variance that supports adding and removing samples"""
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def remove(self, value: float):
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        new_mean = (self.count * self.mean - value) / (self.count - 1)
+        self.m2 = max(0.0, self.m2 - (value - self.mean) * (value - new_mean))
+        self.mean = new_mean
+        self.count -= 1
+
+    @property
+    def variance(self) -> float:
+        """Sample variance, 0 until there are two samples"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std_dev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def z_score(self, value: float) -> Optional[float]:
+        std_dev = self.std_dev
+        if std_dev == 0:
+            return None
+        return (value - self.mean) / std_dev
+
+class DeviationAlertService:
+    """Evaluates estimate deviations incrementally whenever tracked hours change"""
+
+    # Overrun percentages that raise an alert, in ascending order
+    THRESHOLDS = [
+        (25.0, "warning"),
+        (50.0, "critical"),
+        (100.0, "severe")
+    ]
+    Z_SCORE_THRESHOLD = 2.0
+    MIN_SAMPLES_FOR_OUTLIER = 5
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def on_hours_changed(self, actual_hours: Dict[int, Optional[float]]) -> List[NotificationOutbox]:
+        """
+        Update deviation statistics for changed tasks and queue alerts
+
+        Only the changed tasks, their stored state and their owners' stats are
+        loaded; historical tasks are never rescanned. The caller owns the
+        transaction, so alerts are committed together with the hours change.
+
+        Args:
+            actual_hours: New actual hours per task id (None clears the sample)
+
+        Returns:
+            List of outbox events added to the session
+        """
+        if not actual_hours:
+            return []
+
+        task_rows = self.db.query(
+            Task.id, Task.estimated_hours, Project.user_id
+        ).join(Task.project).filter(Task.id.in_(actual_hours.keys())).all()
+        if not task_rows:
+            return []
+
+        states = {
+            state.task_id: state
+            for state in self.db.query(TaskDeviationState).filter(
+                TaskDeviationState.task_id.in_([row[0] for row in task_rows])
+            ).all()
+        }
+        user_ids = {row[2] for row in task_rows}
+        # Create missing stats rows first so concurrent first updates of a user
+        # serialize on the row lock instead of racing to insert it
+        self.db.execute(
+            pg_insert(UserEstimationStats).values([
+                {"user_id": user_id, "sample_count": 0, "mean": 0.0, "m2": 0.0}
+                for user_id in user_ids
+            ]).on_conflict_do_nothing(index_elements=[UserEstimationStats.user_id])
+        )
+        stats_rows = {
+            stats.user_id: stats
+            for stats in self.db.query(UserEstimationStats).filter(
+                UserEstimationStats.user_id.in_(user_ids)
+            ).with_for_update().all()
+        }
+        accumulators = {}
+        for user_id in user_ids:
+            stats = stats_rows.get(user_id)
+            if stats:
+                accumulators[user_id] = WelfordAccumulator(stats.sample_count, stats.mean, stats.m2)
+            else:
+                accumulators[user_id] = WelfordAccumulator()
+
+        events = []
+        for task_id, estimated_hours, user_id in task_rows:
+            state = states.get(task_id)
+            if state is None:
+                state = TaskDeviationState(task_id=task_id, user_id=user_id, alerted_level=0, outlier_flagged=False)
+                self.db.add(state)
+
+            sample = self._deviation_percentage(estimated_hours, actual_hours[task_id])
+            accumulator = accumulators[user_id]
+            if state.sample is not None:
+                accumulator.remove(state.sample)
+
+            if sample is not None:
+                events.extend(self._evaluate(task_id, user_id, estimated_hours, actual_hours[task_id], sample, state, accumulator))
+                accumulator.add(sample)
+            else:
+                state.alerted_level = 0
+                state.outlier_flagged = False
+            state.sample = sample
+
+        for user_id, accumulator in accumulators.items():
+            stats = stats_rows.get(user_id)
+            if stats is None:
+                stats = UserEstimationStats(user_id=user_id)
+                self.db.add(stats)
+            stats.sample_count = accumulator.count
+            stats.mean = accumulator.mean
+            stats.m2 = accumulator.m2
+
+        if events:
+            self.db.add_all(events)
+        return events
+
+    def get_pending_alerts(self, user_id: int, limit: int = 100) -> List[Dict]:
+        """Get alerts that have not been dispatched yet, oldest first"""
+        alerts = self.db.query(NotificationOutbox).filter(
+            NotificationOutbox.user_id == user_id,
+            NotificationOutbox.dispatched_at.is_(None)
+        ).order_by(NotificationOutbox.id).limit(limit).all()
+        return [alert.to_dict() for alert in alerts]
+
+    def mark_dispatched(self, alert_ids: List[int], user_id: int) -> int:
+        """Mark outbox events as delivered"""
+        if not alert_ids:
+            return 0
+        updated = self.db.query(NotificationOutbox).filter(
+            NotificationOutbox.id.in_(alert_ids),
+            NotificationOutbox.user_id == user_id,
+            NotificationOutbox.dispatched_at.is_(None)
+        ).update({"dispatched_at": datetime.now(timezone.utc)}, synchronize_session=False)
+        self.db.commit()
+        return updated
+
+    def _evaluate(
+        self,
+        task_id: int,
+        user_id: int,
+        estimated_hours: float,
+        actual_hours: float,
+        sample: float,
+        state: TaskDeviationState,
+        accumulator: WelfordAccumulator
+    ) -> List[NotificationOutbox]:
+        """Compare a new sample with the thresholds and the user's other tasks"""
+        events = []
+        payload = {
+            "task_id": task_id,
+            "estimated_hours": estimated_hours,
+            "actual_hours": actual_hours,
+            "deviation_percentage": round(sample, 2)
+        }
+
+        level = self._threshold_level(sample)
+        if level > state.alerted_level:
+            threshold, severity = self.THRESHOLDS[level - 1]
+            events.append(NotificationOutbox(
+                user_id=user_id,
+                task_id=task_id,
+                event_type="estimate_deviation",
+                payload={**payload, "severity": severity, "threshold_percentage": threshold}
+            ))
+        # Dropping back below a threshold re-arms it
+        state.alerted_level = level
+
+        # Score against the user's other tasks, i.e. before this sample is added
+        z_score = accumulator.z_score(sample) if accumulator.count >= self.MIN_SAMPLES_FOR_OUTLIER else None
+        is_outlier = z_score is not None and abs(z_score) > self.Z_SCORE_THRESHOLD
+        if is_outlier and not state.outlier_flagged:
+            events.append(NotificationOutbox(
+                user_id=user_id,
+                task_id=task_id,
+                event_type="deviation_outlier",
+                payload={
+                    **payload,
+                    "z_score": round(z_score, 2),
+                    "user_mean_deviation_percentage": round(accumulator.mean, 2),
+                    "user_std_dev_percentage": round(accumulator.std_dev, 2)
+                }
+            ))
+        state.outlier_flagged = is_outlier
+        return events
+
+    def _threshold_level(self, deviation_percentage: float) -> int:
+        """Number of thresholds the overrun has reached"""
+        level = 0
+        for threshold, _ in self.THRESHOLDS:
+            if deviation_percentage >= threshold:
+                level += 1
+        return level
+
+    @staticmethod
+    def _deviation_percentage(estimated_hours: Optional[float], actual_hours: Optional[float]) -> Optional[float]:
+        if actual_hours is None or not estimated_hours or estimated_hours <= 0:
+            return None
+        return (actual_hours - estimated_hours) / estimated_hours * 100
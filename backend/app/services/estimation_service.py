@@ -18,11 +18,46 @@ class EstimationService:
         if not task:
             raise ValueError("Task not found")
 
+        return self._build_accuracy(task)
+
+    def analyze_estimate_accuracy_batch(self, task_ids: List[int], user_id: int) -> Dict:
+        """
+        Analyze the estimate accuracy of many tasks with a single query
+
+        Args:
+            task_ids: The IDs of the tasks to analyze
+            user_id: Only tasks in this user's projects are returned
+
+        Returns:
+            Dict with accuracy results keyed by task id and the ids not found
+        """
+        requested_ids = list(dict.fromkeys(task_ids))
+        tasks = self.db.query(Task).join(Task.project).filter(
+            Task.id.in_(requested_ids),
+            Project.user_id == user_id
+        ).all() if requested_ids else []
+
+        results = {task.id: self._build_accuracy(task) for task in tasks}
+        return {
+            "status": "success",
+            "results": results,
+            "not_found": [task_id for task_id in requested_ids if task_id not in results]
+        }
+
+    def _build_accuracy(self, task: Task) -> Dict:
+        """Build the accuracy result for a loaded task"""
         if task.actual_hours is None:
             return {
                 "status": "incomplete",
+                "task_id": task.id,
                 "message": "Task has not been completed yet"
             }
+        if not task.estimated_hours or task.estimated_hours <= 0:
+            return {
+                "status": "no_estimate",
+                "task_id": task.id,
+                "message": "Task has no estimate to compare against"
+            }
 
         deviation = task.actual_hours - task.estimated_hours
         deviation_percentage = (deviation / task.estimated_hours) * 100
@@ -56,7 +91,8 @@ class EstimationService:
 
         tasks = self.db.query(Task).filter(
             Task.project_id == project_id,
-            Task.actual_hours.isnot(None)
+            Task.actual_hours.isnot(None),
+            Task.estimated_hours > 0
         ).all()
 
         if not tasks:
@@ -71,7 +107,7 @@ class EstimationService:
         avg_deviation_percentage = (total_deviation / total_estimated) * 100
 
         task_accuracies = [
-            self.analyze_estimate_accuracy(task.id)
+            self._build_accuracy(task)
             for task in tasks
         ]
 
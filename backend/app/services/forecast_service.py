@@ -0,0 +1,193 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import math
+import numpy as np
+from sqlalchemy.orm import Session
+from app.models.task import Task
+from app.models.project import Project
+from app.models.task_dependency import TaskDependency
+from app.models.estimation_stats import UserEstimationStats
+from app.services.dependency_scheduler import DependencyScheduler
+from app.services.deviation_alert_service import WelfordAccumulator
+from app.services.working_calendar import get_user_calendar
+
+class MonteCarloForecaster:
+    """
+    Samples project durations from per-task lognormal distributions
+
+    All simulations are computed at once: durations are a (tasks x
+    simulations) matrix and the forward pass over the dependency graph is one
+    vectorized ``np.maximum`` per edge, so the cost grows with the size of the
+    graph, not with the number of simulations times the graph.
+    """
+
+    PERCENTILES = (50, 80, 95)
+
+    def __init__(self, tasks: List[Dict], dependencies: Iterable[Tuple[int, int]]):
+        """
+        Args:
+            tasks: Dicts with ``id``, ``hours``, ``median_factor`` and ``sigma``
+            dependencies: (task_id, depends_on_id) pairs
+        """
+        self.tasks = tasks
+        self.scheduler = DependencyScheduler(tasks, dependencies)
+
+    def simulate(self, simulations: int, sequential: bool = False, seed: Optional[int] = None) -> np.ndarray:
+        """
+        Sample the project duration in working hours
+
+        Args:
+            simulations: Number of simulated schedules
+            sequential: One person works through all tasks (sum of durations)
+                instead of independent tasks running in parallel (critical path)
+            seed: Seed for reproducible results
+
+        Returns:
+            Array of ``simulations`` project durations
+        """
+        if not self.tasks:
+            return np.zeros(simulations)
+
+        rng = np.random.default_rng(seed)
+        hours = np.array([max(float(task["hours"] or 0.0), 0.0) for task in self.tasks])
+        median_factor = np.array([task["median_factor"] for task in self.tasks])
+        sigma = np.array([task["sigma"] for task in self.tasks])
+
+        # Lognormal with the given median; rows are tasks, so each row is contiguous
+        durations = rng.standard_normal((len(self.tasks), simulations))
+        durations *= sigma[:, None]
+        np.exp(durations, out=durations)
+        durations *= (hours * median_factor)[:, None]
+
+        if sequential:
+            return durations.sum(axis=0)
+
+        order, _ = self.scheduler.topological_order()
+        position = np.empty(len(order), dtype=np.int64)
+        position[order] = np.arange(len(order))
+        # Durations become finish times in place, in topological order
+        start = np.empty(simulations)
+        for i in order:
+            predecessors = [p for p in self.scheduler.predecessors[i] if position[p] < position[i]]
+            if not predecessors:
+                continue
+            np.copyto(start, durations[predecessors[0]])
+            for p in predecessors[1:]:
+                np.maximum(start, durations[p], out=start)
+            durations[i] += start
+        return durations.max(axis=0)
+
+    @classmethod
+    def summarize(cls, totals: np.ndarray) -> Dict[int, float]:
+        """Duration percentiles in working hours"""
+        values = np.percentile(totals, cls.PERCENTILES)
+        return {percentile: float(value) for percentile, value in zip(cls.PERCENTILES, values)}
+
+class ForecastService:
+    """Probabilistic completion dates for projects"""
+
+    DEFAULT_SIMULATIONS = 5000
+    MAX_SIMULATIONS = 20000
+    # Used when a task has no confidence score
+    DEFAULT_CONFIDENCE = 0.5
+    # Spread of the duration factor (lognormal sigma) at confidence 1 and 0
+    MIN_SIGMA = 0.1
+    MAX_SIGMA = 0.8
+    MIN_HISTORY_SAMPLES = 3
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def forecast_project(
+        self,
+        project_id: int,
+        simulations: int = DEFAULT_SIMULATIONS,
+        sequential: bool = False,
+        start_date: Optional[datetime] = None,
+        seed: Optional[int] = None
+    ) -> Dict:
+        """
+        Forecast P50/P80/P95 completion dates for the open tasks of a project
+
+        Each task's duration is lognormal around its estimate. The spread grows
+        as the task's confidence score drops and with the owner's historical
+        deviation spread; the owner's mean historical deviation shifts the
+        median, so habitual underestimation is corrected for.
+
+        Args:
+            project_id: The ID of the project
+            simulations: Number of simulated schedules
+            sequential: Assume one person works through the tasks one at a time
+            start_date: When work starts (defaults to now)
+            seed: Seed for reproducible results
+
+        Returns:
+            Dict with completion dates and working hours per percentile
+        """
+        project = self.db.query(Project).filter(Project.id == project_id).first()
+        if not project:
+            raise ValueError("Project not found")
+        simulations = max(1, min(simulations, self.MAX_SIMULATIONS))
+
+        tasks = self.db.query(
+            Task.id, Task.estimated_hours, Task.duration_hours, Task.confidence_score
+        ).filter(
+            Task.project_id == project_id,
+            Task.status != "completed"
+        ).all()
+        dependencies = self.db.query(
+            TaskDependency.task_id, TaskDependency.depends_on_id
+        ).filter(TaskDependency.task_id.in_([task.id for task in tasks])).all() if tasks else []
+
+        median_factor, history_sigma = self._history(project.user_id)
+        task_data = [
+            {
+                "id": task.id,
+                "hours": task.estimated_hours or task.duration_hours or 0.0,
+                "median_factor": median_factor,
+                "sigma": math.hypot(self._confidence_sigma(task.confidence_score), history_sigma)
+            }
+            for task in tasks
+        ]
+
+        forecaster = MonteCarloForecaster(task_data, dependencies)
+        totals = forecaster.simulate(simulations, sequential=sequential, seed=seed)
+        percentiles = forecaster.summarize(totals)
+
+        calendar = get_user_calendar(self.db, project.user_id)
+        start_date = max(calendar.local(start_date) if start_date else calendar.now(), calendar.now())
+        start_minute = calendar.to_working_minute(start_date)
+
+        def completion(hours: float) -> str:
+            return calendar.from_working_minute(start_minute + math.ceil(hours * 60), is_end=True).isoformat()
+
+        return {
+            "status": "success",
+            "project_id": project_id,
+            "open_tasks": len(task_data),
+            "simulations": simulations,
+            "mode": "sequential" if sequential else "parallel",
+            "start_date": calendar.from_working_minute(start_minute).isoformat(),
+            "estimated_hours": sum(task["hours"] for task in task_data),
+            "historical_bias_factor": round(median_factor, 3),
+            "mean_hours": float(totals.mean()),
+            "percentiles": {
+                f"p{percentile}": {"hours": round(hours, 2), "completion_date": completion(hours)}
+                for percentile, hours in percentiles.items()
+            }
+        }
+
+    def _history(self, user_id: int) -> Tuple[float, float]:
+        """Median factor and extra lognormal spread from the user's past deviations"""
+        stats = self.db.query(UserEstimationStats).filter(UserEstimationStats.user_id == user_id).first()
+        if not stats or stats.sample_count < self.MIN_HISTORY_SAMPLES:
+            return 1.0, 0.0
+        accumulator = WelfordAccumulator(stats.sample_count, stats.mean, stats.m2)
+        # Deviations are percentages of the estimate; never assume work shrinks below 10%
+        median_factor = max(1.0 + accumulator.mean / 100, 0.1)
+        return median_factor, math.log1p(accumulator.std_dev / 100 / median_factor)
+
+    def _confidence_sigma(self, confidence_score: Optional[float]) -> float:
+        confidence = self.DEFAULT_CONFIDENCE if confidence_score is None else confidence_score
+        confidence = min(max(confidence, 0.0), 1.0)
+        return self.MAX_SIGMA - (self.MAX_SIGMA - self.MIN_SIGMA) * confidence
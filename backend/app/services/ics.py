@@ -0,0 +1,178 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+import re
+
+CRLF = "\r\n"
+# Content lines are folded after this many octets, excluding the line break
+MAX_LINE_OCTETS = 75
+ICS_TIME_FORMAT = "%Y%m%dT%H%M%SZ"
+PRODID = "-//PM Tool//CalDAV Client//EN"
+CALENDAR_FOOTER = "END:VCALENDAR" + CRLF
+
+# Components returned by the parser; anything nested in them (VALARM) is skipped
+EVENT_COMPONENTS = frozenset({"VEVENT", "VTODO", "VJOURNAL"})
+
+# Properties whose values are not TEXT, so they are neither escaped nor unescaped
+NON_TEXT_PROPERTIES = frozenset({
+    "attach", "attendee", "completed", "created", "dtend", "dtstamp", "dtstart", "due",
+    "duration", "exdate", "freebusy", "geo", "last-modified", "organizer", "percent-complete",
+    "priority", "rdate", "recurrence-id", "rrule", "sequence", "trigger", "tzoffsetfrom",
+    "tzoffsetto", "tzurl", "url"
+})
+
+_UNESCAPE = re.compile(r"\\(.)", re.DOTALL)
+_UNESCAPED = {"n": "\n", "N": "\n"}
+
+def escape_text(value: str) -> str:
+    """Escape a TEXT value: backslash, semicolon, comma and line breaks"""
+    if "\\" in value:
+        value = value.replace("\\", "\\\\")
+    if ";" in value:
+        value = value.replace(";", "\\;")
+    if "," in value:
+        value = value.replace(",", "\\,")
+    if "\r" in value:
+        value = value.replace("\r\n", "\n").replace("\r", "\n")
+    if "\n" in value:
+        value = value.replace("\n", "\\n")
+    return value
+
+def unescape_text(value: str) -> str:
+    if "\\" not in value:
+        return value
+    return _UNESCAPE.sub(lambda match: _UNESCAPED.get(match.group(1), match.group(1)), value)
+
+def fold_line(line: str) -> str:
+    """Fold a content line into lines of at most 75 octets without splitting a UTF-8 sequence"""
+    if len(line) <= MAX_LINE_OCTETS and line.isascii():
+        return line
+    encoded = line.encode("utf-8")
+    if len(encoded) <= MAX_LINE_OCTETS:
+        return line
+    parts = []
+    start, limit = 0, MAX_LINE_OCTETS
+    while len(encoded) - start > limit:
+        end = start + limit
+        # Back off continuation bytes so each part decodes on its own
+        while encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode("utf-8"))
+        # Continuation lines start with a space, which counts against the limit
+        start, limit = end, MAX_LINE_OCTETS - 1
+    parts.append(encoded[start:].decode("utf-8"))
+    return (CRLF + " ").join(parts)
+
+def format_value(name: str, value: Any) -> str:
+    """Property value as written to the content line"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.strftime(ICS_TIME_FORMAT)
+    text = name.lower() not in NON_TEXT_PROPERTIES
+    if isinstance(value, (list, tuple)):
+        return ",".join(escape_text(str(item)) if text else str(item) for item in value)
+    return escape_text(str(value)) if text else str(value)
+
+def format_property(name: str, value: Any) -> str:
+    """One folded content line, without the trailing line break"""
+    return fold_line(f"{name.upper()}:{format_value(name, value)}")
+
+def format_event(event_data: Dict[str, Any], properties: Optional[Iterable[str]] = None) -> str:
+    """
+    Serialize an event dict as a component, CRLF terminated
+
+    Args:
+        event_data: Lowercase property names to values; ``component`` names the
+            component (VEVENT by default) and None or empty values are left out
+        properties: Only write these properties, in this order
+    """
+    component = event_data.get("component", "VEVENT")
+    names = event_data.keys() if properties is None else properties
+    lines = [f"BEGIN:{component}"]
+    for name in names:
+        if name == "component":
+            continue
+        value = event_data.get(name)
+        if value is None or value == "":
+            continue
+        lines.append(format_property(name, value))
+    lines.append(f"END:{component}")
+    lines.append("")
+    return CRLF.join(lines)
+
+def calendar_header(properties: Optional[Dict[str, Any]] = None) -> str:
+    """BEGIN:VCALENDAR with VERSION, PRODID and any further calendar properties"""
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}"]
+    lines.extend(format_property(name, value) for name, value in (properties or {}).items())
+    lines.append("")
+    return CRLF.join(lines)
+
+def format_ics(event_data: Dict[str, Any]) -> str:
+    """Serialize an event dict as a single-event VCALENDAR"""
+    return calendar_header() + format_event(event_data) + CALENDAR_FOOTER
+
+def parse_events(ics_data: str) -> List[Dict[str, str]]:
+    """
+    Parse the events, todos and journals of an iCalendar document
+
+    Lines are unfolded, property parameters dropped and TEXT values
+    unescaped. Property names are lowercased and the component name is
+    stored under ``component``; for repeated properties the last one wins.
+    """
+    if "\r" in ics_data:
+        ics_data = ics_data.replace("\r\n", "\n").replace("\r", "\n")
+    if "\n " in ics_data or "\n\t" in ics_data:
+        ics_data = ics_data.replace("\n ", "").replace("\n\t", "")
+
+    events = []
+    current: Optional[Dict[str, str]] = None
+    nested = 0
+    for line in ics_data.split("\n"):
+        colon = line.find(":")
+        if colon <= 0:
+            continue
+        semicolon = line.find(";", 0, colon)
+        if semicolon >= 0:
+            # A quoted parameter value may contain a colon
+            if '"' in line[semicolon:colon]:
+                colon = _value_start(line, semicolon)
+                if colon < 0:
+                    continue
+            name = line[:semicolon].lower()
+        else:
+            name = line[:colon].lower()
+        value = line[colon + 1:]
+
+        if name == "begin":
+            component = value.strip().upper()
+            if current is not None:
+                nested += 1
+            elif component in EVENT_COMPONENTS:
+                current = {"component": component}
+        elif name == "end":
+            if current is None:
+                continue
+            if nested:
+                nested -= 1
+            else:
+                events.append(current)
+                current = None
+        elif current is not None and not nested:
+            current[name] = value if name in NON_TEXT_PROPERTIES else unescape_text(value)
+    return events
+
+def parse_ics(ics_data: str) -> Dict[str, str]:
+    """Parse the first event of an iCalendar document, {} if there is none"""
+    events = parse_events(ics_data)
+    return events[0] if events else {}
+
+def _value_start(line: str, start: int) -> int:
+    """Index of the colon ending the parameters, skipping quoted parameter values"""
+    quoted = False
+    for i in range(start, len(line)):
+        char = line[i]
+        if char == '"':
+            quoted = not quoted
+        elif char == ":" and not quoted:
+            return i
+    return -1
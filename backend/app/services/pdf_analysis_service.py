@@ -4,7 +4,9 @@ from fastapi import UploadFile, HTTPException
 from fastapi.responses import FileResponse
 from app.services.openai_service import OpenAIService
 from app.services.caldav_service import CalDAVService
+from app.services.scheduling_service import SchedulingService
 from app.models.task import Task
+from app.models.task_dependency import TaskDependency
 from app.models.project import Project
 from app.models.user import User
 from sqlalchemy.orm import Session
@@ -270,6 +272,7 @@ class PDFAnalysisService:
     async def _create_tasks_from_analysis(self, project_id: int, analysis: Dict) -> List[Dict]:
         """Create task records from OpenAI analysis"""
         created_tasks = []
+        created_records = []
         tasks = analysis.get("tasks", [])
         
         if not tasks:
@@ -332,6 +335,7 @@ class PDFAnalysisService:
             # Add to session and get ID
             self.db.add(task)
             self.db.flush()
+            created_records.append((task, task_data.get("dependencies") or []))
 
             # Get project user ID for CalDAV sync
             project = self.db.query(Project).filter(Project.id == project_id).first()
@@ -345,7 +349,7 @@ class PDFAnalysisService:
             # Then try to sync with CalDAV
             try:
                 print(f"Starting CalDAV sync for task {task.id} in project {project_id}")
-                caldav_service = CalDAVService()  # Service auto-initializes in __init__
+                caldav_service = CalDAVService.shared()  # Process-wide, storage is initialized once
                 
                 # Get user email for calendar path
                 user = self.db.query(User).filter(User.id == project.user_id).first()
@@ -411,9 +415,47 @@ class PDFAnalysisService:
             })
         
         try:
+            self._store_dependencies(created_records)
             self.db.commit()
         except Exception as e:
             self.db.rollback()
             raise HTTPException(status_code=500, detail=f"Error saving tasks: {str(e)}")
+        # New tasks and edges of an already booked project need placing
+        SchedulingService(self.db).reschedule_booked([task for task, _ in created_records])
             
         return created_tasks
+
+    def _store_dependencies(self, created_records: List) -> int:
+        """Persist dependency edges between tasks created from one analysis
+
+        The model references other tasks by title or description, so edges are
+        resolved against the tasks of the same analysis; unknown references and
+        self references are ignored.
+        """
+        tasks_by_text = {}
+        for task, _ in created_records:
+            for text in (task.title, task.description):
+                key = self._dependency_key(text)
+                if key and key not in tasks_by_text:
+                    tasks_by_text[key] = task.id
+
+        edges = set()
+        for task, dependencies in created_records:
+            if isinstance(dependencies, str):
+                dependencies = [dependencies]
+            for dependency in dependencies:
+                depends_on_id = tasks_by_text.get(self._dependency_key(dependency))
+                if depends_on_id and depends_on_id != task.id:
+                    edges.add((task.id, depends_on_id))
+
+        self.db.add_all([
+            TaskDependency(task_id=task_id, depends_on_id=depends_on_id)
+            for task_id, depends_on_id in sorted(edges)
+        ])
+        return len(edges)
+
+    @staticmethod
+    def _dependency_key(text) -> str:
+        if not isinstance(text, str):
+            return ""
+        return " ".join(text.lower().split())
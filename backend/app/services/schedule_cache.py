@@ -0,0 +1,129 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Set
+import hashlib
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from app.models.task import Task
+from app.models.task_dependency import TaskDependency
+from app.models.working_calendar import UserWorkingCalendar
+
+class ScheduleCache:
+    """
+    LRU of generated schedules keyed by a hash of everything they depend on
+
+    Because the key covers the task set, dependencies, working calendar and
+    start date, a changed project can never be served a stale schedule.
+    Invalidation on task writes only frees entries that can no longer be hit.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._project_keys: Dict[int, Set[str]] = {}
+        self._key_projects: Dict[str, int] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Stable digest of the repr of the given parts"""
+        return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, project_id: int, value: Any):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._key_projects[key] = project_id
+            self._project_keys.setdefault(project_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._forget(evicted)
+
+    def invalidate_project(self, project_id: int):
+        with self._lock:
+            for key in self._project_keys.pop(project_id, set()):
+                self._entries.pop(key, None)
+                self._key_projects.pop(key, None)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._project_keys.clear()
+            self._key_projects.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations
+            }
+
+    def _forget(self, key: str):
+        project_id = self._key_projects.pop(key, None)
+        keys = self._project_keys.get(project_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._project_keys[project_id]
+
+schedule_cache = ScheduleCache()
+
+def _record_change(target, project_id: Optional[int]):
+    """
+    Remember which projects' schedules a flush touched until the transaction ends
+
+    Only writes to the scheduling models get here; the commit and rollback
+    hooks are attached to the writing session on its first such change.
+    """
+    session = object_session(target)
+    if session is None:
+        return
+    if not event.contains(session, "after_commit", _invalidate_committed_changes):
+        event.listen(session, "after_commit", _invalidate_committed_changes)
+        event.listen(session, "after_rollback", _discard_rolled_back_changes)
+    session.info.setdefault("schedule_cache_projects", set()).add(project_id)
+
+def _task_changed(mapper, connection, target):
+    _record_change(target, target.project_id)
+
+def _project_wide_change(mapper, connection, target):
+    # Not tied to one project; rare enough to drop everything
+    _record_change(target, None)
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(Task, _event_name, _task_changed)
+    event.listen(TaskDependency, _event_name, _project_wide_change)
+    event.listen(UserWorkingCalendar, _event_name, _project_wide_change)
+
+def _invalidate_committed_changes(session):
+    pending = session.info.pop("schedule_cache_projects", None)
+    if not pending:
+        return
+    if None in pending:
+        schedule_cache.clear()
+        return
+    for project_id in pending:
+        schedule_cache.invalidate_project(project_id)
+
+def _discard_rolled_back_changes(session):
+    session.info.pop("schedule_cache_projects", None)
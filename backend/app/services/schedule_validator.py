@@ -0,0 +1,133 @@
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MINUTES_PER_DAY = 24 * 60
+
+class ScheduleValidator:
+    """
+    Single-pass validation of a list of slot dicts
+
+    Slots are grouped by lane, sorted by start and swept once, so
+    overlaps within a lane, overbooked days and non-working days are all found
+    in O(n log n). Slots without a lane belong to one shared lane, i.e. a
+    single person's bookings. Dates and times are parsed once per distinct
+    string.
+    """
+
+    # Upper bound on messages returned per list; the summary keeps exact counts
+    MAX_REPORTED = 1000
+
+    def __init__(self, hours_per_day: float = 8.0, holidays: Iterable[date] = (), workdays: Iterable[int] = (0, 1, 2, 3, 4)):
+        self.hours_per_day = hours_per_day
+        self.holidays = set(holidays)
+        self.workdays = frozenset(workdays)
+
+    def validate(self, slots: List[Dict]) -> Dict:
+        """
+        Validate slots with ``date``, ``hours`` and optionally ``start_time``,
+        ``end_time``, ``task_id`` and ``lane``
+
+        Returns:
+            Dict with is_valid, conflict and warning messages, and a summary of counts
+        """
+        summary = {"overlaps": 0, "overbooked_days": 0, "weekend_slots": 0, "holiday_slots": 0, "invalid_slots": 0}
+        conflicts: List[str] = []
+        warnings: List[str] = []
+        dates: Dict[str, Optional[date]] = {}
+
+        lanes: Dict = {}
+        for position, slot in enumerate(slots):
+            parsed = self._parse(slot, dates)
+            if parsed is None:
+                summary["invalid_slots"] += 1
+                self._report(conflicts, f"Invalid slot at position {position}: {slot}")
+                continue
+            lane, start, end, day, hours = parsed
+            # Untimed slots sort to the start of their day
+            sort_key = start if start is not None else day.toordinal() * MINUTES_PER_DAY
+            lanes.setdefault(lane, []).append((sort_key, position, start, end, day, hours))
+
+        for lane, entries in lanes.items():
+            entries.sort()
+            latest_end = None
+            latest_position = None
+            day_hours: Dict[date, float] = {}
+            for _, position, start, end, day, hours in entries:
+                if start is not None:
+                    if latest_end is not None and start < latest_end:
+                        summary["overlaps"] += 1
+                        self._report(conflicts, self._overlap_message(slots[latest_position], slots[position]))
+                    if latest_end is None or end > latest_end:
+                        latest_end = end
+                        latest_position = position
+
+                day_hours[day] = day_hours.get(day, 0.0) + hours
+
+                if day.weekday() not in self.workdays:
+                    summary["weekend_slots"] += 1
+                    self._report(warnings, f"Weekend work scheduled on {day.isoformat()}")
+                elif day in self.holidays:
+                    summary["holiday_slots"] += 1
+                    self._report(warnings, f"Holiday work scheduled on {day.isoformat()}")
+
+            # Days are visited in order, so totals are final once the lane is swept
+            for day, total in day_hours.items():
+                if total > self.hours_per_day + 1e-9:
+                    summary["overbooked_days"] += 1
+                    lane_label = f" in lane {lane}" if lane is not None else ""
+                    self._report(conflicts, f"Overbooked day on {day.isoformat()}{lane_label}: {total:g} hours scheduled")
+
+        return {
+            "is_valid": not conflicts,
+            "conflicts": conflicts,
+            "warnings": warnings,
+            "summary": summary
+        }
+
+    def _report(self, messages: List[str], message: str):
+        if len(messages) < self.MAX_REPORTED:
+            messages.append(message)
+
+    @staticmethod
+    def _parse(slot: Dict, dates: Dict[str, Optional[date]]) -> Optional[Tuple]:
+        """(lane, start, end, day, hours) with absolute minutes, or None if malformed"""
+        try:
+            label = slot["date"]
+            if label not in dates:
+                try:
+                    dates[label] = date.fromisoformat(label)
+                except (TypeError, ValueError):
+                    dates[label] = None
+            day = dates[label]
+            hours = float(slot.get("hours") or 0.0)
+            if day is None or hours < 0:
+                return None
+
+            start = end = None
+            if slot.get("start_time"):
+                base = day.toordinal() * MINUTES_PER_DAY
+                start = base + clock_minutes(slot["start_time"])
+                end = base + clock_minutes(slot["end_time"]) if slot.get("end_time") else start + int(round(hours * 60))
+                if end < start:
+                    return None
+            return slot.get("lane"), start, end, day, hours
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _overlap_message(first: Dict, second: Dict) -> str:
+        return (
+            f"Overlapping slots on {second['date']}: "
+            f"task {first.get('task_id')} {first.get('start_time')}-{first.get('end_time')} and "
+            f"task {second.get('task_id')} {second.get('start_time')}-{second.get('end_time')}"
+        )
+
+@lru_cache(maxsize=2048)
+def clock_minutes(value: str) -> int:
+    """Minutes since midnight of an HH:MM string"""
+    hours, minutes = value.split(":")[:2]
+    hours, minutes = int(hours), int(minutes)
+    if not (0 <= hours <= 24 and 0 <= minutes < 60):
+        raise ValueError(value)
+    return hours * 60 + minutes
@@ -1,38 +1,82 @@
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from collections import defaultdict
+from datetime import datetime, time
+from threading import Lock
+from typing import Iterable, List, Dict, Optional, Tuple
 from sqlalchemy.orm import Session
 from app.models.task import Task
 from app.models.project import Project
+from app.models.user import User
+from app.models.task_dependency import TaskDependency
+from app.models.scheduled_slot import ScheduledSlot, ProjectSchedule
 from app.services.openai_service import OpenAIService
+from app.services.dependency_scheduler import DependencyScheduler
+from app.services.capacity_scheduler import CapacityScheduler
+from app.services.deviation_alert_service import DeviationAlertService
+from app.services.interval_index import IntervalIndex
+from app.services.schedule_validator import ScheduleValidator, clock_minutes
+from app.services.schedule_cache import schedule_cache
+from app.models.working_calendar import UserWorkingCalendar
+from app.services.working_calendar import WorkingCalendar, compile_calendar, get_user_calendar
 
 class SchedulingService:
     """Service for handling task scheduling and timeline management"""
     
+    # Task fields that decide how much time a booked task needs
+    SCHEDULE_FIELDS = ("estimated_hours", "duration_hours", "status")
+    # Bookings of one user are placed one at a time within a process
+    _booking_locks: Dict[int, Lock] = defaultdict(Lock)
+    
     def __init__(self, db: Session):
         self.db = db
         self.openai_service = OpenAIService()
 
-    def schedule_tasks(self, project_id: int) -> Dict:
+    def schedule_tasks(self, project_id: int, max_lanes: Optional[int] = None) -> Dict:
         """
         Create an optimal schedule for project tasks considering dependencies and constraints
         
+        Results are cached by a hash of the task set, dependencies, working
+        calendar, start date and lane limit, so repeated requests for an
+        unchanged project skip planning.
+        
         Args:
             project_id: The ID of the project to schedule
+            max_lanes: Maximum number of tasks worked on in parallel (unbounded if None)
             
         Returns:
-            Dict containing the scheduling plan with task timelines
+            Dict containing the scheduling plan with task timelines and the critical path
         """
         # Get project and its tasks
         project = self.db.query(Project).filter(Project.id == project_id).first()
         if not project:
             raise ValueError("Project not found")
             
-        tasks = self.db.query(Task).filter(Task.project_id == project_id).all()
+        tasks = self.db.query(
+            Task.id, Task.description, Task.estimated_hours, Task.duration_hours, Task.confidence_score, Task.status
+        ).filter(Task.project_id == project_id).order_by(Task.id).all()
         if not tasks:
             return {
                 "status": "error",
                 "message": "No tasks found for project"
             }
+        dependencies = self.db.query(
+            TaskDependency.task_id, TaskDependency.depends_on_id
+        ).filter(TaskDependency.task_id.in_([task.id for task in tasks])).order_by(
+            TaskDependency.task_id, TaskDependency.depends_on_id
+        ).all()
+        calendar = self.get_working_calendar(project.user_id)
+        
+        # Everything the schedule depends on; the start date changes daily
+        cache_key = schedule_cache.make_key(
+            project_id,
+            [tuple(task) for task in tasks],
+            [tuple(dependency) for dependency in dependencies],
+            (calendar.start_minute, calendar.day_minutes, sorted(calendar.workdays), sorted(calendar.holidays), calendar.timezone),
+            calendar.now().date(),
+            max_lanes
+        )
+        cached = schedule_cache.get(cache_key)
+        if cached is not None:
+            return {**cached, "cached": True}
             
         # Convert tasks to scheduling format
         task_data = [
@@ -40,115 +84,467 @@ class SchedulingService:
                 "id": task.id,
                 "description": task.description,
                 "estimated_hours": task.estimated_hours,
+                "hours": task.estimated_hours or task.duration_hours or 0.0,
                 "confidence_score": task.confidence_score,
                 "status": task.status
             }
             for task in tasks
         ]
         
-        # Calculate working hours (8 hours per day, excluding weekends)
-        schedule = self._create_schedule(task_data)
+        # Order by dependencies, find the critical path and pack independent tasks into lanes
+        plan = DependencyScheduler(task_data, dependencies).plan(max_lanes=max_lanes)
         
-        return {
+        # Calculate working hours on the owner's working calendar
+        schedule = self._create_lane_schedule(task_data, plan, calendar)
+        
+        result = {
             "status": "success",
             "project_id": project_id,
             "schedule": schedule,
-            "total_duration_days": len(schedule),
+            "total_duration_days": len({slot["date"] for slot in schedule}),
             "earliest_start": schedule[0]["date"] if schedule else None,
-            "latest_end": schedule[-1]["date"] if schedule else None
+            "latest_end": max(slot["date"] for slot in schedule) if schedule else None,
+            "lanes": plan["lanes"],
+            "critical_path": plan["critical_path"],
+            "critical_path_hours": plan["critical_path_hours"],
+            "task_timings": [
+                {
+                    "task_id": task_id,
+                    "lane": plan["timings"][task_id]["lane"],
+                    "start_hours": plan["timings"][task_id]["start"],
+                    "end_hours": plan["timings"][task_id]["finish"],
+                    "slack_hours": plan["timings"][task_id]["slack"],
+                    "is_critical": plan["timings"][task_id]["is_critical"]
+                }
+                for task_id in plan["order"]
+            ],
+            "dependency_cycles": plan["cycle_task_ids"]
         }
+        schedule_cache.put(cache_key, project_id, result)
+        return {**result, "cached": False}
+
+    def book_project(self, project_id: int, start_date: Optional[datetime] = None) -> Dict:
+        """
+        Schedule a project into its owner's free time and persist the bookings
         
-    def _create_schedule(self, tasks: List[Dict]) -> List[Dict]:
-        """Create a daily schedule for tasks"""
-        schedule = []
-        current_date = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
-        remaining_hours = 8.0  # Standard work day
+        Slots already booked for the user's other projects are loaded into an
+        interval index, so tasks are placed into the remaining gaps instead of
+        claiming the same hours twice. Existing bookings of this project are
+        replaced and the schedule version is bumped.
         
-        for task in tasks:
-            task_hours = task["estimated_hours"]
+        Args:
+            project_id: The ID of the project to book
+            start_date: Earliest time to book (defaults to now)
             
-            while task_hours > 0:
-                # Skip weekends
-                if current_date.weekday() >= 5:
-                    current_date += timedelta(days=1)
-                    current_date = current_date.replace(hour=9, minute=0)
-                    remaining_hours = 8.0
-                    continue
-                
-                # Calculate hours to allocate in current day
-                hours_today = min(remaining_hours, task_hours)
-                
-                # Add to schedule
-                schedule.append({
-                    "date": current_date.strftime("%Y-%m-%d"),
-                    "task_id": task["id"],
-                    "description": task["description"],
-                    "hours": hours_today,
-                    "start_time": current_date.strftime("%H:%M"),
-                    "end_time": (current_date + timedelta(hours=hours_today)).strftime("%H:%M")
+        Returns:
+            Dict containing the booked slots and the critical path
+        """
+        project = self.db.query(Project).filter(Project.id == project_id).first()
+        if not project:
+            raise ValueError("Project not found")
+        
+        calendar = self.get_working_calendar(project.user_id)
+        start_date = max(calendar.local(start_date) if start_date else calendar.now(), calendar.now())
+        schedule = self.db.query(ProjectSchedule).filter(ProjectSchedule.project_id == project_id).first()
+        return self._book(project, calendar, start_date, schedule=schedule)
+
+    def reschedule_tasks(self, project_id: int, task_ids: List[int]) -> Dict:
+        """
+        Re-plan changed tasks of a booked project and their downstream dependents
+        
+        Slots of all other tasks stay where they are and are treated as busy
+        time, so a change to one task only moves the part of the schedule that
+        depends on it. Projects without a persisted schedule are booked in full.
+        
+        Args:
+            project_id: The ID of the project
+            task_ids: Tasks whose hours, status or dependencies changed
+            
+        Returns:
+            Dict containing the new schedule version and the slots that moved
+        """
+        project = self.db.query(Project).filter(Project.id == project_id).first()
+        if not project:
+            raise ValueError("Project not found")
+        
+        calendar = self.get_working_calendar(project.user_id)
+        schedule = self.db.query(ProjectSchedule).filter(ProjectSchedule.project_id == project_id).first()
+        if not schedule:
+            return self._book(project, calendar, calendar.now())
+        start_date = max(schedule.start_at, calendar.now())
+        return self._book(project, calendar, start_date, schedule=schedule, changed_task_ids=task_ids)
+
+    @classmethod
+    def schedule_state(cls, task: Task) -> Tuple:
+        """The task's values of SCHEDULE_FIELDS, to detect changes that need a reschedule"""
+        return tuple(getattr(task, field) for field in cls.SCHEDULE_FIELDS)
+
+    def reschedule_booked(self, tasks: Iterable[Task]) -> Dict[int, Dict]:
+        """
+        Re-plan changed, new or deleted tasks in every booked project they belong to
+        
+        Call after committing a change to a task's hours, status or
+        dependencies. Projects without a persisted schedule are left alone,
+        and a project that fails to re-plan does not stop the others.
+        
+        Returns:
+            The reschedule result per project ID
+        """
+        changed: Dict[int, List[int]] = {}
+        for task in tasks:
+            if task.project_id:
+                changed.setdefault(task.project_id, []).append(task.id)
+        if not changed:
+            return {}
+        booked = {
+            project_id for (project_id,) in self.db.query(ProjectSchedule.project_id).filter(
+                ProjectSchedule.project_id.in_(list(changed))
+            )
+        }
+        results = {}
+        for project_id in sorted(booked):
+            try:
+                results[project_id] = self.reschedule_tasks(project_id, changed[project_id])
+            except Exception as e:
+                # The task change itself is already committed
+                print(f"Could not reschedule project {project_id}: {str(e)}")
+        return results
+
+    def delete_task(self, task: Task) -> Dict[int, Dict]:
+        """
+        Delete a task with everything that refers to it and re-plan its dependents
+        
+        The dependents are looked up before the dependency edges go, and the
+        task's deviation sample is taken out of its owner's statistics; its
+        slots, edges, time entries and alert state are removed with it in one
+        transaction. Booked dependents are then pulled forward into the freed
+        time.
+        
+        Returns:
+            The reschedule result per project ID
+        """
+        dependents = self.db.query(Task).join(
+            TaskDependency, TaskDependency.task_id == Task.id
+        ).filter(TaskDependency.depends_on_id == task.id).all()
+        try:
+            if task.deviation_state is not None and task.deviation_state.sample is not None:
+                DeviationAlertService(self.db).on_hours_changed({task.id: None})
+            self.db.delete(task)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return self.reschedule_booked(dependents)
+
+    def _book(
+        self,
+        project: Project,
+        calendar: WorkingCalendar,
+        start_date: datetime,
+        schedule: Optional[ProjectSchedule] = None,
+        changed_task_ids: Optional[List[int]] = None
+    ) -> Dict:
+        """
+        Place tasks of a project and persist the result as a new schedule version
+        
+        Without ``changed_task_ids`` every task is (re)placed; otherwise only
+        the changed tasks and everything downstream of them. Bookings of the
+        same user are serialized, by a lock in this process and a row lock on
+        the user across processes, so two projects never claim the same hours.
+        """
+        with self._booking_locks[project.user_id]:
+            try:
+                # Held until the commit or rollback below
+                self.db.query(User.id).filter(User.id == project.user_id).with_for_update().first()
+                result = self._place(project, calendar, start_date, schedule, changed_task_ids)
+            except Exception:
+                self.db.rollback()
+                raise
+            if result["status"] != "success":
+                # Nothing was written; release the row lock
+                self.db.rollback()
+            return result
+
+    def _place(
+        self,
+        project: Project,
+        calendar: WorkingCalendar,
+        start_date: datetime,
+        schedule: Optional[ProjectSchedule],
+        changed_task_ids: Optional[List[int]]
+    ) -> Dict:
+        project_id = project.id
+        tasks = self.db.query(Task).filter(Task.project_id == project_id).all()
+        if not tasks:
+            return {
+                "status": "error",
+                "message": "No tasks found for project"
+            }
+        
+        task_data = [
+            {"id": task.id, "hours": self._remaining_hours(task)}
+            for task in tasks
+        ]
+        dependencies = self.db.query(
+            TaskDependency.task_id, TaskDependency.depends_on_id
+        ).filter(TaskDependency.task_id.in_([task.id for task in tasks])).all()
+        scheduler = DependencyScheduler(task_data, dependencies)
+        plan = scheduler.plan()
+        
+        existing = self.db.query(ScheduledSlot).filter(ScheduledSlot.project_id == project_id).all()
+        if changed_task_ids is None:
+            replanned = set(scheduler.task_ids)
+        else:
+            replanned = scheduler.downstream_ids(changed_task_ids)
+        # Slots of deleted tasks are dropped as well
+        dropped = [slot for slot in existing if slot.task_id in replanned or slot.task_id not in scheduler.index]
+        kept = [slot for slot in existing if slot.task_id not in replanned and slot.task_id in scheduler.index]
+        
+        booked = self.db.query(ScheduledSlot.start_at, ScheduledSlot.end_at).filter(
+            ScheduledSlot.user_id == project.user_id,
+            ScheduledSlot.project_id != project_id,
+            ScheduledSlot.end_at > start_date
+        ).all()
+        index = IntervalIndex(
+            [(calendar.to_working_minute(start_at), calendar.to_working_minute(end_at)) for start_at, end_at in booked]
+            + [(calendar.to_working_minute(slot.start_at), calendar.to_working_minute(slot.end_at)) for slot in kept]
+        )
+        finished = {}
+        for slot in kept:
+            finished[slot.task_id] = max(finished.get(slot.task_id, 0), calendar.to_working_minute(slot.end_at))
+        
+        # Critical tasks first among those that can start at the same time
+        timings = plan["timings"]
+        position = {task_id: pos for pos, task_id in enumerate(plan["order"])}
+        order = sorted(
+            (task_id for task_id in plan["order"] if task_id in replanned),
+            key=lambda task_id: (timings[task_id]["earliest_start"], timings[task_id]["slack"], position[task_id])
+        )
+        placements = CapacityScheduler(index).place(
+            order,
+            {task["id"]: int(round(task["hours"] * 60)) for task in task_data},
+            scheduler.predecessor_ids(),
+            calendar.to_working_minute(start_date),
+            finished
+        )
+        
+        version = schedule.version + 1 if schedule else 1
+        slots = []
+        for task_id in order:
+            for fragment_start, fragment_end in placements[task_id]:
+                for start, end in calendar.split_by_working_day(fragment_start, fragment_end):
+                    slots.append(ScheduledSlot(
+                        user_id=project.user_id,
+                        project_id=project_id,
+                        task_id=task_id,
+                        start_at=calendar.from_working_minute(start),
+                        end_at=calendar.from_working_minute(end, is_end=True),
+                        version=version
+                    ))
+        moved_slots = self._moved_slots(dropped, slots)
+        
+        try:
+            if schedule is None:
+                schedule = ProjectSchedule(project_id=project_id)
+                self.db.add(schedule)
+            schedule.version = version
+            if changed_task_ids is None:
+                schedule.start_at = start_date
+            if dropped:
+                self.db.query(ScheduledSlot).filter(
+                    ScheduledSlot.id.in_([slot.id for slot in dropped])
+                ).delete(synchronize_session=False)
+            self.db.add_all(slots)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        
+        schedule_slots = sorted(
+            (slot.to_dict() for slot in kept + slots),
+            key=lambda slot: (slot["date"], slot["start_time"])
+        )
+        return {
+            "status": "success",
+            "project_id": project_id,
+            "version": version,
+            "schedule": schedule_slots,
+            "total_duration_days": len({slot["date"] for slot in schedule_slots}),
+            "earliest_start": schedule_slots[0]["date"] if schedule_slots else None,
+            "latest_end": schedule_slots[-1]["date"] if schedule_slots else None,
+            "existing_bookings": len(booked),
+            "replanned_task_ids": order,
+            "moved_slots": moved_slots,
+            "critical_path": plan["critical_path"],
+            "dependency_cycles": plan["cycle_task_ids"]
+        }
+
+    @staticmethod
+    def _remaining_hours(task: Task) -> float:
+        """Hours still to be booked for a task; completed tasks need none"""
+        if task.status == "completed":
+            return 0.0
+        return task.estimated_hours or task.duration_hours or 0.0
+
+    @staticmethod
+    def _moved_slots(previous: List[ScheduledSlot], current: List[ScheduledSlot]) -> List[Dict]:
+        """Per task, the slots before and after re-planning if they differ"""
+        before: Dict[int, List[ScheduledSlot]] = {}
+        after: Dict[int, List[ScheduledSlot]] = {}
+        for slot in previous:
+            before.setdefault(slot.task_id, []).append(slot)
+        for slot in current:
+            after.setdefault(slot.task_id, []).append(slot)
+        
+        moved = []
+        for task_id in sorted(before.keys() | after.keys()):
+            old = sorted(before.get(task_id, []), key=lambda slot: slot.start_at)
+            new = sorted(after.get(task_id, []), key=lambda slot: slot.start_at)
+            if [(slot.start_at, slot.end_at) for slot in old] != [(slot.start_at, slot.end_at) for slot in new]:
+                moved.append({
+                    "task_id": task_id,
+                    "previous": [slot.to_dict() for slot in old],
+                    "current": [slot.to_dict() for slot in new]
                 })
-                
-                task_hours -= hours_today
-                remaining_hours -= hours_today
-                
-                # Move to next day if current day is full
-                if remaining_hours <= 0:
-                    current_date += timedelta(days=1)
-                    current_date = current_date.replace(hour=9, minute=0)
-                    remaining_hours = 8.0
-                else:
-                    current_date += timedelta(hours=hours_today)
-                    
+        return moved
+
+    def get_working_calendar(self, user_id: int) -> WorkingCalendar:
+        """The user's compiled working calendar, or the standard Monday-Friday 9:00-17:00 week"""
+        return get_user_calendar(self.db, user_id)
+
+    def update_working_calendar(self, user_id: int, data: Dict) -> Dict:
+        """
+        Create or replace a user's working calendar
+        
+        Args:
+            data: timezone, start_time/end_time as HH:MM, workdays and holidays
+        """
+        start_minute = clock_minutes(data.get("start_time", "09:00"))
+        end_minute = clock_minutes(data.get("end_time", "17:00"))
+        holidays = [day.isoformat() for day in data.get("holidays", [])]
+        # Compiling validates the definition before anything is stored
+        compile_calendar(start_minute, end_minute - start_minute, data["workdays"], data.get("holidays", []), data.get("timezone"))
+        
+        definition = self.db.query(UserWorkingCalendar).filter(UserWorkingCalendar.user_id == user_id).first()
+        if definition is None:
+            definition = UserWorkingCalendar(user_id=user_id)
+            self.db.add(definition)
+        definition.timezone = data.get("timezone")
+        definition.start_minute = start_minute
+        definition.day_minutes = end_minute - start_minute
+        definition.workdays = list(data["workdays"])
+        definition.holidays = sorted(set(holidays))
+        self.db.commit()
+        return definition.to_dict()
+
+    def _create_lane_schedule(self, tasks: List[Dict], plan: Dict, calendar: WorkingCalendar) -> List[Dict]:
+        """Turn planned working-hour offsets into daily slots per lane"""
+        project_start = calendar.to_working_minute(datetime.combine(calendar.now().date(), time.min))
+        return self._materialize_slots(self._timeline_slices(plan, project_start, calendar.day_minutes), tasks, plan, calendar)
+
+    @staticmethod
+    def _timeline_slices(plan: Dict, project_start: int, day_minutes: int) -> List[Tuple[int, int, int]]:
+        """
+        Compact (task_id, start, end) slices on the working-minute timeline
+        
+        Each slice stays within one working day; slices are ordered by start
+        and lane.
+        """
+        timings = plan["timings"]
+        keyed = []
+        for task_id in plan["order"]:
+            timing = timings[task_id]
+            lane = timing["lane"]
+            start = project_start + int(round(timing["start"] * 60))
+            end = project_start + int(round(timing["finish"] * 60))
+            while start < end:
+                piece_end = min(end, (start // day_minutes + 1) * day_minutes)
+                keyed.append((start, lane, task_id, piece_end))
+                start = piece_end
+        keyed.sort()
+        return [(task_id, start, end) for start, _, task_id, end in keyed]
+
+    @staticmethod
+    def _materialize_slots(slices: List[Tuple[int, int, int]], tasks: List[Dict], plan: Dict, calendar: WorkingCalendar) -> List[Dict]:
+        """Build the API slot dicts from compact slices, formatting each working day once"""
+        descriptions = {task["id"]: task["description"] for task in tasks}
+        timings = plan["timings"]
+        day_minutes = calendar.day_minutes
+        dates = {}
+        schedule = []
+        for task_id, start, end in slices:
+            day, start_minute = divmod(start, day_minutes)
+            label = dates.get(day)
+            if label is None:
+                label = dates[day] = calendar.working_day_date(day).isoformat()
+            schedule.append({
+                "date": label,
+                "task_id": task_id,
+                "description": descriptions[task_id],
+                "hours": (end - start) / 60,
+                "start_time": calendar.clock_time(start_minute),
+                "end_time": calendar.clock_time(end - day * day_minutes),
+                "lane": timings[task_id]["lane"]
+            })
         return schedule
 
-    def get_available_slots(self, start_date: datetime, end_date: datetime) -> List[Dict]:
-        """Get available time slots between two dates"""
+    def get_available_slots(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        busy_intervals: Optional[List[Tuple[datetime, datetime]]] = None,
+        calendar: Optional[WorkingCalendar] = None
+    ) -> List[Dict]:
+        """
+        Get free working time between two dates
+        
+        Busy intervals (e.g. calendar events) are merged and subtracted from the
+        working hours of the calendar (the standard week if None). Consecutive
+        working days with the same free window are returned as a single range
+        entry from ``date`` to ``end_date``.
+        """
+        calendar = calendar or compile_calendar()
+        day_minutes = calendar.day_minutes
+        window_start = calendar.to_working_minute(datetime.combine(calendar.local(start_date).date(), time.min))
+        window_end = calendar.to_working_minute(datetime.combine(calendar.local(end_date).date(), time.max))
+        
+        busy = IntervalIndex(
+            (calendar.to_working_minute(busy_start), calendar.to_working_minute(busy_end))
+            for busy_start, busy_end in busy_intervals or []
+        )
+        
+        runs = []
+        for gap_start, gap_end in busy.gaps(window_start, window_end):
+            for run in calendar.day_runs(gap_start, gap_end):
+                previous = runs[-1] if runs else None
+                if previous and previous[1] + 1 == run[0] and previous[2:] == run[2:]:
+                    runs[-1] = (previous[0], run[1], run[2], run[3])
+                else:
+                    runs.append(run)
+        
         slots = []
-        current_date = start_date
-        
-        while current_date <= end_date:
-            if current_date.weekday() < 5:  # Skip weekends
-                slots.append({
-                    "date": current_date.strftime("%Y-%m-%d"),
-                    "available_hours": 8.0,
-                    "start_time": "09:00",
-                    "end_time": "17:00"
-                })
-            current_date += timedelta(days=1)
+        for first_day, last_day, start_minute, end_minute in runs:
+            slots.append({
+                "date": calendar.working_day_date(first_day).isoformat(),
+                "end_date": calendar.working_day_date(last_day).isoformat(),
+                "days": last_day - first_day + 1,
+                "available_hours": (end_minute - start_minute) / 60,
+                "start_time": calendar.clock_time(start_minute),
+                "end_time": calendar.clock_time(end_minute)
+            })
             
         return slots
 
-    def validate_schedule(self, schedule: List[Dict]) -> Dict:
-        """Validate a schedule for conflicts and constraints"""
-        validation = {
-            "is_valid": True,
-            "conflicts": [],
-            "warnings": []
-        }
+    def validate_schedule(self, schedule: List[Dict], calendar: Optional[WorkingCalendar] = None) -> Dict:
+        """
+        Validate a schedule for overlaps, overbooked days and non-working days
         
-        # Check for overbooked days
-        daily_hours = {}
-        for slot in schedule:
-            date = slot["date"]
-            hours = slot["hours"]
-            
-            if date not in daily_hours:
-                daily_hours[date] = hours
-            else:
-                daily_hours[date] += hours
-                
-            if daily_hours[date] > 8:
-                validation["is_valid"] = False
-                validation["conflicts"].append(
-                    f"Overbooked day on {date}: {daily_hours[date]} hours scheduled"
-                )
-                
-        # Check for weekend work
-        for slot in schedule:
-            date_obj = datetime.strptime(slot["date"], "%Y-%m-%d")
-            if date_obj.weekday() >= 5:
-                validation["warnings"].append(
-                    f"Weekend work scheduled on {slot['date']}"
-                )
-                
-        return validation
+        Overlaps and overbooking make the schedule invalid; work on days that
+        are not working days of the calendar is reported as a warning.
+        """
+        calendar = calendar or compile_calendar()
+        return ScheduleValidator(
+            hours_per_day=calendar.day_minutes / 60,
+            holidays=calendar.holidays,
+            workdays=calendar.workdays
+        ).validate(schedule)
@@ -0,0 +1,206 @@
+from datetime import datetime, timezone
+from typing import List, Dict, Iterable, Set, Tuple
+import math
+from sqlalchemy import insert, update, bindparam, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.models.task import Task
+from app.models.project import Project
+from app.models.time_entry import TimeEntry, TaskTimeAggregate
+from app.services.deviation_alert_service import DeviationAlertService
+
+class TimeEntryService:
+    """Service for ingesting tracked hours and maintaining per-task totals"""
+
+    INSERT_CHUNK_SIZE = 1000
+    MAX_HOURS_PER_ENTRY = 24.0
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ingest_entries(self, entries: List[Dict], user_id: int) -> Dict:
+        """
+        Append a batch of time entries and update the per-task aggregates
+
+        Entries are inserted with executemany in fixed-size chunks and the
+        aggregates are bumped by the batch deltas in a single upsert, so the
+        cost of a batch does not depend on how many entries a task already has.
+
+        Args:
+            entries: Dicts with task_id, hours and optional spent_at/note
+            user_id: The user booking the hours; tasks must belong to their projects
+
+        Returns:
+            Dict with accepted/rejected counts and the new total per touched task
+        """
+        valid, rejected = self._validate_entries(entries)
+        owned_task_ids = self._owned_task_ids({entry["task_id"] for _, entry in valid}, user_id)
+
+        now = datetime.now(timezone.utc)
+        rows = []
+        for index, entry in valid:
+            if entry["task_id"] not in owned_task_ids:
+                rejected.append({"index": index, "task_id": entry["task_id"], "reason": "Task not found"})
+                continue
+            rows.append({
+                "task_id": entry["task_id"],
+                "user_id": user_id,
+                "hours": float(entry["hours"]),
+                "spent_at": entry.get("spent_at") or now,
+                "note": entry.get("note")
+            })
+
+        if not rows:
+            return {
+                "status": "success",
+                "accepted": 0,
+                "rejected": rejected,
+                "task_totals": {}
+            }
+
+        try:
+            for start in range(0, len(rows), self.INSERT_CHUNK_SIZE):
+                self.db.execute(insert(TimeEntry), rows[start:start + self.INSERT_CHUNK_SIZE])
+            deltas = self._aggregate_deltas(rows)
+            totals = self._apply_deltas(deltas)
+            alerts = DeviationAlertService(self.db).on_hours_changed(totals)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return {
+            "status": "success",
+            "accepted": len(rows),
+            "rejected": rejected,
+            "task_totals": totals,
+            "alerts_raised": len(alerts)
+        }
+
+    def correct_total(self, task_id: int, user_id: int, actual_hours: float) -> Dict[int, float]:
+        """
+        Bring a task's tracked total to a manually entered value
+
+        The difference to the current aggregate is booked as a correction
+        entry, so the aggregate stays the sum of the task's entries and later
+        ingests add on top of the corrected total. The caller commits.
+
+        Args:
+            task_id: The task whose total is corrected
+            user_id: The user booking the correction
+            actual_hours: The new total
+
+        Returns:
+            Dict mapping the task id to its new total
+        """
+        aggregate = self.db.query(TaskTimeAggregate).filter(
+            TaskTimeAggregate.task_id == task_id
+        ).with_for_update().first()
+        delta = float(actual_hours) - (aggregate.total_hours if aggregate else 0.0)
+        if delta == 0 and aggregate:
+            return {task_id: aggregate.total_hours}
+
+        row = {
+            "task_id": task_id,
+            "user_id": user_id,
+            "hours": delta,
+            "spent_at": datetime.now(timezone.utc),
+            "note": "Manual correction"
+        }
+        self.db.execute(insert(TimeEntry), [row])
+        return self._apply_deltas(self._aggregate_deltas([row]))
+
+    def get_task_totals(self, task_ids: Iterable[int], user_id: int) -> List[Dict]:
+        """Read the maintained aggregates for tasks owned by the user"""
+        task_ids = set(task_ids)
+        if not task_ids:
+            return []
+        aggregates = self.db.query(TaskTimeAggregate).join(
+            Task, Task.id == TaskTimeAggregate.task_id
+        ).join(Task.project).filter(
+            TaskTimeAggregate.task_id.in_(task_ids),
+            Project.user_id == user_id
+        ).all()
+        return [aggregate.to_dict() for aggregate in aggregates]
+
+    def _validate_entries(self, entries: List[Dict]) -> Tuple[List[Tuple[int, Dict]], List[Dict]]:
+        """Split entries into (index, entry) pairs that can be booked and rejections"""
+        valid = []
+        rejected = []
+        for index, entry in enumerate(entries):
+            hours = entry.get("hours")
+            if entry.get("task_id") is None:
+                reason = "Missing task_id"
+            elif not isinstance(hours, (int, float)) or not math.isfinite(hours):
+                reason = "hours must be a number"
+            elif hours == 0:
+                reason = "hours must not be zero"
+            elif abs(hours) > self.MAX_HOURS_PER_ENTRY:
+                reason = f"hours must not exceed {self.MAX_HOURS_PER_ENTRY:g} per entry"
+            else:
+                valid.append((index, entry))
+                continue
+            rejected.append({"index": index, "task_id": entry.get("task_id"), "reason": reason})
+        return valid, rejected
+
+    def _owned_task_ids(self, task_ids: Set[int], user_id: int) -> Set[int]:
+        """Resolve which of the given tasks belong to the user's projects in one query"""
+        if not task_ids:
+            return set()
+        rows = self.db.query(Task.id).join(Task.project).filter(
+            Task.id.in_(task_ids),
+            Project.user_id == user_id
+        ).all()
+        return {row[0] for row in rows}
+
+    @staticmethod
+    def _aggregate_deltas(rows: List[Dict]) -> Dict[int, Dict]:
+        """Collapse a batch of entries into one delta per task"""
+        deltas = {}
+        for row in rows:
+            delta = deltas.get(row["task_id"])
+            if delta is None:
+                deltas[row["task_id"]] = {
+                    "hours": row["hours"],
+                    "count": 1,
+                    "last_spent_at": row["spent_at"]
+                }
+                continue
+            delta["hours"] += row["hours"]
+            delta["count"] += 1
+            if row["spent_at"] > delta["last_spent_at"]:
+                delta["last_spent_at"] = row["spent_at"]
+        return deltas
+
+    def _apply_deltas(self, deltas: Dict[int, Dict]) -> Dict[int, float]:
+        """Add batch deltas to the aggregates and mirror the totals onto the tasks"""
+        stmt = pg_insert(TaskTimeAggregate).values([
+            {
+                "task_id": task_id,
+                "total_hours": delta["hours"],
+                "entry_count": delta["count"],
+                "last_spent_at": delta["last_spent_at"]
+            }
+            for task_id, delta in deltas.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TaskTimeAggregate.task_id],
+            set_={
+                "total_hours": TaskTimeAggregate.total_hours + stmt.excluded.total_hours,
+                "entry_count": TaskTimeAggregate.entry_count + stmt.excluded.entry_count,
+                "last_spent_at": func.greatest(TaskTimeAggregate.last_spent_at, stmt.excluded.last_spent_at),
+                "updated_at": func.now()
+            }
+        ).returning(TaskTimeAggregate.task_id, TaskTimeAggregate.total_hours)
+        totals = {row[0]: row[1] for row in self.db.execute(stmt).all()}
+
+        # Task.actual_hours stays readable for existing consumers, but is now
+        # derived from the aggregate rather than overwritten by clients
+        task_table = Task.__table__
+        self.db.execute(
+            update(task_table)
+            .where(task_table.c.id == bindparam("b_task_id"))
+            .values(actual_hours=bindparam("b_total_hours")),
+            [{"b_task_id": task_id, "b_total_hours": total} for task_id, total in totals.items()]
+        )
+        return totals
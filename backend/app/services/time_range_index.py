@@ -0,0 +1,162 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import os
+
+ICS_TIME_FORMAT = "%Y%m%dT%H%M%SZ"
+_EPOCH = datetime(1970, 1, 1)
+
+def ics_timestamp(value) -> Optional[int]:
+    """Seconds since the epoch for an ICS UTC time string or a datetime"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    else:
+        try:
+            value = datetime.strptime(value, ICS_TIME_FORMAT)
+        except (TypeError, ValueError):
+            return None
+    return int((value - _EPOCH).total_seconds())
+
+def event_span(event_data: Dict[str, str]) -> Optional[Tuple[int, int]]:
+    """(dtstart, dtend) of a parsed event as timestamps, None if either is unreadable"""
+    start = ics_timestamp(event_data.get("dtstart"))
+    end = ics_timestamp(event_data.get("dtend"))
+    if start is None or end is None:
+        return None
+    return start, end
+
+class TimeRangeIndex:
+    """
+    Events of one calendar sorted by dtstart and by dtend
+
+    A range query is two bisects, one per sorted list, so only the events
+    that actually start or end in the window are returned. The index is
+    persisted next to the events as an append-only journal of
+    ``uid start end mtime`` lines (``uid -`` for removals), which makes a
+    write O(1) on disk and lets a new process load the index without opening
+    any event file. The journal is compacted once dead lines dominate.
+    """
+
+    JOURNAL_DIR = ".index"
+    JOURNAL_NAME = "time-range"
+
+    def __init__(self, calendar_path: str):
+        self.journal_path = os.path.join(calendar_path, self.JOURNAL_DIR, self.JOURNAL_NAME)
+        # uid -> (start, end, file mtime)
+        self.entries: Dict[str, Tuple[int, int, int]] = {}
+        self._starts: List[Tuple[int, str]] = []
+        self._ends: List[Tuple[int, str]] = []
+        self._journal_lines = 0
+        # Generation of the collection index this was last reconciled with
+        self.synced_generation: Optional[int] = None
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def overlapping(self, start: int, end: int) -> List[str]:
+        """UIDs of events that start or end within ``[start, end]``, in start order"""
+        found = set()
+        for keys in (self._starts, self._ends):
+            first = bisect_left(keys, (start, ""))
+            last = bisect_right(keys, (end, "\uffff"))
+            found.update(uid for _, uid in keys[first:last])
+        return sorted(found, key=lambda uid: (self.entries[uid][0], uid))
+
+    def put(self, uid: str, start: int, end: int, mtime_ns: int):
+        """Add or move one event"""
+        self._remove(uid)
+        self._insert(uid, start, end, mtime_ns)
+        self._write_journal([f"{uid}\t{start}\t{end}\t{mtime_ns}"])
+
+    def remove(self, uid: str):
+        if self._remove(uid):
+            self._write_journal([f"{uid}\t-"])
+
+    def reconcile(self, files: Dict[str, Tuple[str, int]], load: Callable[[str, str, int], Optional[Dict[str, str]]]):
+        """
+        Bring the index in line with a collection's files
+
+        Only events that are new or whose file mtime changed are loaded.
+
+        Args:
+            files: UID -> (file name, file mtime) of the collection
+            load: Returns the parsed event for (uid, file name, mtime), or None
+        """
+        lines = []
+        for uid in [uid for uid in self.entries if uid not in files]:
+            del self.entries[uid]
+            lines.append(f"{uid}\t-")
+        for uid, (file_name, mtime_ns) in files.items():
+            entry = self.entries.get(uid)
+            if entry is not None and entry[2] == mtime_ns:
+                continue
+            data = load(uid, file_name, mtime_ns)
+            span = event_span(data) if data else None
+            if span is None:
+                if self.entries.pop(uid, None) is not None:
+                    lines.append(f"{uid}\t-")
+                continue
+            self.entries[uid] = (span[0], span[1], mtime_ns)
+            lines.append(f"{uid}\t{span[0]}\t{span[1]}\t{mtime_ns}")
+        if lines:
+            self._rebuild()
+            self._write_journal(lines)
+
+    def compact(self):
+        """Rewrite the journal with one line per indexed event"""
+        os.makedirs(os.path.dirname(self.journal_path), mode=0o755, exist_ok=True)
+        temp_path = self.journal_path + ".tmp"
+        with open(temp_path, "w") as f:
+            f.writelines(self._lines())
+        os.replace(temp_path, self.journal_path)
+        self._journal_lines = len(self.entries)
+
+    def _lines(self) -> Iterable[str]:
+        for uid, (start, end, mtime_ns) in self.entries.items():
+            yield f"{uid}\t{start}\t{end}\t{mtime_ns}\n"
+
+    def _load(self):
+        try:
+            journal = open(self.journal_path)
+        except FileNotFoundError:
+            return
+        with journal:
+            for line in journal:
+                self._journal_lines += 1
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) == 2 and parts[1] == "-":
+                    self.entries.pop(parts[0], None)
+                elif len(parts) == 4:
+                    try:
+                        self.entries[parts[0]] = (int(parts[1]), int(parts[2]), int(parts[3]))
+                    except ValueError:
+                        continue
+        self._rebuild()
+
+    def _rebuild(self):
+        self._starts = sorted((start, uid) for uid, (start, _, _) in self.entries.items())
+        self._ends = sorted((end, uid) for uid, (_, end, _) in self.entries.items())
+
+    def _insert(self, uid: str, start: int, end: int, mtime_ns: int):
+        self.entries[uid] = (start, end, mtime_ns)
+        insort(self._starts, (start, uid))
+        insort(self._ends, (end, uid))
+
+    def _remove(self, uid: str) -> bool:
+        entry = self.entries.pop(uid, None)
+        if entry is None:
+            return False
+        del self._starts[bisect_left(self._starts, (entry[0], uid))]
+        del self._ends[bisect_left(self._ends, (entry[1], uid))]
+        return True
+
+    def _write_journal(self, lines: List[str]):
+        if self._journal_lines + len(lines) > 2 * len(self.entries) + 1000:
+            self.compact()
+            return
+        os.makedirs(os.path.dirname(self.journal_path), mode=0o755, exist_ok=True)
+        with open(self.journal_path, "a") as f:
+            f.writelines(line + "\n" for line in lines)
+        self._journal_lines += len(lines)
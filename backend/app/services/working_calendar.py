@@ -0,0 +1,230 @@
+from array import array
+from bisect import bisect_left
+from datetime import datetime, date, time, timedelta, MINYEAR, MAXYEAR
+from functools import lru_cache
+from threading import Lock
+from typing import Dict, Iterable, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlalchemy.orm import Session
+
+from app.services.working_time import (
+    EPOCH,
+    WORKDAY_START_MINUTE,
+    WORKDAY_MINUTES,
+    split_by_working_day,
+    day_runs,
+    clock_time
+)
+from app.models.working_calendar import UserWorkingCalendar
+
+STANDARD_WORKDAYS = (0, 1, 2, 3, 4)
+
+class CalendarRangeError(ValueError):
+    """A working day or minute maps to a date outside the supported years"""
+
+class WorkingCalendar:
+    """
+    A person's working time on a consecutive working-day line
+
+    Working days are numbered consecutively, so working minute ``m`` is
+    minute ``m % day_minutes`` of working day ``m // day_minutes``, counted
+    from the ``working_time`` epoch. The number of
+    working days before a calendar day is counted from whole weeks plus a
+    bisect over the holidays, so converting a datetime to its next working
+    minute needs no tables. Mapping a working day back to its date uses a
+    small table of the working days of one year, compiled on first use.
+
+    Naive datetimes are wall-clock times in the calendar's timezone; aware
+    datetimes are converted first. Without a timezone the server's local time
+    is used.
+    """
+
+    # Year tables kept per calendar; about 2 KB each
+    MAX_COMPILED_YEARS = 32
+
+    def __init__(
+        self,
+        start_minute: int = WORKDAY_START_MINUTE,
+        day_minutes: int = WORKDAY_MINUTES,
+        workdays: Iterable[int] = STANDARD_WORKDAYS,
+        holidays: Iterable[date] = (),
+        timezone: Optional[str] = None
+    ):
+        workdays = frozenset(workdays)
+        if day_minutes <= 0 or start_minute < 0 or start_minute + day_minutes > 24 * 60:
+            raise ValueError("Working hours must lie within one day")
+        if not workdays or not workdays <= set(range(7)):
+            raise ValueError("Workdays must be weekday numbers 0 (Monday) to 6 (Sunday)")
+
+        self.start_minute = start_minute
+        self.day_minutes = day_minutes
+        self.workdays = workdays
+        self.holidays = frozenset(holidays)
+        self.timezone = timezone
+        try:
+            self.tz = ZoneInfo(timezone) if timezone else None
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown timezone: {timezone}")
+
+        # The epoch is a Monday, so a day offset modulo 7 is its weekday
+        self._weekdays = sorted(workdays)
+        # Day offsets of holidays that fall on a workday
+        self._holiday_offsets = sorted({
+            (day - EPOCH).days for day in self.holidays if day.weekday() in workdays
+        })
+        # Year -> (index of its first working day, day offsets of its working days)
+        self._years: Dict[int, Tuple[int, array]] = {}
+        self._years_lock = Lock()
+        # Working day indexes covered by years MINYEAR-MAXYEAR
+        self._day_range = (
+            self._days_before(self._year_offset(MINYEAR)),
+            self._days_before(self._year_offset(MAXYEAR + 1))
+        )
+
+    def local(self, moment: datetime) -> datetime:
+        """Naive wall-clock time of a datetime in this calendar's timezone"""
+        if moment.tzinfo:
+            return moment.astimezone(self.tz).replace(tzinfo=None)
+        return moment
+
+    def now(self) -> datetime:
+        return datetime.now(self.tz).replace(tzinfo=None)
+
+    def is_working_day(self, day: date) -> bool:
+        offset = (day - EPOCH).days
+        if offset % 7 not in self.workdays:
+            return False
+        i = bisect_left(self._holiday_offsets, offset)
+        return i == len(self._holiday_offsets) or self._holiday_offsets[i] != offset
+
+    def to_working_minute(self, moment: datetime) -> int:
+        """Map a datetime onto the working-minute line, snapping forward outside working hours"""
+        moment = self.local(moment)
+        day = moment.date()
+        day_index = self._days_before((day - EPOCH).days)
+        if not self.is_working_day(day):
+            return day_index * self.day_minutes
+        minute_of_day = moment.hour * 60 + moment.minute - self.start_minute
+        minute_of_day = min(max(minute_of_day, 0), self.day_minutes)
+        return day_index * self.day_minutes + minute_of_day
+
+    def from_working_minute(self, minute: int, is_end: bool = False) -> datetime:
+        """
+        Map a working minute back to a naive local datetime
+
+        With ``is_end`` a minute on a day boundary resolves to the end of the
+        previous working day instead of the start of the next one.
+        """
+        day_index, minute_of_day = divmod(minute, self.day_minutes)
+        if is_end and minute_of_day == 0:
+            day_index -= 1
+            minute_of_day = self.day_minutes
+        day = self.working_day_date(day_index)
+        try:
+            return datetime(day.year, day.month, day.day) + timedelta(minutes=self.start_minute + minute_of_day)
+        except OverflowError:
+            raise CalendarRangeError("Date outside the working calendar range")
+
+    def next_working_minute(self, moment: datetime) -> datetime:
+        """The first working minute at or after ``moment``"""
+        return self.from_working_minute(self.to_working_minute(moment))
+
+    def working_day_date(self, day_index: int) -> date:
+        """
+        Calendar date of the working day with this index
+
+        Raises:
+            CalendarRangeError: If the day falls outside years 1-9999
+        """
+        if not self._day_range[0] <= day_index < self._day_range[1]:
+            raise CalendarRangeError("Date outside the working calendar range")
+        # Start from the year the day would fall in without holidays, then step to the right one
+        offset = min(max(day_index * 7 // len(self._weekdays), self._year_offset(MINYEAR)), self._year_offset(MAXYEAR))
+        year = (EPOCH + timedelta(days=offset)).year
+        while True:
+            first, offsets = self._year_table(year)
+            if first > day_index:
+                year -= 1
+            elif day_index - first >= len(offsets):
+                year += 1
+            else:
+                return EPOCH + timedelta(days=offsets[day_index - first])
+
+    def clock_time(self, minute_of_day: int) -> str:
+        return clock_time(minute_of_day, self.start_minute)
+
+    def split_by_working_day(self, start: int, end: int):
+        return split_by_working_day(start, end, self.day_minutes)
+
+    def day_runs(self, start: int, end: int):
+        return day_runs(start, end, self.day_minutes)
+
+    def _days_before(self, offset: int) -> int:
+        """Working days before the day ``offset`` days after the epoch (negative before it)"""
+        weeks, weekday = divmod(offset, 7)
+        return (
+            weeks * len(self._weekdays)
+            + bisect_left(self._weekdays, weekday)
+            - bisect_left(self._holiday_offsets, offset)
+        )
+
+    def _year_table(self, year: int) -> Tuple[int, array]:
+        """
+        Index of the year's first working day and the day offsets of its working days
+
+        Compiled on first use.
+        """
+        with self._years_lock:
+            table = self._years.get(year)
+            if table is None:
+                first, last = self._year_offset(year), self._year_offset(year + 1)
+                holidays = set(self._holiday_offsets[bisect_left(self._holiday_offsets, first):bisect_left(self._holiday_offsets, last)])
+                table = self._days_before(first), array("l", (
+                    offset for offset in range(first, last)
+                    if offset % 7 in self.workdays and offset not in holidays
+                ))
+                if len(self._years) >= self.MAX_COMPILED_YEARS:
+                    # Drop the year compiled first
+                    del self._years[next(iter(self._years))]
+                self._years[year] = table
+            return table
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _year_offset(year: int) -> int:
+        """Day offset of January 1st; year MAXYEAR + 1 gives the end of the range"""
+        if year > MAXYEAR:
+            return (date(MAXYEAR, 12, 31) - EPOCH).days + 1
+        return (date(year, 1, 1) - EPOCH).days
+
+@lru_cache(maxsize=256)
+def _compile(start_minute: int, day_minutes: int, workdays: Tuple[int, ...], holidays: Tuple[date, ...], timezone: Optional[str]) -> WorkingCalendar:
+    return WorkingCalendar(start_minute, day_minutes, workdays, holidays, timezone)
+
+def compile_calendar(
+    start_minute: int = WORKDAY_START_MINUTE,
+    day_minutes: int = WORKDAY_MINUTES,
+    workdays: Iterable[int] = STANDARD_WORKDAYS,
+    holidays: Iterable[date] = (),
+    timezone: Optional[str] = None
+) -> WorkingCalendar:
+    """
+    Get the compiled calendar for a definition
+
+    Compiled calendars are cached by their definition, so editing a user's
+    calendar simply compiles a new one on next use.
+    """
+    return _compile(start_minute, day_minutes, tuple(sorted(set(workdays))), tuple(sorted(set(holidays))), timezone)
+
+def get_user_calendar(db: Session, user_id: int) -> WorkingCalendar:
+    """The user's compiled working calendar, or the standard Monday-Friday 9:00-17:00 week"""
+    definition = db.query(UserWorkingCalendar).filter(UserWorkingCalendar.user_id == user_id).first()
+    if not definition:
+        return compile_calendar()
+    return compile_calendar(
+        definition.start_minute,
+        definition.day_minutes,
+        definition.workdays,
+        [date.fromisoformat(day) for day in definition.holidays or []],
+        definition.timezone
+    )
@@ -0,0 +1,42 @@
+from datetime import date
+
+# Standard working week: Monday-Friday, 9:00-17:00
+WORKDAY_START_MINUTE = 9 * 60
+WORKDAY_MINUTES = 8 * 60
+
+# Working-minute 0 is Monday 2001-01-01 at the start of the working day
+EPOCH = date(2001, 1, 1)
+
+def clock_time(minute_of_day: int, day_start_minute: int = WORKDAY_START_MINUTE) -> str:
+    """Format a working minute of the day (0-480) as HH:MM"""
+    hours, minutes = divmod(day_start_minute + minute_of_day, 60)
+    return f"{hours:02d}:{minutes:02d}"
+
+def split_by_working_day(start: int, end: int, day_minutes: int = WORKDAY_MINUTES):
+    """Yield (start, end) pieces of a working-minute interval that stay within one day"""
+    while start < end:
+        day_end = (start // day_minutes + 1) * day_minutes
+        piece_end = min(end, day_end)
+        yield start, piece_end
+        start = piece_end
+
+def day_runs(start: int, end: int, day_minutes: int = WORKDAY_MINUTES):
+    """
+    Describe a working-minute interval as runs of days sharing one window
+
+    Yields (first_day, last_day, start_minute, end_minute) tuples: at most a
+    partial first day, one run of full days and a partial last day.
+    """
+    first_day, start_minute = divmod(start, day_minutes)
+    last_day, end_minute = divmod(end, day_minutes)
+    if first_day == last_day:
+        if end_minute > start_minute:
+            yield first_day, first_day, start_minute, end_minute
+        return
+    if start_minute:
+        yield first_day, first_day, start_minute, day_minutes
+        first_day += 1
+    if last_day > first_day:
+        yield first_day, last_day - 1, 0, day_minutes
+    if end_minute:
+        yield last_day, last_day, 0, end_minute
@@ -0,0 +1,48 @@
+"""Benchmark assigning 20k tasks across 100 team members.
+
+Usage: python benchmarks/bench_assignment.py
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = str(Path(__file__).parent.parent)
+sys.path.append(backend_dir)
+
+from app.services.assignment_engine import AssignmentEngine
+
+def build_team(member_count: int, task_count: int, seed: int = 9):
+    """Members with 20-40 h/week over a quarter, some already partly booked; ~90% total demand"""
+    rng = random.Random(seed)
+    members = []
+    for i in range(member_count):
+        capacity = rng.choice([20, 24, 32, 40]) * 13
+        members.append({"id": i, "capacity_hours": capacity, "load_hours": capacity * rng.uniform(0, 0.3)})
+    free = sum(member["capacity_hours"] - member["load_hours"] for member in members)
+    mean_hours = free * 0.9 / task_count
+    tasks = [{"id": i, "hours": rng.uniform(0.2, 1.8) * mean_hours} for i in range(task_count)]
+    return members, tasks
+
+def spread(result):
+    utilization = [member["utilization"] for member in result["members"]]
+    return max(utilization) - min(utilization)
+
+def run(member_count: int = 100, task_count: int = 20000):
+    members, tasks = build_team(member_count, task_count)
+
+    started = time.perf_counter()
+    greedy = AssignmentEngine(members).assign(tasks)
+    greedy_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    improved = AssignmentEngine(members).assign(tasks, local_search=True)
+    improved_ms = (time.perf_counter() - started) * 1000
+
+    print(f"{member_count} members, {task_count} tasks")
+    print(f"  greedy:              {greedy_ms:.1f} ms, max utilization {greedy['max_utilization']:.3f}, spread {spread(greedy):.4f}, unassigned {len(greedy['unassigned'])}")
+    print(f"  greedy+local search: {improved_ms:.1f} ms, max utilization {improved['max_utilization']:.3f}, spread {spread(improved):.4f}, moves {improved['moves']}")
+
+if __name__ == "__main__":
+    run()
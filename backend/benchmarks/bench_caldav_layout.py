@@ -0,0 +1,71 @@
+"""Benchmark listing a 100k-event calendar in the flat and the sharded layout.
+
+For each layout it measures building the collection index cold, validating
+it when nothing changed, picking up one externally written event, and a
+full list() that parses every event.
+
+Usage: python benchmarks/bench_caldav_layout.py [events]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = str(Path(__file__).parent.parent)
+sys.path.append(backend_dir)
+
+from app.services.caldav_storage import SHARDED_MARKER, CollectionCache, SimpleCalendar, format_ics, shard_of
+
+def event(i: int) -> dict:
+    return {"uid": f"event-{i}", "summary": f"Task {i}", "dtstart": "20240102T090000Z", "dtend": "20240102T100000Z"}
+
+def write_events(path: Path, count: int, sharded: bool):
+    if sharded:
+        (path / SHARDED_MARKER).touch()
+    for i in range(count):
+        data = event(i)
+        directory = path / shard_of(data["uid"]) if sharded else path
+        directory.mkdir(exist_ok=True)
+        (directory / f"{data['uid']}.ics").write_text(format_ics(data))
+
+def timed(fn, repeat: int = 1) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+async def list_all(calendar: SimpleCalendar) -> int:
+    return len([item async for item in await calendar.list()])
+
+def run(count: int = 100000):
+    for sharded in (False, True):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory)
+            write_events(path, count, sharded)
+            cache = CollectionCache(max_events=count)
+            cold = timed(lambda: cache.index(directory))
+            warm = timed(lambda: cache.index(directory), repeat=200)
+
+            external = event(count)
+            target = path / shard_of(external["uid"]) if sharded else path
+            target.mkdir(exist_ok=True)
+            (target / f"{external['uid']}.ics").write_text(format_ics(external))
+            # Directory mtimes are coarse; make sure the change is seen
+            for changed in {path, target}:
+                os.utime(changed, (time.time() + 10, time.time() + 10))
+            rescan = timed(lambda: cache.index(directory))
+
+            calendar = SimpleCalendar(directory, cache)
+            started = time.perf_counter()
+            listed = asyncio.run(list_all(calendar))
+            listing = time.perf_counter() - started
+
+            layout = "sharded" if sharded else "flat"
+            print(f"{layout:<8} {listed} events: cold index {cold * 1000:.1f} ms, unchanged check {warm * 1e6:.0f} us, "
+                  f"one external write {rescan * 1000:.1f} ms, full list {listing:.2f} s")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,79 @@
+"""Benchmark one-week get_tasks style range queries on a 50k-event calendar.
+
+Compares reading every event and filtering in Python with the time-range
+index, cold (index built or loaded from its journal) and warm.
+
+Usage: python benchmarks/bench_caldav_range_query.py
+"""
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = str(Path(__file__).parent.parent)
+sys.path.append(backend_dir)
+
+from app.services.caldav_storage import CollectionCache, SimpleCalendar, format_ics
+
+FIRST_DAY = datetime(2023, 1, 2)
+
+def write_events(path: Path, count: int, seed: int = 11):
+    """Events of 1-8 hours spread over two years"""
+    rng = random.Random(seed)
+    for i in range(count):
+        start = FIRST_DAY + timedelta(minutes=rng.randrange(0, 2 * 365 * 24 * 60))
+        end = start + timedelta(hours=rng.randint(1, 8))
+        event = {
+            "uid": f"event-{i}",
+            "summary": f"Task {i}",
+            "dtstart": start.strftime("%Y%m%dT%H%M%SZ"),
+            "dtend": end.strftime("%Y%m%dT%H%M%SZ")
+        }
+        (path / f"event-{i}.ics").write_text(format_ics(event))
+
+async def full_scan(calendar: SimpleCalendar, start: datetime, end: datetime) -> int:
+    """The previous get_tasks behaviour: parse everything, filter in Python"""
+    matches = 0
+    async for event in await calendar.list():
+        data = await event.get_component()
+        event_start = datetime.strptime(data["dtstart"], "%Y%m%dT%H%M%SZ")
+        event_end = datetime.strptime(data["dtend"], "%Y%m%dT%H%M%SZ")
+        if start <= event_start <= end or start <= event_end <= end:
+            matches += 1
+    return matches
+
+async def indexed(calendar: SimpleCalendar, start: datetime, end: datetime) -> int:
+    matches = 0
+    async for event in await calendar.list(start, end):
+        await event.get_component()
+        matches += 1
+    return matches
+
+def timed(label: str, query, calendar: SimpleCalendar, start: datetime, end: datetime):
+    started = time.perf_counter()
+    matches = asyncio.run(query(calendar, start, end))
+    print(f"{label}: {(time.perf_counter() - started) * 1000:.1f} ms, {matches} events")
+
+def run(event_count: int = 50000):
+    start = FIRST_DAY + timedelta(days=300)
+    end = start + timedelta(days=7)
+    with tempfile.TemporaryDirectory() as directory:
+        write_events(Path(directory), event_count)
+        print(f"{event_count} events, one-week window")
+        timed("full scan, no cache", full_scan, SimpleCalendar(directory, CollectionCache(max_events=0)), start, end)
+
+        calendar = SimpleCalendar(directory, CollectionCache())
+        timed("time-range index, first query (builds index)", indexed, calendar, start, end)
+        timed("time-range index, warm", indexed, calendar, start, end)
+
+        # A new process replays the journal instead of opening every event
+        restarted = SimpleCalendar(directory, CollectionCache())
+        timed("time-range index, new process (journal replay)", indexed, restarted, start, end)
+        timed("time-range index, new process warm", indexed, restarted, start, end)
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,54 @@
+"""Benchmark the per-request cost of obtaining a ready CalDAV service.
+
+Compares constructing and initializing a service in every request with
+reusing the process-wide instance from CalDAVService.shared().
+
+Usage: python benchmarks/bench_caldav_service.py
+"""
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = str(Path(__file__).parent.parent)
+sys.path.append(backend_dir)
+
+# Use the real filesystem storage in a temporary directory
+os.environ["TESTING"] = "false"
+
+from app.core.config import settings
+from app.services.caldav_service import CalDAVService
+
+async def per_request(requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        service = CalDAVService()
+        await service.initialize()
+    return time.perf_counter() - started
+
+async def shared(requests: int) -> float:
+    CalDAVService.reset_shared()
+    started = time.perf_counter()
+    for _ in range(requests):
+        service = CalDAVService.shared()
+        await service.initialize()
+    return time.perf_counter() - started
+
+def run(requests: int = 2000):
+    with tempfile.TemporaryDirectory() as storage_path:
+        settings.CALDAV_STORAGE_PATH = storage_path
+        # Leave the system htpasswd file alone
+        settings.CALDAV_AUTH_ENABLED = False
+        for label, scenario in (("per-request instance", per_request), ("shared instance", shared)):
+            # The service logs every initialization; keep that out of the timing
+            with contextlib.redirect_stdout(io.StringIO()):
+                elapsed = asyncio.run(scenario(requests))
+            print(f"{requests} requests, {label}: {elapsed * 1000:.1f} ms total, {elapsed / requests * 1e6:.1f} us/request")
+
+if __name__ == "__main__":
+    run()
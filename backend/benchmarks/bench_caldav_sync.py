@@ -0,0 +1,78 @@
+"""Benchmark syncing 1,000 tasks to a calendar.
+
+Compares the previous per-task loop (create_calendar plus one
+sync_task_with_calendar per task) with sync_tasks_with_calendar.
+
+Usage: python benchmarks/bench_caldav_sync.py
+"""
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = str(Path(__file__).parent.parent)
+sys.path.append(backend_dir)
+
+# Use the real filesystem storage in a temporary directory
+os.environ["TESTING"] = "false"
+
+from app.core.config import settings
+from app.services.caldav_service import CalDAVService
+
+def build_tasks(count: int):
+    start = datetime(2024, 1, 1, 9)
+    return [
+        {
+            "id": i,
+            "title": f"Task {i}",
+            "description": f"Description of task {i}",
+            "estimated_hours": 4.0,
+            "duration_hours": 4.0,
+            "hourly_rate": 80.0,
+            "status": "pending",
+            "priority": "medium",
+            "confidence_score": 0.8,
+            "confidence_rationale": "Benchmark",
+            "start_date": start + timedelta(hours=4 * i)
+        }
+        for i in range(count)
+    ]
+
+async def per_task(service: CalDAVService, tasks, user_id: int) -> int:
+    calendar_path = f"{user_id}/calendar"
+    for task in tasks:
+        await service.create_calendar(user_id, "PM Tool Calendar")
+        await service.sync_task_with_calendar(dict(task), calendar_path)
+    # Include the time until the last event is on disk
+    collection = await service.storage.discover(calendar_path)
+    await collection.flush()
+    return len(tasks)
+
+async def bulk(service: CalDAVService, tasks, user_id: int) -> int:
+    return len(await service.sync_tasks_with_calendar(tasks, f"{user_id}/calendar"))
+
+def run(task_count: int = 1000):
+    tasks = build_tasks(task_count)
+    with tempfile.TemporaryDirectory() as storage_path:
+        settings.CALDAV_STORAGE_PATH = storage_path
+        # Leave the system htpasswd file alone
+        settings.CALDAV_AUTH_ENABLED = False
+        service = CalDAVService()
+        for user_id, (label, scenario) in enumerate((("per-task loop", per_task), ("bulk sync", bulk)), start=1):
+            for attempt in ("first sync", "re-sync"):
+                # The service logs every step; keep that out of the timing
+                with contextlib.redirect_stdout(io.StringIO()):
+                    started = time.perf_counter()
+                    synced = asyncio.run(scenario(service, tasks, user_id))
+                    elapsed = time.perf_counter() - started
+                events = len(os.listdir(os.path.join(service.calendar_root, str(user_id), "calendar"))) - 1
+                print(f"{task_count} tasks, {label}, {attempt}: {elapsed * 1000:.1f} ms, {synced} synced, {events} event files")
+
+if __name__ == "__main__":
+    run()
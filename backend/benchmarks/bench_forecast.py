@@ -0,0 +1,46 @@
+"""Benchmark the Monte Carlo completion forecast on a 500-task project.
+
+Usage: python benchmarks/bench_forecast.py
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = str(Path(__file__).parent.parent)
+sys.path.append(backend_dir)
+
+from app.services.forecast_service import MonteCarloForecaster
+
+def build_project(task_count: int, seed: int = 5):
+    """Tasks with mixed confidence and up to three dependencies on earlier tasks"""
+    rng = random.Random(seed)
+    tasks = [
+        {"id": i, "hours": rng.uniform(1, 16), "median_factor": 1.15, "sigma": rng.uniform(0.1, 0.8)}
+        for i in range(task_count)
+    ]
+    dependencies = [
+        (i, rng.randrange(0, i))
+        for i in range(1, task_count)
+        for _ in range(rng.randint(0, 3))
+    ]
+    return tasks, dependencies
+
+def run(task_count: int = 500):
+    tasks, dependencies = build_project(task_count)
+    forecaster = MonteCarloForecaster(tasks, dependencies)
+    for simulations in (1000, 5000, 20000):
+        for sequential in (False, True):
+            started = time.perf_counter()
+            totals = forecaster.simulate(simulations, sequential=sequential, seed=1)
+            percentiles = forecaster.summarize(totals)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            mode = "sequential" if sequential else "parallel"
+            print(
+                f"{task_count} tasks, {len(dependencies)} dependencies, {simulations} simulations ({mode}): "
+                f"{elapsed_ms:.1f} ms, P50 {percentiles[50]:.0f} h, P95 {percentiles[95]:.0f} h"
+            )
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,81 @@
+"""Benchmark serializing and parsing task events against the icalendar library.
+
+Each round trip writes one single-event VCALENDAR per task, the way the
+calendar storage does, and parses it back.
+
+Usage: python benchmarks/bench_ics_codec.py
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import icalendar
+
+# Add the backend directory to Python path
+backend_dir = str(Path(__file__).parent.parent)
+sys.path.append(backend_dir)
+
+from app.services.ics import ICS_TIME_FORMAT, format_ics, parse_ics
+
+FIRST_DAY = datetime(2024, 1, 1, 9)
+
+def make_events(count: int):
+    return [
+        {
+            "component": "VEVENT",
+            "uid": f"event-{i}",
+            "summary": f"Task {i}: review chapter {i % 40}",
+            "dtstart": (FIRST_DAY + timedelta(hours=i)).strftime(ICS_TIME_FORMAT),
+            "dtend": (FIRST_DAY + timedelta(hours=i + 2)).strftime(ICS_TIME_FORMAT),
+            "description": (
+                f"Review and annotate chapter {i % 40}, including figures, tables; appendix\n\n"
+                "Duration: 2.0 hours\nHourly rate: 80.0\nStatus: pending\nConfidence: 85%"
+            ),
+            "categories": ["PM Tool Task"],
+            "status": "NEEDS-ACTION",
+            "priority": "5",
+            "x-pm-tool-id": str(i),
+            "x-pm-tool-estimated-hours": "2.0",
+            "x-pm-tool-hourly-rate": "80.0",
+            "x-pm-tool-confidence": "0.85"
+        }
+        for i in range(count)
+    ]
+
+def icalendar_format(event_data) -> bytes:
+    calendar = icalendar.Calendar()
+    calendar.add("version", "2.0")
+    calendar.add("prodid", "-//PM Tool//CalDAV Client//EN")
+    event = icalendar.Event()
+    for key, value in event_data.items():
+        if key in ("dtstart", "dtend"):
+            value = datetime.strptime(value, ICS_TIME_FORMAT)
+        elif key == "priority":
+            value = int(value)
+        if key != "component":
+            event.add(key, value)
+    calendar.add_component(event)
+    return calendar.to_ical()
+
+def icalendar_parse(ics_data: bytes):
+    event = icalendar.Calendar.from_ical(ics_data).walk("VEVENT")[0]
+    return {key.lower(): str(value) for key, value in event.items()}
+
+def timed(label: str, count: int, fn):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed * 1000:8.1f} ms  {elapsed / count * 1e6:7.1f} us/event")
+    return result
+
+def run(count: int = 20000):
+    events = make_events(count)
+    print(f"{count} events")
+    texts = timed("format_ics", count, lambda: [format_ics(event) for event in events])
+    timed("parse_ics", count, lambda: [parse_ics(text) for text in texts])
+    blobs = timed("icalendar to_ical", count, lambda: [icalendar_format(event) for event in events])
+    timed("icalendar from_ical", count, lambda: [icalendar_parse(blob) for blob in blobs])
+
+if __name__ == "__main__":
+    run()
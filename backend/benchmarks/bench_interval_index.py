@@ -0,0 +1,49 @@
+"""Benchmark IntervalIndex.add on calendars of 1k to 1M busy intervals.
+
+Each add bisects to the overlapped intervals and then splices the merged
+interval into two plain lists, which is a memmove of the tail. This measures
+how that splice grows with the number of intervals, for disjoint adds (the
+list grows by one) and for adds that merge with existing intervals.
+
+Usage: python benchmarks/bench_interval_index.py
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = str(Path(__file__).parent.parent)
+sys.path.append(backend_dir)
+
+from app.services.interval_index import IntervalIndex
+
+def build_index(count: int):
+    """Disjoint 60-unit intervals with 60-unit gaps between them"""
+    return IntervalIndex((i * 120, i * 120 + 60) for i in range(count))
+
+def time_adds(count: int, adds: int, merging: bool, seed: int = 11):
+    """Mean microseconds per add into an index of ``count`` intervals"""
+    rng = random.Random(seed)
+    index = build_index(count)
+    if merging:
+        # Bridges a gap, merging two neighbours into one
+        intervals = [(slot * 120 + 30, slot * 120 + 150) for slot in rng.sample(range(count - 1), adds)]
+    else:
+        # Fills part of a gap without touching its neighbours
+        intervals = [(slot * 120 + 80, slot * 120 + 100) for slot in rng.sample(range(count), adds)]
+    started = time.perf_counter()
+    for start, end in intervals:
+        index.add(start, end)
+    return (time.perf_counter() - started) * 1e6 / adds
+
+def run(adds: int = 500):
+    print(f"IntervalIndex.add, mean of {adds} random adds")
+    print(f"{'intervals':>10} {'disjoint us':>12} {'merging us':>11}")
+    for count in (1_000, 10_000, 100_000, 1_000_000):
+        disjoint = time_adds(count, adds, merging=False)
+        merging = time_adds(count, adds, merging=True)
+        print(f"{count:>10} {disjoint:>12.2f} {merging:>11.2f}")
+
+if __name__ == "__main__":
+    run()
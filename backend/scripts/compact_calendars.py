@@ -0,0 +1,52 @@
+"""Remove duplicate task events from the CalDAV storage.
+
+Earlier versions wrote a new event on every task sync. For each task this
+keeps the event referenced by tasks.caldav_event_uid (or the newest one if
+the database is not reachable) and reports what was reclaimed.
+
+Usage: python scripts/compact_calendars.py [--dry-run] [--no-db]
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = str(Path(__file__).parent.parent)
+sys.path.append(backend_dir)
+
+from app.services.caldav_service import CalDAVService
+
+def load_preferred_uids():
+    """Task id -> stored event UID"""
+    from app.core.database import SessionLocal
+    from app.models.task import Task
+
+    db = SessionLocal()
+    try:
+        rows = db.query(Task.id, Task.caldav_event_uid).filter(Task.caldav_event_uid.isnot(None)).all()
+        return {str(task_id): event_uid for task_id, event_uid in rows}
+    finally:
+        db.close()
+
+async def compact(dry_run: bool, use_db: bool):
+    preferred_uids = {}
+    if use_db:
+        try:
+            preferred_uids = load_preferred_uids()
+        except Exception as e:
+            print(f"Warning: could not read stored event UIDs, keeping the newest event per task: {str(e)}")
+
+    service = CalDAVService.shared()
+    report = await service.compact_storage(preferred_uids, dry_run=dry_run)
+    action = "Would remove" if dry_run else "Removed"
+    print(f"Scanned {report['calendars']} calendars with {report['events']} events")
+    print(f"{action} {report['events_removed']} duplicate events and {report['temp_files_removed']} temp files")
+    print(f"{'Would reclaim' if dry_run else 'Reclaimed'} {report['bytes_reclaimed'] / 1024:.1f} KiB")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be removed")
+    parser.add_argument("--no-db", action="store_true", help="do not read preferred UIDs from the database")
+    args = parser.parse_args()
+    asyncio.run(compact(args.dry_run, not args.no_db))
@@ -0,0 +1,32 @@
+"""Move calendar events into hash-prefix shard directories, or back.
+
+Calendars stay in use while their events are moved in batches, so this can
+run next to the application. Set CALDAV_STORAGE_LAYOUT=sharded as well so
+that new calendars start out sharded.
+
+Usage: python scripts/shard_calendars.py [--flat]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = str(Path(__file__).parent.parent)
+sys.path.append(backend_dir)
+
+from app.services.caldav_service import CalDAVService
+
+async def migrate(sharded: bool):
+    service = CalDAVService.shared()
+    started = time.perf_counter()
+    report = await service.migrate_storage_layout(sharded)
+    elapsed = time.perf_counter() - started
+    print(f"Moved {report['events_moved']} events of {report['calendars']} calendars to the {report['layout']} layout in {elapsed:.1f} s")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flat", action="store_true", help="move the events back to the top level of each calendar")
+    args = parser.parse_args()
+    asyncio.run(migrate(not args.flat))
@@ -15,5 +15,6 @@ setup(
         "psycopg2-binary>=2.9.0",
         "python-jose[cryptography]>=3.3.0",
         "passlib[bcrypt]>=1.7.4",
+        "numpy>=1.24.0",
     ],
 )
@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+from starlette.requests import Request
+from app.api.v1.endpoints.caldav import ics_feed_response
+
+ETAG = '"abc-3"'
+LAST_MODIFIED = datetime(2024, 1, 2, 9, tzinfo=timezone.utc)
+
+async def _chunks():
+    yield b"BEGIN:VCALENDAR\nEND:VCALENDAR"
+
+def _request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/calendar/1.ics",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    })
+
+def test_matching_etag_is_not_modified():
+    response = ics_feed_response(_request(if_none_match=f'W/"other", {ETAG}'), ETAG, LAST_MODIFIED, _chunks(), "calendar.ics")
+    assert response.status_code == 304
+    assert response.headers["etag"] == ETAG
+
+def test_etag_takes_precedence_over_date():
+    response = ics_feed_response(
+        _request(if_none_match='"other"', if_modified_since="Wed, 03 Jan 2024 09:00:00 GMT"),
+        ETAG, LAST_MODIFIED, _chunks(), "calendar.ics"
+    )
+    assert response.status_code == 200
+    assert response.media_type == "text/calendar"
+
+def test_if_modified_since_alone_is_not_trusted():
+    # The date has one-second resolution, so it cannot prove the feed is unchanged
+    for if_modified_since in ["Tue, 02 Jan 2024 09:00:00 GMT", "Wed, 03 Jan 2024 09:00:00 GMT", "not a date"]:
+        response = ics_feed_response(
+            _request(if_modified_since=if_modified_since), ETAG, LAST_MODIFIED, _chunks(), "calendar.ics"
+        )
+        assert response.status_code == 200
+        assert response.headers["last-modified"] == "Tue, 02 Jan 2024 09:00:00 GMT"
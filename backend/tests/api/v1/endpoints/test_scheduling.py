@@ -0,0 +1,60 @@
+import pytest
+from app.core.auth import get_current_user
+from app.main import app
+from app.models.project import Project
+from app.models.scheduled_slot import ProjectSchedule
+from app.models.task import Task
+from app.models.user import User
+
+@pytest.fixture
+def project(db_session, test_user):
+    project = Project(user_id=test_user.id, name="Scheduled project", description="Scheduled project")
+    db_session.add(project)
+    db_session.commit()
+    return project
+
+@pytest.fixture
+def login(client):
+    def login_as(user):
+        app.dependency_overrides[get_current_user] = lambda: user
+    return login_as
+
+def stranger(owner: User) -> User:
+    return User(id=owner.id + 1000, email="stranger@example.com", is_active=True)
+
+def test_book_project_requires_ownership(client, login, project, test_user):
+    login(stranger(test_user))
+    assert client.post(f"/api/v1/scheduling/projects/{project.id}/book").status_code == 404
+
+    login(test_user)
+    response = client.post(f"/api/v1/scheduling/projects/{project.id}/book")
+    assert response.status_code == 200
+    assert response.json()["message"] == "No tasks found for project"
+
+def test_forecast_requires_ownership(client, login, project, test_user):
+    url = f"/api/v1/scheduling/projects/{project.id}/forecast"
+
+    login(stranger(test_user))
+    assert client.get(url).status_code == 404
+
+    login(test_user)
+    assert client.get(url).status_code == 200
+
+def test_reschedule_requires_ownership_and_project_tasks(client, db_session, login, project, test_user):
+    task = Task(project_id=project.id, title="Owned", description="Owned", estimated_hours=2.0, status="pending")
+    db_session.add(task)
+    db_session.commit()
+    url = f"/api/v1/scheduling/projects/{project.id}/reschedule"
+
+    login(stranger(test_user))
+    assert client.post(url, json={"task_ids": [task.id]}).status_code == 404
+
+    login(test_user)
+    response = client.post(url, json={"task_ids": [task.id, task.id + 1000]})
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"Tasks not in project: {task.id + 1000}"
+    try:
+        assert client.post(url, json={"task_ids": [task.id]}).status_code == 200
+    finally:
+        db_session.query(ProjectSchedule).filter(ProjectSchedule.project_id == project.id).delete()
+        db_session.commit()
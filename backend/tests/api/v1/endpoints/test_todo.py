@@ -188,3 +188,33 @@ def test_get_sync_status(client, mock_task, test_user, db_session):
         assert result["total_tasks"] == 1
         assert result["synced_tasks"] == 1
         assert result["failed_tasks"] == 0
+
+def test_get_sync_status_since_token(client, test_user, db_session):
+    """With a sync token only tasks whose events changed are checked"""
+    project = Project(user_id=test_user.id, name="Test Project", description="Test project description")
+    db_session.add(project)
+    db_session.commit()
+    changed = Task(project_id=project.id, title="Changed", description="Changed", duration_hours=2.0, hourly_rate=80.0,
+                   caldav_event_uid="changed-uid", status="pending", priority="medium")
+    unchanged = Task(project_id=project.id, title="Unchanged", description="Unchanged", caldav_event_uid="unchanged-uid",
+                     status="pending", priority="medium")
+    db_session.add_all([changed, unchanged])
+    db_session.commit()
+
+    with patch('app.api.v1.endpoints.todo.CalDAVService') as mock_caldav:
+        service = mock_caldav.shared.return_value
+        service.initialize = AsyncMock()
+        service.changes_since = AsyncMock(return_value={
+            "sync_token": "token-2", "ctag": "ctag-2", "full": False, "deleted": [],
+            "changed": [{
+                "uid": "changed-uid", "x-pm-tool-id": str(changed.id), "x-pm-tool-title": "Changed",
+                "x-pm-tool-duration-hours": "2.0", "x-pm-tool-hourly-rate": "80.0"
+            }]
+        })
+
+        response = client.get("/api/v1/todo/sync-status?sync_token=token-1")
+        assert response.status_code == 200
+        result = response.json()
+        service.changes_since.assert_awaited_once_with(f"{test_user.id}/calendar", "token-1")
+        assert result["total_tasks"] == result["synced_tasks"] == 1
+        assert result["sync_token"] == "token-2"
@@ -0,0 +1,54 @@
+import pytest
+from app.services.assignment_engine import AssignmentEngine
+
+def make_tasks(hours):
+    return [{"id": task_id, "hours": h} for task_id, h in hours.items()]
+
+def test_greedy_balances_by_utilization():
+    engine = AssignmentEngine([
+        {"id": "a", "capacity_hours": 40},
+        {"id": "b", "capacity_hours": 20}
+    ])
+
+    result = engine.assign(make_tasks({1: 10, 2: 10, 3: 10, 4: 5, 5: 5}))
+
+    loads = {member["user_id"]: member["load_hours"] for member in result["members"]}
+    assert loads == {"a": 25, "b": 15}
+    assert result["unassigned"] == []
+
+def test_existing_load_and_capacity_are_respected():
+    engine = AssignmentEngine([
+        {"id": 1, "capacity_hours": 10, "load_hours": 8},
+        {"id": 2, "capacity_hours": 10}
+    ])
+
+    result = engine.assign(make_tasks({1: 6, 2: 6, 3: 2}))
+
+    assert result["assignments"] == {1: 2, 3: 2}
+    assert result["unassigned"] == [2]
+    assert all(member["load_hours"] <= member["capacity_hours"] for member in result["members"])
+
+def test_local_search_lowers_peak_utilization():
+    # Longest-first gives 5+3 and 4+3+3; swapping a 3 for the 4 evens it out at 9 each
+    engine = AssignmentEngine([
+        {"id": 1, "capacity_hours": 20},
+        {"id": 2, "capacity_hours": 20}
+    ])
+    tasks = make_tasks({1: 5, 2: 4, 3: 3, 4: 3, 5: 3})
+
+    greedy = engine.assign(tasks)
+    improved = engine.assign(tasks, local_search=True)
+
+    assert greedy["max_utilization"] == pytest.approx(0.5)
+    assert improved["max_utilization"] == pytest.approx(0.45)
+    assert improved["moves"] == 1
+    assert sorted(improved["assignments"]) == [1, 2, 3, 4, 5]
+
+def test_members_without_capacity_get_nothing():
+    engine = AssignmentEngine([{"id": 1, "capacity_hours": 0}, {"id": 2, "capacity_hours": 5}])
+
+    result = engine.assign(make_tasks({1: 2, 2: 2}), local_search=True)
+
+    assert set(result["assignments"].values()) == {2}
+    assert result["members"][0]["utilization"] is None
+    assert result["max_utilization"] == pytest.approx(0.8)
@@ -1,8 +1,14 @@
+import asyncio
+import json
 import pytest
 import os
+import threading
 from unittest.mock import patch, MagicMock, mock_open
 from app.services.caldav_service import CalDAVService
-from datetime import datetime, timedelta
+from app.services.caldav_sqlite import SqliteStorage
+from app.services.caldav_storage import CollectionCache, SimpleStorage, StorageExecutor, WriteBehindBuffer
+from app.services.change_log import InvalidSyncToken
+from datetime import datetime, timedelta, timezone
 
 @pytest.fixture
 def caldav_service(monkeypatch):
@@ -36,6 +42,14 @@ def caldav_service(monkeypatch):
     
     return service
 
+@pytest.fixture
+def storage_service(monkeypatch, tmp_path):
+    """A service writing to real storage under tmp_path"""
+    monkeypatch.setenv('TESTING', 'false')
+    monkeypatch.setattr('app.core.config.settings.CALDAV_STORAGE_PATH', str(tmp_path))
+    monkeypatch.setattr('app.core.config.settings.CALDAV_AUTH_ENABLED', False)
+    return CalDAVService()
+
 def test_calendar_path_format(caldav_service):
     """Test that calendar path follows the required format"""
     user_id = 123
@@ -130,3 +144,230 @@ def test_authentication_enabled(monkeypatch):
     service = CalDAVService()
     assert service.storage.configuration["auth"]["type"] == "htpasswd"
     assert service.storage.configuration["auth"]["htpasswd_encryption"] == "bcrypt"
+
+@pytest.mark.asyncio
+async def test_busy_intervals_cached_until_calendar_changes(monkeypatch):
+    """Busy intervals are merged once and re-read only after a write"""
+    monkeypatch.setenv('TESTING', 'true')
+    caldav_service = CalDAVService()
+    calendar_path = "123/busy-cache"
+    events = [
+        {"start_date": datetime(2024, 1, 2, 9), "end_date": datetime(2024, 1, 2, 11)},
+        {"start_date": datetime(2024, 1, 2, 10), "end_date": datetime(2024, 1, 2, 12)}
+    ]
+    with patch.object(CalDAVService, 'get_tasks', return_value=events) as get_tasks:
+        first = await caldav_service.get_busy_intervals(calendar_path)
+        second = await caldav_service.get_busy_intervals(calendar_path)
+        assert first == second == [(datetime(2024, 1, 2, 9, tzinfo=timezone.utc), datetime(2024, 1, 2, 12, tzinfo=timezone.utc))]
+        assert get_tasks.call_count == 1
+
+        caldav_service._mark_calendar_changed(calendar_path)
+        await caldav_service.get_busy_intervals(calendar_path)
+        assert get_tasks.call_count == 2
+
+        # Each range is read once through the range query
+        window = (datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 1, 3, tzinfo=timezone.utc))
+        await caldav_service.get_busy_intervals(calendar_path, *window)
+        await caldav_service.get_busy_intervals(calendar_path, *window)
+        assert get_tasks.call_count == 3
+        get_tasks.assert_called_with(calendar_path, *window)
+
+@pytest.mark.asyncio
+async def test_shared_service_initializes_once(monkeypatch):
+    """Concurrent first use of the shared service sets up storage only once"""
+    monkeypatch.setenv('TESTING', 'true')
+    monkeypatch.setattr('app.core.config.settings.CALDAV_AUTH_ENABLED', False)
+    CalDAVService.reset_shared()
+    try:
+        service = CalDAVService.shared()
+        assert CalDAVService.shared() is service
+
+        init_storage = CalDAVService._init_storage
+        calls = []
+
+        async def counting_init_storage(self):
+            calls.append(self)
+            await asyncio.sleep(0)
+            return await init_storage(self)
+
+        with patch.object(CalDAVService, '_init_storage', counting_init_storage):
+            storages = await asyncio.gather(*(service.initialize() for _ in range(10)))
+        assert len(calls) == 1
+        assert all(storage is storages[0] for storage in storages)
+    finally:
+        CalDAVService.reset_shared()
+
+@pytest.mark.asyncio
+async def test_sync_reuses_event_uid(monkeypatch):
+    """Syncing a task again targets the same event"""
+    monkeypatch.setenv('TESTING', 'true')
+    caldav_service = CalDAVService()
+    task_data = {"id": 42, "title": "Task", "description": "Description", "estimated_hours": 2.0}
+
+    first = await caldav_service.sync_task_with_calendar(dict(task_data), "1/calendar")
+    second = await caldav_service.sync_task_with_calendar(dict(task_data), "1/calendar")
+    assert first == second == CalDAVService.task_event_uid(42)
+
+    stored = await caldav_service.sync_task_with_calendar({**task_data, "caldav_event_uid": "stored-uid"}, "1/calendar")
+    assert stored == "stored-uid"
+
+@pytest.mark.asyncio
+async def test_sync_reports_failed_writes(storage_service):
+    """A task sync only succeeds once its event is written"""
+    task = {"id": 1, "title": "Task 1", "description": "Description", "estimated_hours": 2.0,
+            "start_date": datetime(2024, 1, 2, 9)}
+
+    with patch('app.services.caldav_storage.SimpleCalendar._write_batch', side_effect=OSError("disk full")):
+        with pytest.raises(ValueError):
+            await storage_service.sync_task_with_calendar(task, "7/calendar")
+
+    assert await storage_service.sync_task_with_calendar(task, "7/calendar") == CalDAVService.task_event_uid(1)
+    assert [event["uid"] for event in await storage_service.get_tasks("7/calendar")] == [CalDAVService.task_event_uid(1)]
+
+@pytest.mark.asyncio
+async def test_create_calendar_writes_on_storage_executor(storage_service):
+    """Calendar directories and properties are written off the event loop"""
+    threads = []
+    create_collection = SimpleStorage._create_collection
+
+    def record_thread(*args):
+        threads.append(threading.current_thread())
+        return create_collection(*args)
+
+    with patch.object(SimpleStorage, '_create_collection', staticmethod(record_thread)):
+        await storage_service.create_calendar(7, "Renamed")
+
+    assert threads and threading.main_thread() not in threads
+    with open(os.path.join(storage_service.calendar_root, "7", "calendar", ".properties")) as f:
+        assert json.load(f)["displayname"] == "Renamed"
+
+@pytest.mark.asyncio
+async def test_add_and_update_report_failed_writes(storage_service):
+    """Adding or updating a task only succeeds once its event is written"""
+    task = {"id": 1, "description": "Description", "estimated_hours": 2.0,
+            "start_date": datetime(2024, 1, 2, 9), "end_date": datetime(2024, 1, 2, 11)}
+
+    with patch('app.services.caldav_storage.SimpleCalendar._write_batch', side_effect=OSError("disk full")):
+        with pytest.raises(ValueError):
+            await storage_service.add_task(dict(task), "7/calendar")
+    event_uid = await storage_service.add_task(dict(task), "7/calendar")
+
+    with patch('app.services.caldav_storage.SimpleCalendar._write_batch', side_effect=OSError("disk full")):
+        with pytest.raises(ValueError):
+            await storage_service.update_task("7/calendar", event_uid, {**task, "description": "Renamed"})
+    events = await storage_service.get_tasks("7/calendar")
+    assert [(event["uid"], event["description"]) for event in events if event["uid"] == event_uid] == [(event_uid, "Description")]
+
+@pytest.mark.asyncio
+async def test_bulk_sync_writes_one_event_per_task(storage_service):
+    """Bulk sync resolves the calendar once and upserts one event per task"""
+    tasks = [
+        {"id": i, "title": f"Task {i}", "description": "Description", "estimated_hours": 2.0,
+         "start_date": datetime(2024, 1, 2, 9) + timedelta(days=i)}
+        for i in range(1, 4)
+    ]
+
+    uids = await storage_service.sync_tasks_with_calendar(tasks + [{"id": 9}], "7/calendar")
+    assert uids == {i: CalDAVService.task_event_uid(i) for i in range(1, 4)}
+
+    # Syncing again updates the same events
+    await storage_service.sync_tasks_with_calendar([{**tasks[0], "title": "Renamed"}], "7/calendar")
+    events = await storage_service.get_tasks("7/calendar")
+    assert sorted(event["uid"] for event in events) == sorted(uids.values())
+    assert {event["description"] for event in events} == {"Renamed", "Task 2", "Task 3"}
+
+@pytest.mark.asyncio
+async def test_changes_since_follows_sync_token(storage_service):
+    """A sync token from an earlier call yields only the tasks synced after it"""
+    task = {"id": 1, "title": "Task 1", "description": "Description", "estimated_hours": 2.0,
+            "start_date": datetime(2024, 1, 2, 9)}
+    await storage_service.sync_tasks_with_calendar([task, {**task, "id": 2, "title": "Task 2"}], "7/calendar")
+
+    first = await storage_service.changes_since("7/calendar")
+    assert first["full"] and len(first["changed"]) == 2
+    # Changed tasks carry the fields that link them back to their task
+    assert {(event["x-pm-tool-id"], event["x-pm-tool-title"]) for event in first["changed"]} == {("1", "Task 1"), ("2", "Task 2")}
+
+    await storage_service.sync_tasks_with_calendar([{**task, "title": "Renamed"}], "7/calendar")
+    delta = await storage_service.changes_since("7/calendar", first["sync_token"])
+    assert not delta["full"]
+    assert [event["description"] for event in delta["changed"]] == ["Renamed"]
+    assert delta["ctag"] == await storage_service.get_ctag("7/calendar")
+
+    with pytest.raises(InvalidSyncToken):
+        await storage_service.changes_since("7/calendar", "https://example.com/sync/0")
+
+@pytest.mark.asyncio
+async def test_ics_feed_is_cached_per_calendar_version(storage_service):
+    """The rendered feed is reused until an event changes"""
+    task = {"id": 1, "title": "Task 1", "description": "Description", "estimated_hours": 2.0,
+            "start_date": datetime(2024, 1, 2, 9)}
+    await storage_service.sync_tasks_with_calendar([task], "7/calendar")
+
+    feed = await storage_service.generate_ics_feed(7)
+    assert feed.startswith("BEGIN:VCALENDAR") and feed.endswith("END:VCALENDAR\r\n")
+    assert "SUMMARY:Task 1" in feed
+
+    etag, _, chunks = await storage_service.ics_feed(7)
+    with patch.object(CalDAVService, '_render_ics_feed') as render:
+        await storage_service.ics_feed(7)
+        render.assert_not_called()
+    assert b"".join([chunk async for chunk in chunks]).decode() == feed
+
+    await storage_service.sync_tasks_with_calendar([{**task, "title": "Renamed"}], "7/calendar")
+    new_etag, _, _ = await storage_service.ics_feed(7)
+    assert new_etag != etag
+    assert "SUMMARY:Renamed" in await storage_service.generate_ics_feed(7)
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_serves_tasks_and_changes(monkeypatch, storage_service):
+    """With the SQLite backend each calendar is one database file"""
+    monkeypatch.setattr('app.core.config.settings.CALDAV_STORAGE_BACKEND', 'sqlite')
+    await storage_service.create_calendar(7)
+    task = {"id": 1, "title": "Task 1", "description": "Description", "estimated_hours": 2.0,
+            "start_date": datetime(2024, 1, 2, 9)}
+    await storage_service.sync_tasks_with_calendar([task, {**task, "id": 2, "title": "Task 2"}], "7/calendar")
+    assert os.path.isfile(os.path.join(storage_service.calendar_root, "7", "calendar.sqlite3"))
+
+    first = await storage_service.changes_since("7/calendar")
+    await storage_service.sync_tasks_with_calendar([{**task, "title": "Renamed"}], "7/calendar")
+    delta = await storage_service.changes_since("7/calendar", first["sync_token"])
+    assert [event["description"] for event in delta["changed"]] == ["Renamed"]
+
+    tasks = await storage_service.get_tasks("7/calendar", datetime(2024, 1, 2), datetime(2024, 1, 3))
+    assert sorted(event["description"] for event in tasks) == ["Renamed", "Task 2"]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["filesystem", "sqlite"])
+async def test_busy_intervals_see_other_workers_writes(monkeypatch, storage_service, backend):
+    """Writes through another process's storage invalidate the cached busy intervals"""
+    monkeypatch.setattr('app.core.config.settings.CALDAV_STORAGE_BACKEND', backend)
+    task = {"id": 1, "title": "Task 1", "description": "Description", "estimated_hours": 2.0,
+            "start_date": datetime(2024, 1, 2, 9)}
+    await storage_service.sync_tasks_with_calendar([task], "7/calendar")
+    assert await storage_service.get_busy_intervals("7/calendar") == [
+        (datetime(2024, 1, 2, 9, tzinfo=timezone.utc), datetime(2024, 1, 2, 11, tzinfo=timezone.utc))
+    ]
+
+    # Another worker has its own storage objects and its own service state
+    executor, buffer = StorageExecutor(max_workers=1), WriteBehindBuffer()
+    try:
+        if backend == "sqlite":
+            other = SqliteStorage(storage_service.calendar_root, executor, buffer)
+        else:
+            other = SimpleStorage(storage_service.calendar_root, CollectionCache(), executor, buffer)
+        collection = await other.discover("7/calendar")
+        await collection.upload(storage_service._task_event({**task, "id": 2, "start_date": datetime(2024, 1, 3, 9)},
+                                                            CalDAVService.task_event_uid(2)))
+        await collection.flush()
+    finally:
+        executor.shutdown()
+
+    assert await storage_service.get_busy_intervals("7/calendar") == [
+        (datetime(2024, 1, 2, 9, tzinfo=timezone.utc), datetime(2024, 1, 2, 11, tzinfo=timezone.utc)),
+        (datetime(2024, 1, 3, 9, tzinfo=timezone.utc), datetime(2024, 1, 3, 11, tzinfo=timezone.utc))
+    ]
+    # An aware window is compared with the naive UTC event times
+    assert await storage_service.get_busy_intervals(
+        "7/calendar", datetime(2024, 1, 3, tzinfo=timezone.utc), datetime(2024, 1, 4, tzinfo=timezone.utc)
+    ) == [(datetime(2024, 1, 3, 9, tzinfo=timezone.utc), datetime(2024, 1, 3, 11, tzinfo=timezone.utc))]
@@ -0,0 +1,357 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import pytest
+from app.services.caldav_storage import (
+    SHARDED_MARKER, CollectionCache, SimpleCalendar, StorageExecutor, WriteBehindBuffer, flush_pending_writes,
+    format_ics, shard_of
+)
+
+def event(uid: str, summary: str = "Task") -> dict:
+    return {"component": "VEVENT", "uid": uid, "summary": summary, "dtstart": "20240102T090000Z", "dtend": "20240102T100000Z"}
+
+async def read_all(calendar: SimpleCalendar) -> dict:
+    events = await calendar.list()
+    return {data["uid"]: data async for data in _components(events)}
+
+async def _components(events):
+    async for item in events:
+        yield await item.get_component()
+
+@pytest.fixture
+def calendar(tmp_path):
+    return SimpleCalendar(str(tmp_path), CollectionCache(max_events=100))
+
+@pytest.mark.asyncio
+async def test_repeated_reads_hit_memory(calendar):
+    for uid in ("a", "b", "c"):
+        await calendar.upload(event(uid))
+
+    assert set(await read_all(calendar)) == {"a", "b", "c"}
+    assert (await (await calendar.get_item("b")).get_component())["summary"] == "Task"
+    stats = calendar.cache.stats()
+    assert stats["event_misses"] == 3
+    assert stats["event_hits"] == 1
+    # Only the first lookup scanned the directory; writes updated the index in place
+    assert stats["index_rebuilds"] == 1
+
+@pytest.mark.asyncio
+async def test_overwrite_invalidates_parsed_event(calendar):
+    await calendar.upload(event("a", "Old"))
+    await calendar.get_item("a")
+    await calendar.upload(event("a", "New"))
+    assert (await (await calendar.get_item("a")).get_component())["summary"] == "New"
+
+@pytest.mark.asyncio
+async def test_external_changes_rebuild_index(calendar, tmp_path):
+    await calendar.upload(event("a"))
+    assert set(await read_all(calendar)) == {"a"}
+
+    (tmp_path / "b.ics").write_text(format_ics(event("b")))
+    assert set(await read_all(calendar)) == {"a", "b"}
+
+    os.remove(tmp_path / "a.ics")
+    assert set(await read_all(calendar)) == {"b"}
+    assert await calendar.get_item("a") is None
+
+@pytest.mark.asyncio
+async def test_write_does_not_hide_concurrent_external_files(calendar, tmp_path):
+    await calendar.upload(event("a"))
+    assert set(await read_all(calendar)) == {"a"}
+
+    # Another process adds a file while this one is about to write
+    file_name = calendar._file_name
+    def write_other(uid, sharded):
+        if not (tmp_path / "other.ics").exists():
+            (tmp_path / "other.ics").write_text(format_ics(event("other")))
+            os.utime(tmp_path, (time.time() + 10, time.time() + 10))
+        return file_name(uid, sharded)
+    calendar._file_name = write_other
+    await calendar.upload(event("mine"))
+    await calendar.flush()
+
+    assert set(await read_all(calendar)) == {"a", "mine", "other"}
+    assert await calendar.get_item("other") is not None
+
+@pytest.mark.asyncio
+async def test_delete_removes_event(calendar):
+    await calendar.upload(event("a"))
+    assert await calendar.delete("a") is True
+    assert await calendar.get_item("a") is None
+    assert await calendar.delete("a") is False
+
+@pytest.mark.asyncio
+async def test_parsed_events_are_bounded(tmp_path):
+    calendar = SimpleCalendar(str(tmp_path), CollectionCache(max_events=2))
+    for uid in ("a", "b", "c"):
+        await calendar.upload(event(uid))
+    await read_all(calendar)
+    assert calendar.cache.stats()["cached_events"] == 2
+
+@pytest.mark.asyncio
+async def test_range_listing_reads_only_matching_events(calendar, tmp_path):
+    await calendar.upload({**event("early"), "dtstart": "20240101T090000Z", "dtend": "20240101T100000Z"})
+    await calendar.upload({**event("match"), "dtstart": "20240108T090000Z", "dtend": "20240108T100000Z"})
+    (tmp_path / "late.ics").write_text(format_ics({**event("late"), "dtstart": "20240120T090000Z", "dtend": "20240120T100000Z"}))
+
+    events = await calendar.list(datetime(2024, 1, 7), datetime(2024, 1, 14))
+    assert [data["uid"] async for data in _components(events)] == ["match"]
+
+    await calendar.delete("match")
+    await calendar.upload({**event("moved"), "dtstart": "20240110T090000Z", "dtend": "20240110T100000Z"})
+    events = await calendar.list(datetime(2024, 1, 7), datetime(2024, 1, 14))
+    assert [data["uid"] async for data in _components(events)] == ["moved"]
+
+@pytest.mark.asyncio
+async def test_changes_since_returns_only_the_delta(calendar, tmp_path):
+    await calendar.upload(event("a"))
+    await calendar.upload(event("b"))
+    first = await calendar.changes_since()
+    assert {data["uid"] for data in first["changed"]} == {"a", "b"}
+    assert first["deleted"] == []
+
+    await calendar.upload(event("a", "Renamed"))
+    await calendar.delete("b")
+    (tmp_path / "c.ics").write_text(format_ics(event("c")))
+
+    delta = await calendar.changes_since(first["sync_token"])
+    assert [(data["uid"], data["summary"]) for data in delta["changed"]] == [("a", "Renamed"), ("c", "Task")]
+    assert delta["deleted"] == ["b"]
+    assert delta["ctag"] != first["ctag"]
+    assert await calendar.ctag() == delta["ctag"]
+    assert (await calendar.changes_since(delta["sync_token"]))["changed"] == []
+
+@pytest.mark.asyncio
+async def test_sharded_layout_reads_and_writes(calendar, tmp_path):
+    (tmp_path / SHARDED_MARKER).touch()
+    for uid in ("a", "b"):
+        await calendar.upload(event(uid))
+    await calendar.flush()
+    assert (tmp_path / shard_of("a") / "a.ics").exists()
+    assert not (tmp_path / "a.ics").exists()
+
+    # An external write to one shard is picked up
+    (tmp_path / shard_of("c")).mkdir(exist_ok=True)
+    (tmp_path / shard_of("c") / "c.ics").write_text(format_ics(event("c")))
+    # Directory mtimes are coarse; make the external change visible regardless of timing
+    for path in (tmp_path, tmp_path / shard_of("c")):
+        os.utime(path, (time.time() + 10, time.time() + 10))
+    assert set(await read_all(calendar)) == {"a", "b", "c"}
+
+    assert await calendar.delete("a")
+    assert await calendar.get_item("a") is None
+    assert set(await read_all(calendar)) == {"b", "c"}
+
+@pytest.mark.asyncio
+async def test_layout_migration_keeps_events_visible(calendar, tmp_path):
+    for i in range(5):
+        await calendar.upload({**event(f"e{i}"), "dtstart": f"2024010{i + 1}T090000Z", "dtend": f"2024010{i + 1}T100000Z"})
+    in_range = [item async for item in await calendar.list(datetime(2024, 1, 2), datetime(2024, 1, 3, 23))]
+    assert len(in_range) == 2
+
+    calendar.MIGRATION_BATCH_SIZE = 2
+    assert await calendar.migrate_layout() == 5
+    assert (tmp_path / SHARDED_MARKER).exists()
+    assert all((tmp_path / shard_of(f"e{i}") / f"e{i}.ics").exists() for i in range(5))
+    assert set(await read_all(calendar)) == {f"e{i}" for i in range(5)}
+    in_range = [item async for item in await calendar.list(datetime(2024, 1, 2), datetime(2024, 1, 3, 23))]
+    assert len(in_range) == 2
+
+    # A fresh process sees the same events
+    fresh = SimpleCalendar(str(tmp_path), CollectionCache())
+    assert set(await read_all(fresh)) == {f"e{i}" for i in range(5)}
+
+    assert await calendar.migrate_layout(sharded=False) == 5
+    assert not (tmp_path / SHARDED_MARKER).exists()
+    assert sorted(name for name in os.listdir(tmp_path) if name.endswith(".ics")) == [f"e{i}.ics" for i in range(5)]
+    assert set(await read_all(calendar)) == {f"e{i}" for i in range(5)}
+
+@pytest.mark.asyncio
+async def test_executor_keeps_order_per_calendar():
+    executor = StorageExecutor(max_workers=4)
+    order = []
+
+    def record(value):
+        time.sleep(0.001 * (5 - value))
+        order.append(value)
+        return value
+
+    try:
+        results = await asyncio.gather(*(executor.run("calendar", record, i) for i in range(5)))
+        assert results == order == [0, 1, 2, 3, 4]
+    finally:
+        executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_executor_runs_calendars_in_parallel():
+    executor = StorageExecutor(max_workers=2)
+    blocked = threading.Event()
+    try:
+        # The first calendar waits for the second, which needs a second worker
+        first = executor.run("a", blocked.wait, 5)
+        second = executor.run("b", blocked.set)
+        assert await asyncio.gather(first, second) == [True, None]
+    finally:
+        executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_executor_propagates_errors_and_continues():
+    executor = StorageExecutor(max_workers=1)
+
+    def fail():
+        raise OSError("disk full")
+
+    try:
+        with pytest.raises(OSError):
+            await executor.run("calendar", fail)
+        assert await executor.run("calendar", len, "abc") == 3
+    finally:
+        executor.shutdown()
+
+def test_executor_fails_queued_work_when_the_pool_refuses_it():
+    executor = StorageExecutor(max_workers=1)
+    refusing = ThreadPoolExecutor(max_workers=1)
+    refusing.shutdown()
+    executor._get_pool = lambda: refusing
+
+    future = executor.submit("calendar", len, "abc")
+    with pytest.raises(RuntimeError):
+        future.result(timeout=1)
+
+    # Nothing is left queued for the key, so later work is not stranded
+    del executor._get_pool
+    try:
+        assert executor.submit("calendar", len, "abc").result(timeout=1) == 3
+    finally:
+        executor.shutdown()
+
+def test_collections_do_not_share_a_lock(tmp_path):
+    cache = CollectionCache()
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    (tmp_path / "b" / "x.ics").write_text(format_ics(event("x")))
+    rescanning, done = threading.Event(), threading.Event()
+
+    def rescan_a():
+        with cache._path_lock(str(tmp_path / "a")):
+            rescanning.set()
+            done.wait(5)
+
+    thread = threading.Thread(target=rescan_a)
+    thread.start()
+    try:
+        rescanning.wait(5)
+        assert set(cache.index(str(tmp_path / "b")).files) == {"x"}
+    finally:
+        done.set()
+        thread.join()
+
+@pytest.mark.asyncio
+async def test_write_behind_coalesces_updates_to_one_write(tmp_path):
+    executor = StorageExecutor(max_workers=1)
+    buffer = WriteBehindBuffer()
+    calendar = SimpleCalendar(str(tmp_path), CollectionCache(), executor, buffer)
+    release = threading.Event()
+    try:
+        # Hold the calendar's lane so the uploads queue up behind it
+        blocker = executor.submit(str(tmp_path), release.wait, 5)
+        for summary in ("First", "Second", "Third"):
+            await calendar.upload(event("a", summary))
+        await calendar.upload(event("b"))
+        release.set()
+        await asyncio.wrap_future(blocker)
+        await calendar.flush()
+
+        stats = buffer.stats()
+        assert stats["coalesced"] == 2
+        assert stats["written"] == 2
+        assert stats["batches"] == 1
+        assert sorted(os.listdir(tmp_path)) == ["a.ics", "b.ics"]
+        assert "SUMMARY:Third" in (tmp_path / "a.ics").read_text()
+    finally:
+        executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_flush_pending_writes_on_shutdown(tmp_path):
+    executor = StorageExecutor(max_workers=1)
+    buffer = WriteBehindBuffer()
+    calendars = [tmp_path / "one", tmp_path / "two"]
+    release = threading.Event()
+    try:
+        for path in calendars:
+            path.mkdir()
+            executor.submit(str(path), release.wait, 5)
+            await SimpleCalendar(str(path), CollectionCache(), executor, buffer).upload(event("a"))
+        release.set()
+        written = await flush_pending_writes(executor=executor, buffer=buffer)
+        # The scheduled background flushes may have written some events already
+        assert written + buffer.stats()["written"] >= 2
+        assert buffer.stats()["pending"] == 0
+        assert all((path / "a.ics").exists() for path in calendars)
+    finally:
+        executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_failed_batch_stays_queued(tmp_path):
+    executor = StorageExecutor(max_workers=1)
+    buffer = WriteBehindBuffer()
+    missing = tmp_path / "missing"
+    calendar = SimpleCalendar(str(missing), CollectionCache(), executor, buffer)
+    try:
+        await calendar.upload(event("a"))
+        with pytest.raises(OSError):
+            await calendar.flush()
+        assert buffer.stats()["pending"] == 1
+
+        missing.mkdir()
+        assert await calendar.flush() == 1
+        assert (missing / "a.ics").exists()
+    finally:
+        executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_failing_event_is_dropped_after_max_attempts(tmp_path):
+    executor = StorageExecutor(max_workers=1)
+    buffer = WriteBehindBuffer(max_attempts=3)
+    calendar = SimpleCalendar(str(tmp_path / "missing"), CollectionCache(), executor, buffer)
+    try:
+        await calendar.upload(event("a"))
+        for _ in range(2):
+            with pytest.raises(OSError):
+                await calendar.flush()
+        assert buffer.stats()["pending"] == 0
+        assert buffer.stats()["dropped"] == 1
+        assert await calendar.flush() == 0
+    finally:
+        executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_compact_keeps_one_event_per_task(calendar, tmp_path):
+    for uid in ("old", "older", "kept"):
+        await calendar.upload({**event(uid), "x-pm-tool-id": "7"})
+    await calendar.upload({**event("newest"), "x-pm-tool-id": "7"})
+    await calendar.upload({**event("other"), "x-pm-tool-id": "8"})
+    (tmp_path / ".lost.ics.tmp").write_text("partial")
+
+    report = await calendar.compact({"7": "kept"}, dry_run=True)
+    assert report["events_removed"] == 3
+    assert len(os.listdir(tmp_path)) == 6
+
+    report = await calendar.compact({"7": "kept"})
+    assert report["events"] == 5
+    assert report["events_removed"] == 3
+    assert report["temp_files_removed"] == 1
+    assert report["bytes_reclaimed"] > 0
+    assert sorted(os.listdir(tmp_path)) == ["kept.ics", "other.ics"]
+
+    # Without a preference the most recently written event survives
+    later = tmp_path / "later.ics"
+    later.write_text(format_ics({**event("later"), "x-pm-tool-id": "8"}))
+    modified = os.stat(tmp_path / "other.ics").st_mtime + 10
+    os.utime(later, (modified, modified))
+    await calendar.compact()
+    assert await calendar.get_item("other") is None
+    assert await calendar.get_item("later") is not None
@@ -0,0 +1,106 @@
+"""Behaviour every calendar storage backend must share, run against each backend"""
+from datetime import datetime
+import pytest
+from app.services.caldav_sqlite import SqliteStorage, close_connections
+from app.services.caldav_storage import CollectionCache, SimpleStorage, StorageExecutor, WriteBehindBuffer
+from app.services.change_log import InvalidSyncToken
+
+def event(uid: str, start: str = "20240102T090000Z", end: str = "20240102T100000Z", **properties) -> dict:
+    return {"component": "VEVENT", "uid": uid, "summary": "Task", "dtstart": start, "dtend": end, **properties}
+
+async def uids(collection, start=None, end=None) -> set:
+    return {(await item.get_component())["uid"] async for item in await collection.list(start, end)}
+
+@pytest.fixture(params=["filesystem", "sqlite"])
+def storage(request, tmp_path):
+    executor, buffer = StorageExecutor(max_workers=2), WriteBehindBuffer()
+    if request.param == "sqlite":
+        storage = SqliteStorage(str(tmp_path), executor, buffer)
+    else:
+        storage = SimpleStorage(str(tmp_path), CollectionCache(max_events=100), executor, buffer)
+    yield storage
+    executor.shutdown(wait=True)
+    close_connections()
+
+async def create_calendar(storage):
+    return await storage.create_collection("7/calendar", {"tag": "VCALENDAR"})
+
+@pytest.mark.asyncio
+async def test_discover_finds_created_calendars_only(storage):
+    await create_calendar(storage)
+    assert await storage.discover("7/calendar") is not None
+    assert await storage.discover("7/missing") is None
+    await storage.create_collection("8/other", {"tag": "VCALENDAR"})
+    assert await storage.list_collections() == ["7/calendar", "8/other"]
+
+@pytest.mark.asyncio
+async def test_upload_get_and_overwrite(storage):
+    calendar = await create_calendar(storage)
+    description = "Line one\nLine two; with, punctuation \\ and ümlauts"
+    await calendar.upload(event("a", description=description))
+    assert (await (await calendar.get_item("a")).get_component())["description"] == description
+
+    await calendar.upload(event("a", summary="Renamed"))
+    assert (await (await calendar.get_item("a")).get_component())["summary"] == "Renamed"
+    assert await calendar.get_item("missing") is None
+    assert await uids(calendar) == {"a"}
+
+@pytest.mark.asyncio
+async def test_delete(storage):
+    calendar = await create_calendar(storage)
+    await calendar.upload(event("a"))
+    assert await calendar.delete("a") is True
+    assert await calendar.delete("a") is False
+    assert await calendar.get_item("a") is None
+    assert await uids(calendar) == set()
+
+@pytest.mark.asyncio
+async def test_list_range_returns_events_starting_or_ending_in_window(storage):
+    calendar = await create_calendar(storage)
+    await calendar.upload(event("before", "20240101T080000Z", "20240101T090000Z"))
+    await calendar.upload(event("starts", "20240102T110000Z", "20240103T090000Z"))
+    await calendar.upload(event("ends", "20240101T220000Z", "20240102T010000Z"))
+    await calendar.upload(event("after", "20240104T080000Z", "20240104T090000Z"))
+
+    window = (datetime(2024, 1, 2), datetime(2024, 1, 2, 23, 59))
+    assert await uids(calendar, *window) == {"starts", "ends"}
+    assert await uids(calendar) == {"before", "starts", "ends", "after"}
+
+@pytest.mark.asyncio
+async def test_changes_since_and_ctag(storage):
+    calendar = await create_calendar(storage)
+    await calendar.upload(event("a"))
+    await calendar.upload(event("b"))
+    first = await calendar.changes_since()
+    assert {data["uid"] for data in first["changed"]} == {"a", "b"}
+    assert first["deleted"] == []
+    assert first["ctag"] == await calendar.ctag()
+
+    await calendar.upload(event("a", summary="Renamed"))
+    await calendar.delete("b")
+    delta = await calendar.changes_since(first["sync_token"])
+    assert [data["summary"] for data in delta["changed"]] == ["Renamed"]
+    assert delta["deleted"] == ["b"]
+    assert delta["ctag"] != first["ctag"]
+
+    unchanged = await calendar.changes_since(delta["sync_token"])
+    assert unchanged["changed"] == unchanged["deleted"] == []
+    assert unchanged["ctag"] == delta["ctag"]
+
+    with pytest.raises(InvalidSyncToken):
+        await calendar.changes_since("https://example.com/sync/0")
+
+@pytest.mark.asyncio
+async def test_compact_keeps_one_event_per_task(storage):
+    calendar = await create_calendar(storage)
+    await calendar.upload(event("old", **{"x-pm-tool-id": "1"}))
+    await calendar.upload(event("new", **{"x-pm-tool-id": "1"}))
+    await calendar.upload(event("other", **{"x-pm-tool-id": "2"}))
+
+    report = await calendar.compact(dry_run=True)
+    assert report["events_removed"] == 1
+    assert await uids(calendar) == {"old", "new", "other"}
+
+    report = await calendar.compact({"1": "old"})
+    assert report["events"] == 3 and report["events_removed"] == 1
+    assert await uids(calendar) == {"old", "other"}
@@ -0,0 +1,71 @@
+import pytest
+from datetime import datetime
+from app.services.interval_index import IntervalIndex
+from app.services.capacity_scheduler import CapacityScheduler
+from app.services.working_calendar import compile_calendar
+from app.services.working_time import split_by_working_day
+
+def test_interval_index_merges_and_finds_gaps():
+    index = IntervalIndex([(10, 20), (15, 30), (40, 50)])
+    assert list(index) == [(10, 30), (40, 50)]
+
+    index.add(30, 35)
+    assert list(index) == [(10, 35), (40, 50)]
+    assert index.next_free(12) == 35
+    assert index.next_free(36) == 36
+    assert index.gaps(0, 60) == [(0, 10), (35, 40), (50, 60)]
+    assert index.is_free(35, 40)
+    assert not index.is_free(34, 36)
+
+def test_allocate_fills_gaps_in_order():
+    index = IntervalIndex([(10, 20), (25, 40)])
+
+    fragments = index.allocate(5, 15)
+
+    assert fragments == [(5, 10), (20, 25), (40, 45)]
+    assert list(index) == [(5, 45)]
+
+def test_capacity_scheduler_respects_bookings_and_dependencies():
+    booked = IntervalIndex([(0, 60)])
+    scheduler = CapacityScheduler(booked)
+
+    placements = scheduler.place(
+        order=[1, 2, 3],
+        minutes={1: 30, 2: 30, 3: 30},
+        predecessors={3: [1]},
+        earliest=0
+    )
+
+    assert placements[1] == [(60, 90)]
+    assert placements[2] == [(90, 120)]
+    assert placements[3] == [(120, 150)]
+
+def test_working_minute_round_trip():
+    calendar = compile_calendar()
+    monday = datetime(2024, 1, 8, 10, 30)
+    minute = calendar.to_working_minute(monday)
+    assert calendar.from_working_minute(minute) == monday
+
+    # Weekends and evenings snap forward to the next working minute
+    assert calendar.to_working_minute(datetime(2024, 1, 13, 12, 0)) == calendar.to_working_minute(datetime(2024, 1, 15, 9, 0))
+    assert calendar.to_working_minute(datetime(2024, 1, 8, 18, 0)) == calendar.to_working_minute(datetime(2024, 1, 8, 17, 0))
+
+    friday_end = calendar.to_working_minute(datetime(2024, 1, 12, 17, 0))
+    assert calendar.from_working_minute(friday_end, is_end=True) == datetime(2024, 1, 12, 17, 0)
+    assert calendar.from_working_minute(friday_end) == datetime(2024, 1, 15, 9, 0)
+
+def test_split_by_working_day():
+    assert list(split_by_working_day(400, 1000)) == [(400, 480), (480, 960), (960, 1000)]
+
+def test_capacity_scheduler_waits_for_already_placed_predecessors():
+    scheduler = CapacityScheduler(IntervalIndex([(0, 100)]))
+
+    placements = scheduler.place(
+        order=[2],
+        minutes={2: 30},
+        predecessors={2: [1]},
+        earliest=0,
+        finished={1: 200}
+    )
+
+    assert placements[2] == [(200, 230)]
@@ -0,0 +1,79 @@
+import pytest
+from app.services.change_log import ChangeLog, InvalidSyncToken
+
+def test_changes_since_returns_latest_change_per_uid(tmp_path):
+    log = ChangeLog(str(tmp_path))
+    log.record("a", 1)
+    log.record("b", 1)
+    token = log.sync_token
+
+    log.record("a", 2)
+    log.record("c", 1)
+    log.record("b", None)
+    log.record("a", 3)
+
+    assert log.changes_since(token) == (["c", "a"], ["b"])
+    assert log.changes_since(log.sync_token) == ([], [])
+    # Without a token only current events are reported
+    assert log.changes_since(None) == (["c", "a"], [])
+
+def test_unchanged_writes_keep_the_ctag(tmp_path):
+    log = ChangeLog(str(tmp_path))
+    log.record("a", 1)
+    ctag = log.ctag
+    log.record("a", 1)
+    log.record("missing", None)
+    assert log.ctag == ctag
+
+def test_foreign_and_future_tokens_are_rejected(tmp_path):
+    log = ChangeLog(str(tmp_path))
+    log.record("a", 1)
+    other = ChangeLog(str(tmp_path / "other"))
+    other.record("a", 1)
+    with pytest.raises(InvalidSyncToken):
+        log.changes_since(other.sync_token)
+    with pytest.raises(InvalidSyncToken):
+        log.changes_since(log.sync_token[:-1] + "9")
+    with pytest.raises(InvalidSyncToken):
+        log.changes_since("garbage")
+
+def test_journal_is_replayed_and_pruned_tombstones_expire_tokens(tmp_path):
+    log = ChangeLog(str(tmp_path))
+    log.record("a", 1)
+    old_token = log.sync_token
+    log.record("b", 1)
+    log.record("a", None)
+
+    reloaded = ChangeLog(str(tmp_path))
+    assert (reloaded.log_id, reloaded.seq) == (log.log_id, log.seq)
+    assert reloaded.changes_since(old_token) == (["b"], ["a"])
+
+    reloaded.MAX_TOMBSTONES = 0
+    reloaded.compact()
+    with pytest.raises(InvalidSyncToken):
+        reloaded.changes_since(old_token)
+    assert ChangeLog(str(tmp_path)).changes_since(reloaded.sync_token) == ([], [])
+
+def test_reconcile_logs_external_changes(tmp_path):
+    log = ChangeLog(str(tmp_path))
+    log.reconcile({"a": ("a.ics", 1), "b": ("b.ics", 1)})
+    token = log.sync_token
+    log.reconcile({"a": ("a.ics", 2), "c": ("c.ics", 1)})
+    assert log.changes_since(token) == (["a", "c"], ["b"])
+
+def test_processes_sharing_a_journal_number_changes_together(tmp_path):
+    # Two logs on one calendar stand in for two worker processes
+    first, second = ChangeLog(str(tmp_path)), ChangeLog(str(tmp_path))
+    first.record("a", 1)
+    token = first.sync_token
+    second.record("b", 1)
+    first.record("c", 1)
+
+    assert second.changes_since(token) == (["b", "c"], [])
+    assert second.sync_token == first.sync_token
+    assert first.changes_since(second.sync_token) == ([], [])
+
+    second.compact()
+    first.record("b", None)
+    assert second.changes_since(token) == (["c"], ["b"])
+    assert first.changes_since(token) == (["c"], ["b"])
@@ -0,0 +1,55 @@
+import pytest
+from app.services.dependency_scheduler import DependencyScheduler
+
+def make_tasks(hours):
+    return [{"id": task_id, "hours": h} for task_id, h in hours.items()]
+
+def test_topological_order_respects_dependencies():
+    tasks = make_tasks({1: 4, 2: 2, 3: 3, 4: 1})
+    # 4 depends on 2 and 3, 2 and 3 depend on 1
+    scheduler = DependencyScheduler(tasks, [(2, 1), (3, 1), (4, 2), (4, 3)])
+
+    order, cycle = scheduler.topological_order()
+
+    ids = [scheduler.task_ids[i] for i in order]
+    assert ids[0] == 1 and ids[-1] == 4
+    assert cycle == []
+
+def test_critical_path_and_parallel_lanes():
+    tasks = make_tasks({1: 4, 2: 2, 3: 6, 4: 1})
+    scheduler = DependencyScheduler(tasks, [(2, 1), (3, 1), (4, 2), (4, 3)])
+
+    plan = scheduler.plan()
+
+    assert plan["critical_path"] == [1, 3, 4]
+    assert plan["critical_path_hours"] == 11
+    assert plan["duration_hours"] == 11
+    assert plan["lanes"] == 2
+    assert plan["timings"][2]["slack"] == 4
+    assert plan["timings"][2]["start"] == plan["timings"][3]["start"] == 4
+    assert plan["timings"][2]["lane"] != plan["timings"][3]["lane"]
+
+def test_max_lanes_serializes_independent_tasks():
+    tasks = make_tasks({1: 2, 2: 3, 3: 1})
+
+    plan = DependencyScheduler(tasks, []).plan(max_lanes=1)
+
+    assert plan["lanes"] == 1
+    assert plan["duration_hours"] == 6
+    assert plan["critical_path_hours"] == 3
+
+def test_cycles_are_reported_not_fatal():
+    tasks = make_tasks({1: 1, 2: 1, 3: 1})
+
+    plan = DependencyScheduler(tasks, [(2, 3), (3, 2), (2, 1), (5, 1), (1, 1)]).plan()
+
+    assert plan["cycle_task_ids"] == [2, 3]
+    assert set(plan["order"]) == {1, 2, 3}
+
+def test_downstream_ids_follow_dependents_transitively():
+    tasks = make_tasks({1: 1, 2: 1, 3: 1, 4: 1, 5: 1})
+    scheduler = DependencyScheduler(tasks, [(2, 1), (3, 2), (4, 1)])
+
+    assert scheduler.downstream_ids([2]) == {2, 3}
+    assert scheduler.downstream_ids([1]) == {1, 2, 3, 4}
+    assert scheduler.downstream_ids([5, 99]) == {5}
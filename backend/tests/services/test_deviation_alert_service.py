@@ -0,0 +1,92 @@
+import pytest
+import statistics
+from unittest.mock import MagicMock
+from sqlalchemy.dialects import postgresql
+from app.services.deviation_alert_service import DeviationAlertService, WelfordAccumulator
+from app.models.estimation_stats import UserEstimationStats, TaskDeviationState
+
+@pytest.fixture
+def db_session():
+    return MagicMock()
+
+@pytest.fixture
+def alert_service(db_session):
+    return DeviationAlertService(db_session)
+
+def mock_queries(db_session, task_rows, states=None, stats=None):
+    def mock_query(*entities):
+        query = MagicMock()
+        if entities[0] is TaskDeviationState:
+            query.filter.return_value.all.return_value = states or []
+        elif entities[0] is UserEstimationStats:
+            query.filter.return_value.with_for_update.return_value.all.return_value = stats or []
+        else:
+            query.join.return_value.filter.return_value.all.return_value = task_rows
+        return query
+    db_session.query = mock_query
+
+def test_welford_accumulator_add_and_remove():
+    samples = [10.0, -5.0, 30.0, 12.5, 0.0, 45.0]
+    accumulator = WelfordAccumulator()
+    for sample in samples:
+        accumulator.add(sample)
+
+    assert accumulator.mean == pytest.approx(statistics.mean(samples))
+    assert accumulator.variance == pytest.approx(statistics.variance(samples))
+
+    accumulator.remove(30.0)
+    remaining = [10.0, -5.0, 12.5, 0.0, 45.0]
+    assert accumulator.count == 5
+    assert accumulator.mean == pytest.approx(statistics.mean(remaining))
+    assert accumulator.variance == pytest.approx(statistics.variance(remaining))
+
+def test_threshold_alert_emitted_once_per_level(alert_service, db_session):
+    state = TaskDeviationState(task_id=1, user_id=1, sample=None, alerted_level=0, outlier_flagged=False)
+    mock_queries(db_session, [(1, 10.0, 1)], states=[state])
+
+    events = alert_service.on_hours_changed({1: 13.0})
+    assert [e.event_type for e in events] == ["estimate_deviation"]
+    assert events[0].payload["severity"] == "warning"
+    assert state.alerted_level == 1
+
+    # Still within the same level, no new alert
+    assert alert_service.on_hours_changed({1: 14.0}) == []
+
+    events = alert_service.on_hours_changed({1: 16.0})
+    assert events[0].payload["severity"] == "critical"
+
+def test_outlier_detected_against_user_stats(alert_service, db_session):
+    accumulator = WelfordAccumulator()
+    for sample in [5.0, -5.0, 2.0, -2.0, 0.0, 4.0]:
+        accumulator.add(sample)
+    stats = UserEstimationStats(user_id=1, sample_count=accumulator.count, mean=accumulator.mean, m2=accumulator.m2)
+    state = TaskDeviationState(task_id=7, user_id=1, sample=None, alerted_level=0, outlier_flagged=False)
+    mock_queries(db_session, [(7, 10.0, 1)], states=[state], stats=[stats])
+
+    events = alert_service.on_hours_changed({7: 12.0})
+
+    assert "deviation_outlier" in [e.event_type for e in events]
+    assert stats.sample_count == 7
+    assert state.sample == pytest.approx(20.0)
+
+def test_tasks_without_estimate_are_ignored(alert_service, db_session):
+    state = TaskDeviationState(task_id=3, user_id=1, sample=None, alerted_level=0, outlier_flagged=False)
+    mock_queries(db_session, [(3, 0.0, 1)], states=[state])
+
+    assert alert_service.on_hours_changed({3: 5.0}) == []
+    assert state.sample is None
+
+def test_missing_stats_rows_inserted_before_locking(alert_service, db_session):
+    calls = []
+    mock_queries(db_session, [(1, 10.0, 1), (2, 10.0, 2)])
+    queries = db_session.query
+    db_session.query = lambda *entities: calls.append(entities[0]) or queries(*entities)
+    db_session.execute.side_effect = lambda stmt: calls.append(stmt)
+
+    alert_service.on_hours_changed({1: 11.0, 2: 12.0})
+
+    lock_index = next(index for index, call in enumerate(calls) if call is UserEstimationStats)
+    insert = calls[lock_index - 1]
+    sql = str(insert.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (user_id) DO NOTHING" in sql
+    assert sorted(value for key, value in insert.compile().params.items() if key.startswith("user_id")) == [1, 2]
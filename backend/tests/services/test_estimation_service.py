@@ -169,3 +169,20 @@ async def test_generate_proactive_hints(estimation_service):
         assert result["financial_impact"]["risk_level"] == "medium"
         assert result["time_impact"]["risk_level"] == "low"
         assert len(result["recommendations"]) == 1
+
+def test_analyze_estimate_accuracy_batch(estimation_service, db_session):
+    completed_task = MagicMock(id=1, estimated_hours=4.0, actual_hours=5.0)
+    open_task = MagicMock(id=2, estimated_hours=3.0, actual_hours=None)
+    unestimated_task = MagicMock(id=4, estimated_hours=0.0, actual_hours=2.0)
+    legacy_task = MagicMock(id=5, estimated_hours=None, actual_hours=2.0)
+
+    db_session.query().join().filter().all.return_value = [completed_task, open_task, unestimated_task, legacy_task]
+
+    result = estimation_service.analyze_estimate_accuracy_batch([1, 2, 3, 1, 4, 5], user_id=1)
+
+    assert result["status"] == "success"
+    assert result["results"][1]["accuracy_rating"] == "good"
+    assert result["results"][2]["status"] == "incomplete"
+    assert result["results"][4]["status"] == "no_estimate"
+    assert result["results"][5]["status"] == "no_estimate"
+    assert result["not_found"] == [3]
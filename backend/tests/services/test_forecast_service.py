@@ -0,0 +1,53 @@
+import pytest
+import time
+from unittest.mock import MagicMock
+from app.models.estimation_stats import UserEstimationStats
+from app.services.forecast_service import MonteCarloForecaster, ForecastService
+
+def make_tasks(hours, median_factor=1.0, sigma=0.0):
+    return [{"id": task_id, "hours": h, "median_factor": median_factor, "sigma": sigma} for task_id, h in hours.items()]
+
+def test_without_spread_the_forecast_is_the_critical_path():
+    # 1 -> 2 -> 4 and 1 -> 3 -> 4
+    forecaster = MonteCarloForecaster(make_tasks({1: 4, 2: 2, 3: 6, 4: 1}), [(2, 1), (3, 1), (4, 2), (4, 3)])
+
+    totals = forecaster.simulate(10, seed=1)
+
+    assert totals == pytest.approx([11.0] * 10)
+    assert forecaster.simulate(10, sequential=True, seed=1) == pytest.approx([13.0] * 10)
+
+def test_percentiles_grow_with_uncertainty():
+    tasks = make_tasks({i: 8 for i in range(20)}, sigma=0.5)
+    forecaster = MonteCarloForecaster(tasks, [])
+
+    percentiles = forecaster.summarize(forecaster.simulate(5000, seed=3))
+
+    assert 8 < percentiles[50] < percentiles[80] < percentiles[95]
+
+def test_historical_underestimation_shifts_the_median():
+    db = MagicMock()
+    # Tasks ran 50% over on average, with a 20 point spread
+    db.query().filter().first.return_value = UserEstimationStats(user_id=1, sample_count=5, mean=50.0, m2=1600.0)
+
+    median_factor, sigma = ForecastService(db)._history(1)
+
+    assert median_factor == pytest.approx(1.5)
+    assert sigma > 0
+
+def test_low_confidence_widens_the_distribution():
+    service = ForecastService(MagicMock())
+
+    assert service._confidence_sigma(0.9) < service._confidence_sigma(0.3)
+    assert service._confidence_sigma(None) == service._confidence_sigma(ForecastService.DEFAULT_CONFIDENCE)
+    # Zero confidence is a real score, the widest spread
+    assert service._confidence_sigma(0.0) == ForecastService.MAX_SIGMA
+
+def test_500_tasks_forecast_within_a_second():
+    tasks = make_tasks({i: 4 for i in range(500)}, median_factor=1.2, sigma=0.4)
+    dependencies = [(i, i - 1) for i in range(1, 500, 2)] + [(i, i - 7) for i in range(7, 500, 3)]
+    forecaster = MonteCarloForecaster(tasks, dependencies)
+
+    started = time.perf_counter()
+    forecaster.summarize(forecaster.simulate(ForecastService.DEFAULT_SIMULATIONS, seed=1))
+
+    assert time.perf_counter() - started < 1.0
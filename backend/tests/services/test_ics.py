@@ -0,0 +1,63 @@
+from datetime import datetime
+import icalendar
+from app.services.ics import (
+    escape_text, fold_line, format_event, format_ics, parse_events, parse_ics, unescape_text
+)
+
+def event(**extra) -> dict:
+    return {
+        "component": "VEVENT", "uid": "a", "summary": "Task",
+        "dtstart": "20240102T090000Z", "dtend": "20240102T100000Z", **extra
+    }
+
+def test_text_escaping_round_trips():
+    value = "Line 1\nLine 2; a, b \\ c"
+    assert escape_text(value) == "Line 1\\nLine 2\\; a\\, b \\\\ c"
+    assert unescape_text(escape_text(value)) == value
+    assert escape_text("a\r\nb") == "a\\nb"
+
+def test_long_lines_fold_at_75_octets_without_splitting_characters():
+    line = "DESCRIPTION:" + "ä" * 100
+    folded = fold_line(line)
+    parts = folded.split("\r\n")
+    assert all(len(part.encode("utf-8")) <= 75 for part in parts)
+    assert all(part.startswith(" ") for part in parts[1:])
+    assert "".join(part[1:] if i else part for i, part in enumerate(parts)) == line
+    assert fold_line("SUMMARY:short") == "SUMMARY:short"
+
+def test_multiline_description_round_trips():
+    data = event(description="Fix the parser\n\nDuration: 2.0 hours\nRate: 80,00; net " + "x" * 200)
+    text = format_ics(data)
+    assert all(len(line.encode("utf-8")) <= 75 for line in text.split("\r\n"))
+    assert parse_ics(text) == data
+
+def test_parameters_and_nested_components():
+    text = (
+        "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+        "BEGIN:VEVENT\r\nUID:a\r\n"
+        'DTSTART;TZID="Europe/Berlin: CET":20240102T090000\r\n'
+        "SUMMARY;LANGUAGE=de:Aufgabe\r\n"
+        "BEGIN:VALARM\r\nACTION:DISPLAY\r\nDESCRIPTION:Reminder\r\nEND:VALARM\r\n"
+        "END:VEVENT\r\n"
+        "BEGIN:VEVENT\r\nUID:b\r\nEND:VEVENT\r\n"
+        "END:VCALENDAR\r\n"
+    )
+    first, second = parse_events(text)
+    assert first == {"component": "VEVENT", "uid": "a", "dtstart": "20240102T090000", "summary": "Aufgabe"}
+    assert second["uid"] == "b"
+
+def test_output_is_readable_by_icalendar():
+    data = event(description="Line 1\nLine 2, with comma", categories=["PM Tool Task"], priority="1")
+    calendar = icalendar.Calendar.from_ical(format_ics(data))
+    parsed = calendar.walk("VEVENT")[0]
+    assert str(parsed["description"]) == "Line 1\nLine 2, with comma"
+    assert parsed.decoded("dtstart").replace(tzinfo=None) == datetime(2024, 1, 2, 9)
+    assert format_event(data, ["uid", "missing"]) == "BEGIN:VEVENT\r\nUID:a\r\nEND:VEVENT\r\n"
+
+def test_icalendar_output_is_readable():
+    calendar = icalendar.Calendar()
+    vevent = icalendar.Event()
+    vevent.add("uid", "a")
+    vevent.add("summary", "Task; with ünïcode " * 10)
+    calendar.add_component(vevent)
+    assert parse_ics(calendar.to_ical().decode("utf-8"))["summary"] == "Task; with ünïcode " * 10
@@ -81,3 +81,18 @@ async def test_pdf_extraction_error(pdf_service, mock_pdf_file):
             await pdf_service.extract_text_from_pdf(mock_pdf_file)
         assert exc_info.value.status_code == 400
         assert "Error processing PDF: PDF error" in str(exc_info.value.detail)
+
+def test_store_dependencies_resolves_task_references(pdf_service, db_session):
+    design = MagicMock(id=1, title="Design mockups", description="Create the design mockups")
+    frontend = MagicMock(id=2, title="Build frontend", description="Implement the frontend")
+    launch = MagicMock(id=3, title="Launch", description="Go live")
+
+    edge_count = pdf_service._store_dependencies([
+        (design, []),
+        (frontend, ["design  Mockups"]),
+        (launch, ["Implement the frontend", "Unknown task", "Launch"])
+    ])
+
+    assert edge_count == 2
+    stored = db_session.add_all.call_args[0][0]
+    assert [(d.task_id, d.depends_on_id) for d in stored] == [(2, 1), (3, 2)]
@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.models.task import Task
+from app.models.user import User
+from app.services.schedule_cache import ScheduleCache, schedule_cache, _invalidate_committed_changes
+
+def test_lru_eviction_and_hit_rate():
+    cache = ScheduleCache(max_entries=2)
+    cache.put("a", 1, {"v": 1})
+    cache.put("b", 1, {"v": 2})
+    assert cache.get("a") == {"v": 1}
+
+    cache.put("c", 2, {"v": 3})  # evicts "b", the least recently used
+
+    assert cache.get("b") is None
+    assert cache.get("c") == {"v": 3}
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 2 and stats["misses"] == 1
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+def test_invalidate_project_drops_only_its_entries():
+    cache = ScheduleCache()
+    cache.put(cache.make_key(1, "x"), 1, {})
+    cache.put(cache.make_key(2, "x"), 2, {})
+
+    cache.invalidate_project(1)
+
+    assert cache.get(cache.make_key(1, "x")) is None
+    assert cache.get(cache.make_key(2, "x")) == {}
+    assert cache.stats()["invalidations"] == 1
+
+def test_committed_task_writes_invalidate_the_project():
+    engine = create_engine("sqlite://")
+    Task.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    key = schedule_cache.make_key("test-project", 4242)
+    schedule_cache.put(key, 4242, {"schedule": []})
+
+    session.add(Task(project_id=4242, description="Write docs", estimated_hours=2.0))
+    session.flush()
+    session.rollback()
+    assert schedule_cache.get(key) is not None
+
+    session.add(Task(project_id=4242, description="Write docs", estimated_hours=2.0))
+    session.commit()
+    assert schedule_cache.get(key) is None
+    session.close()
+
+def test_other_models_do_not_hook_the_session():
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+
+    session.add(User(email="someone@example.com", hashed_password="x"))
+    session.commit()
+
+    assert not event.contains(session, "after_commit", _invalidate_committed_changes)
+    assert "schedule_cache_projects" not in session.info
+    session.close()
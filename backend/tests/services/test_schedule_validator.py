@@ -0,0 +1,71 @@
+import pytest
+from datetime import date
+from app.services.schedule_validator import ScheduleValidator
+
+def slot(day, start, end, task_id=1, hours=None, **extra):
+    start_h, start_m = map(int, start.split(":"))
+    end_h, end_m = map(int, end.split(":"))
+    if hours is None:
+        hours = ((end_h * 60 + end_m) - (start_h * 60 + start_m)) / 60
+    return {"date": day, "start_time": start, "end_time": end, "task_id": task_id, "hours": hours, **extra}
+
+def test_detects_overlapping_slots_on_the_same_day():
+    result = ScheduleValidator().validate([
+        slot("2024-01-02", "09:00", "11:00", task_id=1),
+        slot("2024-01-02", "13:00", "14:00", task_id=3),
+        slot("2024-01-02", "10:30", "12:00", task_id=2)
+    ])
+
+    assert not result["is_valid"]
+    assert result["summary"]["overlaps"] == 1
+    assert "task 1 09:00-11:00 and task 2 10:30-12:00" in result["conflicts"][0]
+
+def test_touching_slots_and_separate_lanes_do_not_overlap():
+    result = ScheduleValidator().validate([
+        slot("2024-01-02", "09:00", "11:00", lane=0),
+        slot("2024-01-02", "11:00", "12:00", lane=0),
+        slot("2024-01-02", "09:00", "12:00", lane=1)
+    ])
+
+    assert result["is_valid"]
+    assert result["summary"]["overlaps"] == 0
+
+def test_reports_each_overbooked_day_once():
+    result = ScheduleValidator().validate([
+        {"date": "2024-01-02", "hours": 5, "task_id": 1},
+        {"date": "2024-01-02", "hours": 4, "task_id": 2},
+        {"date": "2024-01-02", "hours": 1, "task_id": 3},
+        {"date": "2024-01-03", "hours": 8, "task_id": 4}
+    ])
+
+    assert result["summary"]["overbooked_days"] == 1
+    assert result["conflicts"] == ["Overbooked day on 2024-01-02: 10 hours scheduled"]
+
+def test_weekend_and_holiday_work_are_warnings():
+    result = ScheduleValidator(holidays=[date(2024, 1, 1)]).validate([
+        slot("2024-01-01", "09:00", "10:00"),
+        slot("2024-01-06", "09:00", "10:00")
+    ])
+
+    assert result["is_valid"]
+    assert result["summary"]["holiday_slots"] == 1
+    assert result["summary"]["weekend_slots"] == 1
+    assert result["warnings"] == ["Holiday work scheduled on 2024-01-01", "Weekend work scheduled on 2024-01-06"]
+
+def test_malformed_slots_are_conflicts_not_errors():
+    result = ScheduleValidator().validate([
+        {"date": "not-a-date", "hours": 1},
+        {"hours": 1},
+        slot("2024-01-02", "12:00", "10:00")
+    ])
+
+    assert not result["is_valid"]
+    assert result["summary"]["invalid_slots"] == 3
+
+def test_large_batch_caps_messages_but_counts_everything():
+    slots = [slot("2024-01-02", "09:00", "10:00", task_id=i) for i in range(5000)]
+
+    result = ScheduleValidator().validate(slots)
+
+    assert result["summary"]["overlaps"] == 4999
+    assert len(result["conflicts"]) == ScheduleValidator.MAX_REPORTED
@@ -0,0 +1,118 @@
+import pytest
+from datetime import datetime, date, timedelta
+from unittest.mock import MagicMock
+from app.models.project import Project
+from app.models.scheduled_slot import ScheduledSlot, ProjectSchedule
+from app.models.task import Task
+from app.models.task_dependency import TaskDependency
+from app.services.scheduling_service import SchedulingService
+from app.services.working_calendar import compile_calendar
+
+@pytest.fixture
+def scheduling_service():
+    return SchedulingService(MagicMock())
+
+def test_available_slots_compress_full_days(scheduling_service):
+    # Monday to the following Monday; the weekend does not break the run
+    slots = scheduling_service.get_available_slots(datetime(2024, 1, 1), datetime(2024, 1, 8))
+
+    assert slots == [
+        {"date": "2024-01-01", "end_date": "2024-01-08", "days": 6, "available_hours": 8.0, "start_time": "09:00", "end_time": "17:00"}
+    ]
+
+def test_available_slots_subtract_busy_intervals(scheduling_service):
+    busy = [
+        (datetime(2024, 1, 2, 8, 0), datetime(2024, 1, 2, 12, 0)),
+        (datetime(2024, 1, 2, 11, 0), datetime(2024, 1, 2, 13, 0)),  # overlaps the first one
+        (datetime(2024, 1, 4, 15, 0), datetime(2024, 1, 5, 10, 0))
+    ]
+
+    slots = scheduling_service.get_available_slots(datetime(2024, 1, 1), datetime(2024, 1, 5), busy)
+
+    assert [(s["date"], s["end_date"], s["start_time"], s["end_time"]) for s in slots] == [
+        ("2024-01-01", "2024-01-01", "09:00", "17:00"),
+        ("2024-01-02", "2024-01-02", "13:00", "17:00"),
+        ("2024-01-03", "2024-01-03", "09:00", "17:00"),
+        ("2024-01-04", "2024-01-04", "09:00", "15:00"),
+        ("2024-01-05", "2024-01-05", "10:00", "17:00")
+    ]
+    assert sum(s["available_hours"] * s["days"] for s in slots) == 8 + 4 + 8 + 6 + 7
+
+def test_moved_slots_report_only_changed_tasks():
+    def slot(task_id, start_hour, end_hour):
+        return ScheduledSlot(task_id=task_id, project_id=1, start_at=datetime(2024, 1, 2, start_hour), end_at=datetime(2024, 1, 2, end_hour))
+
+    previous = [slot(1, 9, 11), slot(2, 11, 12), slot(3, 12, 13)]
+    current = [slot(1, 9, 11), slot(2, 11, 14)]
+
+    moved = SchedulingService._moved_slots(previous, current)
+
+    assert [entry["task_id"] for entry in moved] == [2, 3]
+    assert moved[0]["current"][0]["end_time"] == "14:00"
+    assert moved[1]["current"] == []
+
+def test_timeline_slices_split_at_day_boundaries():
+    plan = {
+        "order": [1, 2],
+        "timings": {
+            1: {"start": 0.0, "finish": 10.5, "lane": 0},
+            2: {"start": 0.0, "finish": 2.25, "lane": 1}
+        }
+    }
+    # Friday 2024-01-05 09:00, so task 1 continues on Monday
+    calendar = compile_calendar()
+    project_start = calendar.to_working_minute(datetime(2024, 1, 5, 9, 0))
+
+    slices = SchedulingService._timeline_slices(plan, project_start, calendar.day_minutes)
+    slots = SchedulingService._materialize_slots(
+        slices, [{"id": 1, "description": "a"}, {"id": 2, "description": "b"}], plan, calendar
+    )
+
+    assert [(s["task_id"], s["date"], s["start_time"], s["end_time"], s["lane"]) for s in slots] == [
+        (1, "2024-01-05", "09:00", "17:00", 0),
+        (2, "2024-01-05", "09:00", "11:15", 1),
+        (1, "2024-01-08", "09:00", "11:30", 0)
+    ]
+    assert slots[2]["hours"] == 2.5
+
+def test_available_slots_follow_custom_calendar(scheduling_service):
+    # Monday-Thursday 08:00-14:00 with Wednesday off
+    calendar = compile_calendar(8 * 60, 6 * 60, [0, 1, 2, 3], [date(2024, 1, 3)])
+
+    slots = scheduling_service.get_available_slots(datetime(2024, 1, 1), datetime(2024, 1, 7), calendar=calendar)
+
+    assert slots == [
+        {"date": "2024-01-01", "end_date": "2024-01-04", "days": 3, "available_hours": 6.0, "start_time": "08:00", "end_time": "14:00"}
+    ]
+
+def test_delete_booked_task_pulls_dependents_forward(db_session, test_user):
+    project = Project(user_id=test_user.id, name="Booked project", description="Booked project")
+    db_session.add(project)
+    db_session.commit()
+    first = Task(project_id=project.id, title="First", description="First", estimated_hours=4.0, status="pending")
+    second = Task(project_id=project.id, title="Second", description="Second", estimated_hours=2.0, status="pending")
+    db_session.add_all([first, second])
+    db_session.commit()
+    first_id, second_id = first.id, second.id
+    db_session.add(TaskDependency(task_id=second_id, depends_on_id=first_id))
+    db_session.commit()
+
+    service = SchedulingService(db_session)
+    today = datetime.combine(date.today(), datetime.min.time())
+    monday = today + timedelta(days=7 - today.weekday(), hours=9)
+    assert service.book_project(project.id, monday)["status"] == "success"
+
+    def second_starts():
+        return min(slot.start_at for slot in db_session.query(ScheduledSlot).filter(ScheduledSlot.task_id == second_id))
+    assert second_starts() == monday + timedelta(hours=4)
+
+    try:
+        service.delete_task(first)
+
+        assert db_session.query(Task).filter(Task.id == first_id).first() is None
+        assert db_session.query(ScheduledSlot).filter(ScheduledSlot.task_id == first_id).count() == 0
+        assert db_session.query(TaskDependency).filter(TaskDependency.depends_on_id == first_id).count() == 0
+        assert second_starts() == monday
+    finally:
+        db_session.query(ProjectSchedule).filter(ProjectSchedule.project_id == project.id).delete()
+        db_session.commit()
@@ -0,0 +1,97 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from datetime import datetime, timedelta, timezone
+from app.schemas.time_entry import TimeEntryBatch
+from app.models.time_entry import TaskTimeAggregate
+from app.services.time_entry_service import TimeEntryService
+
+@pytest.fixture
+def db_session():
+    return MagicMock()
+
+@pytest.fixture
+def time_entry_service(db_session):
+    return TimeEntryService(db_session)
+
+def test_validate_entries_rejects_invalid_hours(time_entry_service):
+    entries = [
+        {"task_id": 1, "hours": 2.5},
+        {"task_id": 1, "hours": 0},
+        {"task_id": 2, "hours": 30},
+        {"hours": 1.0},
+        {"task_id": 3, "hours": -1.0}
+    ]
+
+    valid, rejected = time_entry_service._validate_entries(entries)
+
+    assert [index for index, _ in valid] == [0, 4]
+    assert [r["index"] for r in rejected] == [1, 2, 3]
+
+def test_aggregate_deltas_collapses_entries_per_task():
+    first = datetime(2024, 1, 1, 9)
+    rows = [
+        {"task_id": 1, "hours": 2.0, "spent_at": first},
+        {"task_id": 1, "hours": 1.5, "spent_at": first + timedelta(hours=3)},
+        {"task_id": 2, "hours": 4.0, "spent_at": first},
+        {"task_id": 1, "hours": -0.5, "spent_at": first + timedelta(hours=1)}
+    ]
+
+    deltas = TimeEntryService._aggregate_deltas(rows)
+
+    assert deltas[1]["hours"] == 3.0
+    assert deltas[1]["count"] == 3
+    assert deltas[1]["last_spent_at"] == first + timedelta(hours=3)
+    assert deltas[2] == {"hours": 4.0, "count": 1, "last_spent_at": first}
+
+def test_aggregate_deltas_accepts_mixed_naive_and_aware_times():
+    batch = TimeEntryBatch(entries=[
+        {"task_id": 1, "hours": 1.0, "spent_at": "2024-01-01T09:00:00"},
+        {"task_id": 1, "hours": 1.0, "spent_at": "2024-01-01T12:00:00+02:00"},
+        {"task_id": 1, "hours": 1.0, "spent_at": "2024-01-01T10:30:00Z"}
+    ])
+    rows = [entry.model_dump() for entry in batch.entries]
+
+    deltas = TimeEntryService._aggregate_deltas(rows)
+
+    assert all(row["spent_at"].tzinfo == timezone.utc for row in rows)
+    assert deltas[1]["count"] == 3
+    assert deltas[1]["last_spent_at"] == datetime(2024, 1, 1, 10, 30, tzinfo=timezone.utc)
+
+def test_correct_total_books_difference_as_entry(time_entry_service, db_session):
+    db_session.query().filter().with_for_update().first.return_value = TaskTimeAggregate(task_id=1, total_hours=5.0)
+    db_session.execute.return_value.all.return_value = [(1, 3.0)]
+
+    totals = time_entry_service.correct_total(1, user_id=2, actual_hours=3.0)
+
+    assert totals == {1: 3.0}
+    correction = db_session.execute.call_args_list[0].args[1][0]
+    assert correction["task_id"] == 1
+    assert correction["user_id"] == 2
+    assert correction["hours"] == -2.0
+    db_session.commit.assert_not_called()
+
+def test_ingest_entries_rejects_foreign_tasks(time_entry_service, db_session):
+    db_session.query().join().filter().all.return_value = [(1,)]
+    db_session.execute.return_value.all.return_value = [(1, 5.0)]
+
+    with patch('app.services.time_entry_service.DeviationAlertService') as mock_alerts:
+        mock_alerts.return_value.on_hours_changed.return_value = []
+        result = time_entry_service.ingest_entries(
+            [{"task_id": 1, "hours": 2.0}, {"task_id": 99, "hours": 1.0}],
+            user_id=1
+        )
+
+    assert result["accepted"] == 1
+    assert result["rejected"] == [{"index": 1, "task_id": 99, "reason": "Task not found"}]
+    assert result["task_totals"] == {1: 5.0}
+    mock_alerts.return_value.on_hours_changed.assert_called_once_with({1: 5.0})
+    db_session.commit.assert_called_once()
+
+def test_ingest_entries_skips_writes_when_nothing_accepted(time_entry_service, db_session):
+    db_session.query().join().filter().all.return_value = []
+
+    result = time_entry_service.ingest_entries([{"task_id": 5, "hours": 1.0}], user_id=1)
+
+    assert result["accepted"] == 0
+    db_session.execute.assert_not_called()
+    db_session.commit.assert_not_called()
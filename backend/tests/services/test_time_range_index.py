@@ -0,0 +1,52 @@
+from datetime import datetime
+from app.services.time_range_index import TimeRangeIndex, ics_timestamp
+
+HOUR = 3600
+
+def test_overlapping_matches_start_or_end_in_window(tmp_path):
+    index = TimeRangeIndex(str(tmp_path))
+    index.put("before", 0, 1 * HOUR, 1)
+    index.put("ends-inside", 1 * HOUR, 11 * HOUR, 1)
+    index.put("inside", 12 * HOUR, 13 * HOUR, 1)
+    index.put("starts-inside", 19 * HOUR, 30 * HOUR, 1)
+    index.put("after", 25 * HOUR, 26 * HOUR, 1)
+    index.put("covers", 0, 40 * HOUR, 1)
+
+    assert index.overlapping(10 * HOUR, 20 * HOUR) == ["ends-inside", "inside", "starts-inside"]
+
+def test_put_moves_and_remove_drops(tmp_path):
+    index = TimeRangeIndex(str(tmp_path))
+    index.put("a", 0, HOUR, 1)
+    index.put("a", 10 * HOUR, 11 * HOUR, 2)
+    assert index.overlapping(0, 2 * HOUR) == []
+    assert index.overlapping(9 * HOUR, 12 * HOUR) == ["a"]
+    index.remove("a")
+    assert index.overlapping(0, 100 * HOUR) == []
+
+def test_journal_is_replayed_by_new_index(tmp_path):
+    index = TimeRangeIndex(str(tmp_path))
+    index.put("a", 0, HOUR, 1)
+    index.put("b", 2 * HOUR, 3 * HOUR, 1)
+    index.put("a", 4 * HOUR, 5 * HOUR, 2)
+    index.remove("b")
+
+    reloaded = TimeRangeIndex(str(tmp_path))
+    assert reloaded.entries == {"a": (4 * HOUR, 5 * HOUR, 2)}
+    reloaded.compact()
+    assert TimeRangeIndex(str(tmp_path)).entries == reloaded.entries
+
+def test_reconcile_loads_only_changed_files(tmp_path):
+    index = TimeRangeIndex(str(tmp_path))
+    index.put("a", 0, HOUR, 1)
+    loaded = []
+
+    def load(uid, file_name, mtime_ns):
+        loaded.append(uid)
+        return {"uid": uid, "dtstart": "20240102T090000Z", "dtend": "20240102T100000Z"}
+
+    index.reconcile({"a": ("a.ics", 1), "b": ("b.ics", 7)}, load)
+    assert loaded == ["b"]
+    assert index.entries["b"] == (ics_timestamp(datetime(2024, 1, 2, 9)), ics_timestamp(datetime(2024, 1, 2, 10)), 7)
+
+    index.reconcile({"b": ("b.ics", 7)}, load)
+    assert set(index.entries) == {"b"}
@@ -0,0 +1,60 @@
+import pytest
+from datetime import datetime, date, timezone
+from app.services.working_calendar import CalendarRangeError, WorkingCalendar, compile_calendar
+
+def test_standard_calendar_counts_from_epoch():
+    calendar = compile_calendar()
+
+    # Working minute 0 is Monday 2001-01-01 09:00; weekends and early mornings snap forward
+    assert calendar.to_working_minute(datetime(2001, 1, 1, 9, 0)) == 0
+    assert calendar.to_working_minute(datetime(2024, 1, 5, 16, 30)) == 2882370
+    assert calendar.to_working_minute(datetime(2024, 1, 6, 10, 0)) == 2882400
+    assert calendar.to_working_minute(datetime(2024, 1, 8, 7, 0)) == 2882400
+    minute = calendar.to_working_minute(datetime(2024, 1, 5, 17, 0))
+    assert calendar.from_working_minute(minute, is_end=True) == datetime(2024, 1, 5, 17, 0)
+
+def test_holidays_and_custom_hours_are_skipped():
+    calendar = compile_calendar(8 * 60, 6 * 60, holidays=[date(2024, 1, 1)])
+
+    # New Year's Day is a holiday, so the next working minute is Tuesday 08:00
+    assert calendar.next_working_minute(datetime(2023, 12, 29, 15, 0)) == datetime(2024, 1, 2, 8, 0)
+    assert calendar.next_working_minute(datetime(2024, 1, 2, 10, 15)) == datetime(2024, 1, 2, 10, 15)
+    assert not calendar.is_working_day(date(2024, 1, 1))
+    assert calendar.clock_time(calendar.day_minutes) == "14:00"
+
+def test_aware_datetimes_are_converted_to_calendar_timezone():
+    calendar = compile_calendar(timezone="Europe/Berlin")
+
+    # 08:30 UTC is 09:30 in Berlin in winter
+    moment = datetime(2024, 1, 2, 8, 30, tzinfo=timezone.utc)
+
+    assert calendar.next_working_minute(moment) == datetime(2024, 1, 2, 9, 30)
+
+def test_compiled_calendars_are_cached_by_definition():
+    assert compile_calendar(workdays=[4, 0, 1, 2, 3]) is compile_calendar()
+    assert compile_calendar(holidays=[date(2024, 1, 1)]) is not compile_calendar()
+
+def test_invalid_definitions_raise_value_error():
+    with pytest.raises(ValueError):
+        WorkingCalendar(start_minute=20 * 60, day_minutes=8 * 60)
+    with pytest.raises(ValueError):
+        WorkingCalendar(workdays=[])
+    with pytest.raises(ValueError):
+        WorkingCalendar(timezone="Mars/Olympus")
+
+def test_dates_outside_2001_2100_are_supported():
+    calendar = compile_calendar(holidays=[date(2150, 1, 1)])
+
+    assert calendar.next_working_minute(datetime(1999, 12, 31, 18, 0)) == datetime(2000, 1, 3, 9, 0)
+    # The holiday is skipped in a year compiled on demand
+    assert calendar.next_working_minute(datetime(2150, 1, 1, 10, 0)) == datetime(2150, 1, 2, 9, 0)
+    minute = calendar.to_working_minute(datetime(2150, 1, 2, 17, 0))
+    assert calendar.from_working_minute(minute, is_end=True) == datetime(2150, 1, 2, 17, 0)
+
+def test_working_days_beyond_year_9999_raise_range_error():
+    calendar = compile_calendar()
+
+    with pytest.raises(CalendarRangeError):
+        calendar.working_day_date(10 ** 9)
+    with pytest.raises(CalendarRangeError):
+        calendar.from_working_minute(-(10 ** 12))